@@ -0,0 +1,68 @@
+# benchmarks/bench_histograma.py
+'''
+Mide el tamaño del JSON de la figura (lo que se envía al navegador) y el tiempo
+de construcción del histograma, comparando el histograma categórico original
+(una categoría por valor distinto) con crear_histograma.
+
+Uso:
+    python -m benchmarks.bench_histograma [n1 n2 ...]
+
+Cada n es el número de datos; los valores son continuos (casi todos distintos).
+El histograma original solo se mide hasta 1e5 valores distintos.
+'''
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from core.descriptive import ordenar_valores, tabla_desde_frecuencias
+from core.frecuencias import contar_ordenados
+from core.visualization import crear_histograma
+
+MAX_UNICOS_ORIGINAL = 100_000
+
+
+def crear_histograma_original(tabla_estadistica: pd.DataFrame):
+    '''Implementación previa (eje categórico) usada como referencia.'''
+    datos = tabla_estadistica.reset_index()
+    datos['Valores'] = datos['Valores'].astype(str)
+    fig = px.bar(datos, x='Valores', y='Frecuencia Absoluta (fi)')
+    fig.update_layout(bargap=0, bargroupgap=0,
+                      xaxis=dict(categoryorder='array', categoryarray=list(datos['Valores'])),
+                      yaxis_title='Frecuencia Absoluta', xaxis_title='Valores', height=500)
+    fig.update_traces(marker_line_color='white', marker_line_width=1)
+    return fig
+
+
+def generar_tabla(n: int, semilla: int = 0) -> pd.DataFrame:
+    valores = np.random.default_rng(semilla).normal(50, 10, n).round(4)
+    tabla = tabla_desde_frecuencias(*contar_ordenados(ordenar_valores(valores)))
+    return tabla.reset_index()
+
+
+def medir(funcion, tabla: pd.DataFrame) -> tuple:
+    '''Devuelve (segundos de construcción + serialización, bytes del JSON).'''
+    inicio = time.perf_counter()
+    carga = funcion(tabla).to_json()
+    return time.perf_counter() - inicio, len(carga)
+
+
+def main(tamanos):
+    print(f"{'n':>10} {'únicos':>10} {'original (s)':>13} {'original (KB)':>14} "
+          f"{'nuevo (s)':>10} {'nuevo (KB)':>11}")
+    for n in tamanos:
+        tabla = generar_tabla(n)
+        if len(tabla) <= MAX_UNICOS_ORIGINAL:
+            t_original, b_original = medir(crear_histograma_original, tabla)
+            original = f"{t_original:>13.3f} {b_original / 1024:>14.1f}"
+        else:
+            original = f"{'-':>13} {'-':>14}"
+        t_nuevo, b_nuevo = medir(crear_histograma, tabla)
+        print(f"{n:>10,} {len(tabla):>10,} {original} {t_nuevo:>10.3f} {b_nuevo / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    tamanos = [int(float(arg)) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000, 1_000_000]
+    main(tamanos)
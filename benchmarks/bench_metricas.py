@@ -0,0 +1,80 @@
+# benchmarks/bench_metricas.py
+'''
+Compara calcular_metricas_principales (núcleo fusionado: una ordenación + una
+pasada de momentos) con la implementación original basada en una reducción de
+pandas por métrica, y verifica que ambas devuelven los mismos resultados.
+
+Uso:
+    python -m benchmarks.bench_metricas [n1 n2 ...]
+    python -m benchmarks.bench_metricas 100000 1000000 10000000 100000000
+'''
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.descriptive import calcular_metricas_principales
+
+
+def calcular_metricas_original(serie_valores: pd.Series) -> dict:
+    '''Implementación previa, usada como referencia de regresión.'''
+    moda_series = serie_valores.mode()
+    moda_str = ", ".join(map(str, moda_series.tolist()))
+    Q1 = serie_valores.quantile(0.25)
+    Q3 = serie_valores.quantile(0.75)
+    return {
+        "n": len(serie_valores),
+        "minimo": serie_valores.min(),
+        "maximo": serie_valores.max(),
+        "Q1": Q1,
+        "Q3": Q3,
+        "media": serie_valores.mean(),
+        "mediana": serie_valores.median(),
+        "moda": moda_str,
+        "varianza": serie_valores.var(),
+        "desviacion": serie_valores.std(),
+        "coef_variacion": (serie_valores.std() / serie_valores.mean()) * 100 if serie_valores.mean() != 0 else 0,
+        "rango": serie_valores.max() - serie_valores.min(),
+        "rango_intercuartilico": Q3 - Q1
+    }
+
+
+def verificar(esperado: dict, obtenido: dict):
+    '''Comprueba que ambas implementaciones devuelven las mismas claves y valores.'''
+    assert esperado.keys() == obtenido.keys(), "Las claves no coinciden"
+    for clave, valor in esperado.items():
+        if clave == "moda":
+            assert valor == obtenido[clave], f"{clave}: {valor!r} != {obtenido[clave]!r}"
+        else:
+            assert np.isclose(valor, obtenido[clave], rtol=1e-9, equal_nan=True), \
+                f"{clave}: {valor} != {obtenido[clave]}"
+
+
+def medir(funcion, serie: pd.Series) -> float:
+    inicio = time.perf_counter()
+    funcion(serie)
+    return time.perf_counter() - inicio
+
+
+def main(tamanos):
+    rng = np.random.default_rng(0)
+    print(f"{'n':>11} | {'datos':>9} | {'original (s)':>12} | {'fusionado (s)':>13} | {'aceleración':>11}")
+    for n in tamanos:
+        # Enteros (moda bien definida) y continuos (todos los valores son moda:
+        # en ambas implementaciones domina la construcción del texto de la moda)
+        distribuciones = {
+            "enteros": pd.Series(rng.integers(0, 1000, n).astype(float)),
+            "continuos": pd.Series(rng.normal(50, 10, n)),
+        }
+        for nombre, serie in distribuciones.items():
+            verificar(calcular_metricas_original(serie), calcular_metricas_principales(serie))
+            t_original = medir(calcular_metricas_original, serie)
+            t_nuevo = medir(calcular_metricas_principales, serie)
+            print(f"{n:>11} | {nombre:>9} | {t_original:>12.4f} | {t_nuevo:>13.4f} | "
+                  f"{t_original / t_nuevo:>10.1f}x")
+
+
+if __name__ == "__main__":
+    tamanos = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000, 10_000_000]
+    main(tamanos)
@@ -0,0 +1,60 @@
+# benchmarks/bench_parser.py
+'''
+Compara el rendimiento del parser vectorizado (core.parser) con la
+implementación original de procesar_datos (split + float() por token).
+
+Uso:
+    python -m benchmarks.bench_parser [n1 n2 ...]
+'''
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.parser import parsear_valores
+
+
+def procesar_datos_original(cadena_valores: str) -> pd.Series:
+    '''Implementación previa (sin Streamlit) usada como referencia.'''
+    cadena_limpia = cadena_valores.replace(',', ' ')
+    lista_valores = cadena_limpia.split()
+    lista_valores = [float(valor) for valor in lista_valores]
+    return pd.Series(lista_valores)
+
+
+def generar_texto(n: int, semilla: int = 0) -> str:
+    rng = np.random.default_rng(semilla)
+    valores = rng.normal(50, 10, n).round(2)
+    return ", ".join(map(str, valores))
+
+
+def medir(funcion, texto: str, repeticiones: int = 3) -> float:
+    '''Devuelve el mejor tiempo (segundos) de varias repeticiones.'''
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(texto)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main(tamanos):
+    print(f"{'n':>10} | {'original (s)':>12} | {'vectorizado (s)':>15} | {'Mvalores/s':>10} | {'aceleración':>11}")
+    for n in tamanos:
+        texto = generar_texto(n)
+
+        # Ambas implementaciones deben producir exactamente los mismos valores
+        esperado = procesar_datos_original(texto).to_numpy()
+        obtenido = parsear_valores(texto).valores
+        assert np.array_equal(esperado, obtenido), "Los resultados no coinciden"
+
+        t_original = medir(procesar_datos_original, texto)
+        t_nuevo = medir(parsear_valores, texto)
+        print(f"{n:>10} | {t_original:>12.4f} | {t_nuevo:>15.4f} | "
+              f"{n / t_nuevo / 1e6:>10.2f} | {t_original / t_nuevo:>10.1f}x")
+
+
+if __name__ == "__main__":
+    tamanos = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000, 5_000_000]
+    main(tamanos)
@@ -0,0 +1,69 @@
+# benchmarks/bench_tabla.py
+'''
+Compara crear_tabla_estadistica (conteo según el tipo de datos) con la
+implementación original basada en value_counts().sort_index() y .round(4),
+verificando que ambas tablas coinciden.
+
+Uso:
+    python -m benchmarks.bench_tabla [n1 n2 ...]
+'''
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.descriptive import crear_tabla_estadistica
+
+
+def crear_tabla_original(valores: pd.Series) -> pd.DataFrame:
+    '''Implementación previa usada como referencia.'''
+    tabla = valores.value_counts().sort_index().to_frame(name='Frecuencia Absoluta (fi)')
+    n = len(valores)
+    tabla['Frecuencia Relativa (hi)'] = tabla['Frecuencia Absoluta (fi)'] / n
+    tabla['Porcentaje (pi)'] = tabla['Frecuencia Relativa (hi)'] * 100
+    tabla['Frecuencia Acumulada (Fi)'] = tabla['Frecuencia Absoluta (fi)'].cumsum()
+    tabla['Frecuencia Rel Acumulada (Hi)'] = tabla['Frecuencia Relativa (hi)'].cumsum()
+    tabla.index.name = 'Valores'
+    return tabla.round(4)
+
+
+def generar(distribucion: str, n: int, semilla: int = 0) -> pd.Series:
+    rng = np.random.default_rng(semilla)
+    if distribucion == "enteros (0-100)":
+        valores = rng.integers(0, 101, n)
+    elif distribucion == "enteros (±1e6)":
+        valores = rng.integers(-10 ** 6, 10 ** 6, n)
+    elif distribucion == "red decimal":
+        # Desplazamientos enteros respecto de un mínimo no entero (no debe usar bincount)
+        valores = rng.integers(0, 101, n) + 0.1
+    else:
+        valores = rng.normal(50, 10, n).round(2)
+    return pd.Series(valores.astype(np.float64))
+
+
+def medir(funcion, serie: pd.Series, repeticiones: int = 3) -> tuple:
+    '''Devuelve (mejor tiempo en segundos, resultado).'''
+    mejor, resultado = float('inf'), None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(serie)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def main(tamanos):
+    print(f"{'distribución':<18} {'n':>12} {'original (s)':>13} {'nuevo (s)':>10} {'aceleración':>12}")
+    for distribucion in ("enteros (0-100)", "enteros (±1e6)", "red decimal", "decimales"):
+        for n in tamanos:
+            serie = generar(distribucion, n)
+            t_original, esperado = medir(crear_tabla_original, serie)
+            t_nuevo, obtenido = medir(crear_tabla_estadistica, serie)
+            pd.testing.assert_frame_equal(esperado, obtenido, check_index_type=False)
+            print(f"{distribucion:<18} {n:>12,} {t_original:>13.3f} {t_nuevo:>10.3f} "
+                  f"{t_original / t_nuevo:>11.1f}x")
+
+
+if __name__ == "__main__":
+    tamanos = [int(float(arg)) for arg in sys.argv[1:]] or [100_000, 1_000_000, 10_000_000]
+    main(tamanos)
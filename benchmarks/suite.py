@@ -0,0 +1,281 @@
+# benchmarks/suite.py
+'''
+Banco de pruebas reproducible del pipeline estadístico: mide tiempo, memoria pico
+(tracemalloc) y memoria retenida por el resultado de cada etapa, sobre
+distribuciones sintéticas de 10^3 a 10^8 valores. Los resultados se guardan en
+JSON y sirven de línea base para detectar regresiones.
+
+Etapas (las mismas funciones que usa la aplicación):
+    parseo       parsear_valores + Serie (lo que hace procesar_datos, sin la caché de Streamlit)
+    tabla        crear_tabla_estadistica
+    metricas     calcular_metricas_principales (incluye la ordenación)
+    intervalos   crear_intervalos + completar_tabla_intervalos + calcular_metricas_agrupadas
+    histograma   crear_histograma sobre la tabla discreta
+    boxplot      crear_boxplot sin memoización (figura construida en cada llamada)
+
+Uso:
+    python -m benchmarks.suite ejecutar --salida base.json
+    python -m benchmarks.suite ejecutar --tamanos 1e3 1e5 1e7 1e8 --etapas tabla metricas --salida nuevo.json
+    python -m benchmarks.suite comparar base.json nuevo.json --tolerancia 0.25
+'''
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime, timezone
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from core.analisis import completar_tabla_intervalos, tabla_con_valores
+from core.atipicos import analizar_atipicos
+from core.descriptive import crear_tabla_estadistica, calcular_metricas_principales, calcular_metricas_agrupadas
+from core.intervals import crear_intervalos
+from core.parser import parsear_valores
+from core.visualization import crear_histograma, crear_boxplot, _crear_boxplot_memoizado
+
+DISTRIBUCIONES = ("normal", "colas_pesadas", "enteros", "alta_cardinalidad")
+TAMANOS = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+
+# Por encima de este tamaño no se genera el texto de entrada (ocuparía varios GB)
+MAX_N_PARSEO = 10 ** 7
+
+# Diferencias absolutas por debajo de las cuales no se considera regresión (ruido)
+MIN_DIFERENCIA_TIEMPO = 1e-3
+MIN_DIFERENCIA_MEMORIA = 256 * 1024
+
+# El tiempo se compara por la mediana de las repeticiones, y una diferencia menor que
+# FACTOR_RUIDO veces la dispersión de ambas ejecuciones (mediana - mejor) se considera ruido
+FACTOR_RUIDO = 4
+
+
+def generar(distribucion: str, n: int, semilla: int = 0) -> np.ndarray:
+    '''Valores sintéticos (float64) reproducibles para la distribución indicada.'''
+    rng = np.random.default_rng(semilla)
+    if distribucion == "normal":
+        return rng.normal(50, 10, n).round(2)
+    if distribucion == "colas_pesadas":
+        return (rng.standard_t(2, n) * 10).round(2)
+    if distribucion == "enteros":
+        return rng.poisson(20, n).astype(np.float64)
+    if distribucion == "alta_cardinalidad":
+        return rng.uniform(0, 1000, n)
+    raise ValueError(f"Distribución no reconocida: '{distribucion}'.")
+
+
+class Contexto:
+    '''Datos de entrada de cada etapa, generados una sola vez y fuera de la medición.'''
+
+    def __init__(self, distribucion: str, n: int, semilla: int):
+        self.valores = generar(distribucion, n, semilla)
+
+    @cached_property
+    def texto(self) -> str:
+        return "\n".join(self.valores.astype(str))
+
+    @cached_property
+    def serie(self) -> pd.Series:
+        return pd.Series(self.valores, copy=False)
+
+    @cached_property
+    def tabla(self) -> pd.DataFrame:
+        return tabla_con_valores(crear_tabla_estadistica(self.serie))
+
+    @cached_property
+    def metricas(self) -> dict:
+        return calcular_metricas_principales(self.serie)
+
+    @cached_property
+    def atipicos(self) -> dict:
+        return analizar_atipicos(self.valores, self.metricas, ordenados=False)
+
+
+def _parseo(contexto: Contexto):
+    valores, _, _ = parsear_valores(contexto.texto)
+    return pd.Series(valores, copy=False)
+
+
+def _intervalos(contexto: Contexto):
+    tabla = completar_tabla_intervalos(crear_intervalos(contexto.serie, "Regla de Sturges"))
+    return tabla, calcular_metricas_agrupadas(tabla)
+
+
+def _boxplot(contexto: Contexto):
+    # Sin memoización: se mide la construcción de la figura
+    _crear_boxplot_memoizado.cache_clear()
+    return crear_boxplot(contexto.metricas, contexto.atipicos)
+
+
+ETAPAS = {
+    "parseo": _parseo,
+    "tabla": lambda contexto: crear_tabla_estadistica(contexto.serie),
+    "metricas": lambda contexto: calcular_metricas_principales(contexto.serie),
+    "intervalos": _intervalos,
+    "histograma": lambda contexto: crear_histograma(contexto.tabla),
+    "boxplot": _boxplot,
+}
+
+
+# Entradas derivadas que cada etapa necesita ya construidas (fuera de la medición)
+ENTRADAS = {"parseo": "texto", "histograma": "tabla", "boxplot": "atipicos"}
+
+
+def medir(funcion, repeticiones: int) -> dict:
+    '''
+    Tiempo por llamada (mejor y mediana de las repeticiones, con timeit: cada
+    repetición encadena las llamadas necesarias para durar al menos 0.2 s) y, en una
+    ejecución adicional bajo tracemalloc, memoria pico durante la llamada y
+    memoria/bloques que retiene el resultado. tracemalloc registra también los
+    buffers de NumPy.
+    '''
+    temporizador = timeit.Timer(funcion)
+    llamadas, _ = temporizador.autorange()
+    tiempos = [t / llamadas for t in temporizador.repeat(repeat=repeticiones, number=llamadas)]
+
+    gc.collect()
+    tracemalloc.start()
+    base_bytes, _ = tracemalloc.get_traced_memory()
+    base_bloques = len(tracemalloc.take_snapshot().traces)
+    tracemalloc.reset_peak()
+    resultado = funcion()
+    actual, pico = tracemalloc.get_traced_memory()
+    bloques = len(tracemalloc.take_snapshot().traces) - base_bloques
+    tracemalloc.stop()
+    del resultado
+
+    return {
+        "tiempo_s": min(tiempos),
+        "tiempo_mediana_s": float(np.median(tiempos)),
+        "llamadas_por_repeticion": llamadas,
+        "pico_bytes": pico - base_bytes,
+        "retenido_bytes": actual - base_bytes,
+        "bloques_retenidos": bloques,
+    }
+
+
+def entorno() -> dict:
+    return {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "plataforma": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "nucleos": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def ejecutar(tamanos, distribuciones, etapas, repeticiones: int, semilla: int) -> dict:
+    resultados = []
+    print(f"{'etapa':<11} {'distribución':<18} {'n':>12} {'tiempo (s)':>11} {'pico (MB)':>10} {'retenido (MB)':>14}")
+    for n in tamanos:
+        for distribucion in distribuciones:
+            contexto = Contexto(distribucion, n, semilla)
+            for etapa in etapas:
+                if etapa == "parseo" and n > MAX_N_PARSEO:
+                    continue
+                if etapa in ENTRADAS:
+                    getattr(contexto, ENTRADAS[etapa])
+                medicion = medir(lambda: ETAPAS[etapa](contexto), repeticiones)
+                resultados.append({"etapa": etapa, "distribucion": distribucion, "n": n, **medicion})
+                print(f"{etapa:<11} {distribucion:<18} {n:>12,} {medicion['tiempo_s']:>11.4f} "
+                      f"{medicion['pico_bytes'] / 2 ** 20:>10.2f} {medicion['retenido_bytes'] / 2 ** 20:>14.2f}")
+            del contexto
+    return {"entorno": entorno(), "repeticiones": repeticiones, "semilla": semilla, "resultados": resultados}
+
+
+def _mediana(resultado: dict) -> float:
+    '''Mediana del tiempo por llamada (el mejor tiempo en líneas base que no la guardaban).'''
+    return resultado.get("tiempo_mediana_s", resultado["tiempo_s"])
+
+
+def _dispersion(resultado: dict) -> float:
+    '''Dispersión del tiempo entre repeticiones (mediana - mejor).'''
+    return _mediana(resultado) - resultado["tiempo_s"]
+
+
+def comparar(base: dict, nuevo: dict, tolerancia: float) -> list:
+    '''
+    Compara dos ejecuciones etapa a etapa. Es regresión si la mediana del tiempo o
+    la memoria pico superan la línea base en más de la tolerancia relativa y de un
+    mínimo absoluto: para el tiempo, el mayor entre MIN_DIFERENCIA_TIEMPO y
+    FACTOR_RUIDO veces la dispersión entre repeticiones de ambas ejecuciones, de
+    modo que las etapas de pocos milisegundos no se marcan por ruido.
+
+    :return: Lista de regresiones (etapa, distribución, n, métrica, base, nuevo).
+    '''
+    indice = {(r["etapa"], r["distribucion"], r["n"]): r for r in base["resultados"]}
+    regresiones = []
+    print(f"{'etapa':<11} {'distribución':<18} {'n':>12} {'tiempo':>9} {'pico':>9}")
+    for r in nuevo["resultados"]:
+        clave = (r["etapa"], r["distribucion"], r["n"])
+        anterior = indice.get(clave)
+        if anterior is None:
+            continue
+        marcas = []
+        ruido = FACTOR_RUIDO * (_dispersion(anterior) + _dispersion(r))
+        comparaciones = (("tiempo_mediana_s", _mediana(anterior), _mediana(r), max(MIN_DIFERENCIA_TIEMPO, ruido)),
+                         ("pico_bytes", anterior["pico_bytes"], r["pico_bytes"], MIN_DIFERENCIA_MEMORIA))
+        for metrica, valor_base, valor, minimo in comparaciones:
+            if valor - valor_base > minimo and valor > valor_base * (1 + tolerancia):
+                regresiones.append((*clave, metrica, valor_base, valor))
+                marcas.append(metrica)
+        razon_tiempo = _mediana(r) / _mediana(anterior) if _mediana(anterior) else float("nan")
+        razon_pico = r["pico_bytes"] / anterior["pico_bytes"] if anterior["pico_bytes"] else float("nan")
+        aviso = "  <-- REGRESIÓN (" + ", ".join(marcas) + ")" if marcas else ""
+        print(f"{clave[0]:<11} {clave[1]:<18} {clave[2]:>12,} {razon_tiempo:>8.2f}x {razon_pico:>8.2f}x{aviso}")
+    return regresiones
+
+
+def crear_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Banco de pruebas del pipeline estadístico.")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    ejecucion = subcomandos.add_parser("ejecutar", help="Mide las etapas y guarda los resultados en JSON.")
+    ejecucion.add_argument("--tamanos", nargs="+", type=lambda v: int(float(v)), default=list(TAMANOS),
+                           help="Número de valores (admite notación 1e6).")
+    ejecucion.add_argument("--distribuciones", nargs="+", choices=DISTRIBUCIONES, default=list(DISTRIBUCIONES))
+    ejecucion.add_argument("--etapas", nargs="+", choices=tuple(ETAPAS), default=list(ETAPAS))
+    ejecucion.add_argument("--repeticiones", type=int, default=5)
+    ejecucion.add_argument("--semilla", type=int, default=0)
+    ejecucion.add_argument("--salida", default=None, help="Archivo JSON de resultados.")
+
+    comparacion = subcomandos.add_parser("comparar", help="Compara una ejecución con una línea base.")
+    comparacion.add_argument("base", help="JSON de la línea base.")
+    comparacion.add_argument("nuevo", help="JSON de la ejecución a comparar.")
+    comparacion.add_argument("--tolerancia", type=float, default=0.25,
+                             help="Empeoramiento relativo admitido (0.25 = 25 %%).")
+    return parser
+
+
+def main(argumentos=None) -> int:
+    args = crear_parser().parse_args(argumentos)
+    if args.comando == "ejecutar":
+        informe = ejecutar(args.tamanos, args.distribuciones, args.etapas, args.repeticiones, args.semilla)
+        if args.salida:
+            with open(args.salida, "w", encoding="utf-8") as archivo:
+                json.dump(informe, archivo, ensure_ascii=False, indent=2)
+            print(f"Resultados guardados en {args.salida}")
+        return 0
+
+    with open(args.base, encoding="utf-8") as archivo:
+        base = json.load(archivo)
+    with open(args.nuevo, encoding="utf-8") as archivo:
+        nuevo = json.load(archivo)
+    if base["entorno"]["plataforma"] != nuevo["entorno"]["plataforma"]:
+        print("Aviso: las ejecuciones provienen de plataformas distintas.", file=sys.stderr)
+    regresiones = comparar(base, nuevo, args.tolerancia)
+    if regresiones:
+        print(f"{len(regresiones)} regresiones por encima del {args.tolerancia:.0%}.")
+        return 1
+    print("Sin regresiones.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+# cli.py
+'''
+Análisis por lotes sin servidor web: procesa varios archivos (y columnas) en una
+sola invocación, opcionalmente en paralelo, y escribe los resultados en JSON,
+CSV o Parquet.
+
+Uso:
+    python cli.py datos.csv otros.parquet --columnas precio cantidad \\
+        --tipo "Por Intervalos" --criterio "Regla de Sturges" --procesos 4 \\
+        --salida reportes/ --formato parquet
+
+Salida:
+    json     -> resultados.json (métricas, atípicos y tabla de cada análisis)
+    csv      -> metricas.csv (una fila por análisis) y una tabla_<archivo>[_<columna>].csv por análisis
+    parquet  -> igual que csv, en Parquet
+'''
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.analisis import analizar, TIPOS_DATOS
+from core.atipicos import METODOS_ATIPICOS
+from core.ingesta import detectar_formato, listar_columnas, leer_bloques, TIPOS_BINARIOS
+from core.sketch import SketchCuantiles
+
+FORMATOS_SALIDA = ("json", "csv", "parquet")
+
+
+def listar_tareas(archivos: list, columnas: list) -> list:
+    '''
+    Expande archivos × columnas en tareas (archivo, columna). Sin columnas indicadas
+    se analizan todas las del archivo (o el array completo si es 1-D / binario).
+    '''
+    tareas = []
+    for archivo in archivos:
+        formato = detectar_formato(archivo)
+        disponibles = listar_columnas(archivo, formato)
+        if not disponibles:
+            tareas.append((archivo, None))
+            continue
+        if columnas:
+            # Las columnas de .npy 2-D se indican por índice
+            seleccion = [int(c) if formato == "npy" else c for c in columnas]
+            faltantes = [c for c in seleccion if c not in disponibles]
+            if faltantes:
+                raise ValueError(f"'{archivo}' no tiene las columnas {faltantes}.")
+        else:
+            seleccion = disponibles
+        tareas.extend((archivo, columna) for columna in seleccion)
+    return tareas
+
+
+def analizar_tarea(tarea: tuple, opciones: dict) -> dict:
+    '''
+    Lee una columna completa y la analiza. Se ejecuta en un proceso del pool,
+    por lo que devuelve solo datos serializables (o el error como texto).
+    '''
+    archivo, columna = tarea
+    registro = {"archivo": archivo, "columna": columna}
+    try:
+        formato = detectar_formato(archivo)
+        bloques = list(leer_bloques(archivo, formato, columna, dtype=opciones["dtype"]))
+        valores = np.concatenate(bloques) if bloques else np.empty(0, dtype=np.float64)
+        valores = valores[~np.isnan(valores)]
+        if valores.size == 0:
+            raise ValueError("no contiene valores numéricos.")
+        resultado = analizar(valores, opciones["tipo_datos"], opciones["criterio_intervalos"],
+                             opciones["metodo_atipicos"], opciones["sketch_k"])
+    except (ValueError, ImportError, OSError) as error:
+        registro["error"] = str(error)
+        return registro
+
+    registro.update(resultado.resumen())
+    registro["tabla"] = resultado.tabla
+    return registro
+
+
+def _nombre_tabla(registro: dict, extension: str) -> str:
+    nombre = Path(registro["archivo"]).stem
+    if registro["columna"] is not None:
+        nombre += f"_{registro['columna']}"
+    return f"tabla_{nombre}.{extension}"
+
+
+def escribir_resultados(registros: list, salida: Path, formato: str) -> list:
+    '''
+    Escribe los resultados en el directorio de salida.
+
+    :return: Lista de rutas escritas.
+    '''
+    salida.mkdir(parents=True, exist_ok=True)
+    if formato == "json":
+        ruta = salida / "resultados.json"
+        contenido = [{**r, "tabla": r["tabla"].to_dict(orient="records")} if "tabla" in r else r
+                     for r in registros]
+        ruta.write_text(json.dumps(contenido, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+        return [ruta]
+
+    escribir = {"csv": lambda df, ruta: df.to_csv(ruta, index=False),
+                "parquet": lambda df, ruta: df.to_parquet(ruta, index=False)}[formato]
+    rutas = []
+    filas = []
+    for registro in registros:
+        fila = {"archivo": registro["archivo"], "columna": registro["columna"], "error": registro.get("error")}
+        if "tabla" in registro:
+            metricas = {clave: valor for clave, valor in registro["metricas"].items()
+                        if not isinstance(valor, dict)}
+            # La moda puede ser una lista de valores: se guarda como texto
+            metricas["moda"] = str(metricas["moda"])
+            atipicos = registro["atipicos"]
+            fila.update(metricas)
+            fila.update({"metodo_atipicos": atipicos["metodo"],
+                         "limite_inferior": atipicos["limite_inferior"],
+                         "limite_superior": atipicos["limite_superior"],
+                         "n_atipicos": atipicos["n_atipicos"]})
+            ruta = salida / _nombre_tabla(registro, formato)
+            escribir(registro["tabla"], ruta)
+            rutas.append(ruta)
+        filas.append(fila)
+
+    ruta = salida / f"metricas.{formato}"
+    tabla_metricas = pd.DataFrame(filas)
+    tabla_metricas["columna"] = tabla_metricas["columna"].astype("string")
+    escribir(tabla_metricas, ruta)
+    return [ruta] + rutas
+
+
+def crear_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="StatBoard: análisis descriptivo por lotes.")
+    parser.add_argument("archivos", nargs="+", help="Archivos CSV, Parquet, .npy o binarios.")
+    parser.add_argument("--columnas", nargs="*", default=None,
+                        help="Columnas a analizar (por defecto, todas).")
+    parser.add_argument("--tipo", choices=TIPOS_DATOS, default=TIPOS_DATOS[0], help="Tipo de datos.")
+    parser.add_argument("--criterio", default="Regla de Sturges",
+                        help="Criterio de intervalos ('Raíz cuadrada', 'Regla de Sturges', "
+                             "'Regla de Scott' o un número).")
+    parser.add_argument("--atipicos", choices=METODOS_ATIPICOS, default=METODOS_ATIPICOS[0],
+                        help="Método de detección de atípicos.")
+    parser.add_argument("--error-sketch", type=float, default=None,
+                        help="Cuartiles aproximados con un sketch KLL del error de rango dado (p. ej. 0.01).")
+    parser.add_argument("--dtype", choices=TIPOS_BINARIOS, default="float64",
+                        help="Tipo de dato de los archivos binarios crudos.")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="Procesos en paralelo (0 = uno por núcleo).")
+    parser.add_argument("--salida", default="resultados", help="Directorio de salida.")
+    parser.add_argument("--formato", choices=FORMATOS_SALIDA, default="json", help="Formato de salida.")
+    return parser
+
+
+def main(argumentos=None) -> int:
+    args = crear_parser().parse_args(argumentos)
+    opciones = {
+        "tipo_datos": args.tipo,
+        "criterio_intervalos": args.criterio if args.tipo == "Por Intervalos" else None,
+        "metodo_atipicos": args.atipicos,
+        "sketch_k": SketchCuantiles.k_para_error(args.error_sketch) if args.error_sketch else None,
+        "dtype": args.dtype,
+    }
+
+    try:
+        tareas = listar_tareas(args.archivos, args.columnas)
+    except (ValueError, ImportError, OSError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 2
+
+    procesos = args.procesos or os.cpu_count() or 1
+    if procesos > 1 and len(tareas) > 1:
+        with ProcessPoolExecutor(max_workers=min(procesos, len(tareas))) as ejecutor:
+            registros = list(ejecutor.map(analizar_tarea, tareas, [opciones] * len(tareas)))
+    else:
+        registros = [analizar_tarea(tarea, opciones) for tarea in tareas]
+
+    for ruta in escribir_resultados(registros, Path(args.salida), args.formato):
+        print(ruta)
+    fallidos = [r for r in registros if "error" in r]
+    for registro in fallidos:
+        columna = f" [{registro['columna']}]" if registro["columna"] is not None else ""
+        print(f"Error en {registro['archivo']}{columna}: {registro['error']}", file=sys.stderr)
+    return 1 if fallidos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+# core/acumulador.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from core.frecuencias import (contar_frecuencias, combinar_frecuencias, restar_frecuencias, normalizar_frecuencias,
+                              cuantil_frecuencias, mediana_frecuencias)
+from core.forma import medidas_forma
+from core.sketch import SketchCuantiles
+
+# Tamaño de bloque para recorrer arrays en memoria: cada bloque cabe en caché,
+# de modo que media y desvíos del bloque se calculan sin volver a leer la RAM.
+TAMANO_BLOQUE_MOMENTOS = 65_536
+
+
+class AcumuladorEstadistico:
+    '''
+    Acumula estadísticos suficientes (n, suma, mínimo, máximo, media, M2 y
+    opcionalmente M3, M4, la tabla de frecuencias o un sketch de cuantiles)
+    bloque a bloque, de modo que
+    las métricas de un conjunto de datos arbitrariamente grande se obtienen en una
+    sola pasada y con memoria constante.
+
+    Los acumuladores parciales se fusionan de forma exacta con combinar(), lo que
+    permite repartir una muestra entre procesos o nodos y unir los resultados.
+    Los momentos se combinan con las fórmulas de Chan et al. / Pébay, numéricamente estables:
+        delta = media_b - media_a
+        M2 = M2_a + M2_b + delta² · n_a · n_b / n
+    '''
+
+    def __init__(self, momentos_superiores: bool = False, frecuencias: bool = False,
+                 sketch: Optional[SketchCuantiles] = None):
+        '''
+        :param momentos_superiores: Si es True también acumula M3 y M4
+                                    (asimetría y curtosis).
+        :param frecuencias: Si es True mantiene la tabla de frecuencias, que permite
+                            obtener cuartiles, mediana y moda exactos. Su tamaño crece
+                            con el número de valores distintos: úsese con datos discretos.
+        :param sketch: Sketch de cuantiles (memoria acotada) para estimar cuartiles y
+                       mediana cuando no se mantiene la tabla de frecuencias.
+        '''
+        self.momentos_superiores = momentos_superiores
+        self.n = 0
+        self.suma = 0.0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self.media = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.valores_unicos = np.empty(0, dtype=np.float64) if frecuencias else None
+        self.conteos = np.empty(0, dtype=np.int64) if frecuencias else None
+        self.sketch = sketch
+
+    @classmethod
+    def desde_frecuencias(cls, valores, conteos, momentos_superiores: bool = False) -> "AcumuladorEstadistico":
+        '''
+        Construye el acumulador directamente desde una tabla (valor, frecuencia) ya
+        agregada: momentos ponderados por la frecuencia y tabla de frecuencias, en
+        tiempo y memoria proporcionales al número de filas, no al total de datos.
+
+        :param valores: Valores (no hace falta que estén ordenados ni sean únicos).
+        :param conteos: Frecuencia de cada valor (enteros no negativos).
+        :return: Acumulador con frecuencias.
+        '''
+        unicos, conteos = normalizar_frecuencias(valores, conteos)
+        acumulador = cls(momentos_superiores, frecuencias=True)
+        if len(unicos) == 0:
+            return acumulador
+
+        acumulador.n = int(conteos.sum())
+        acumulador.suma = float(np.dot(conteos, unicos))
+        acumulador.media = acumulador.suma / acumulador.n
+        desvios = unicos - acumulador.media
+        cuadrados = desvios * desvios
+        acumulador.m2 = float(np.dot(conteos, cuadrados))
+        if momentos_superiores:
+            acumulador.m3 = float(np.dot(conteos, cuadrados * desvios))
+            acumulador.m4 = float(np.dot(conteos, cuadrados * cuadrados))
+        acumulador.minimo, acumulador.maximo = unicos[0], unicos[-1]
+        acumulador.valores_unicos, acumulador.conteos = unicos, conteos
+        return acumulador
+
+    @property
+    def con_frecuencias(self) -> bool:
+        return self.valores_unicos is not None
+
+    def actualizar(self, bloque) -> "AcumuladorEstadistico":
+        '''
+        Incorpora un bloque de valores (se ignoran los NaN).
+
+        :param bloque: Array o Serie con valores numéricos.
+        :return: El propio acumulador (permite encadenar llamadas).
+        '''
+        valores = np.asarray(bloque, dtype=np.float64)
+        valores = valores[~np.isnan(valores)]
+        if valores.size == 0:
+            return self
+
+        otro = AcumuladorEstadistico(self.momentos_superiores)
+        otro.n = valores.size
+        otro.suma = float(valores.sum())
+        otro.minimo = valores.min()
+        otro.maximo = valores.max()
+        otro.media = otro.suma / otro.n
+        desvios = valores - otro.media
+        cuadrados = desvios * desvios
+        otro.m2 = float(cuadrados.sum())
+        if self.momentos_superiores:
+            otro.m3 = float(np.dot(cuadrados, desvios))
+            otro.m4 = float(np.dot(cuadrados, cuadrados))
+        if self.con_frecuencias:
+            otro.valores_unicos, otro.conteos = contar_frecuencias(valores)
+        if self.sketch is not None:
+            self.sketch.actualizar(valores)
+        return self.combinar(otro)
+
+    def actualizar_por_bloques(self, valores, tamano_bloque: int = TAMANO_BLOQUE_MOMENTOS) -> "AcumuladorEstadistico":
+        '''
+        Incorpora un array completo recorriéndolo en bloques del tamaño de la caché.
+
+        :param valores: Array con valores numéricos.
+        :param tamano_bloque: Número de valores por bloque.
+        :return: El propio acumulador.
+        '''
+        valores = np.asarray(valores, dtype=np.float64)
+        for inicio in range(0, len(valores), tamano_bloque):
+            self.actualizar(valores[inicio:inicio + tamano_bloque])
+        return self
+
+    def incorporar_frecuencias(self, valores_unicos: np.ndarray, conteos: np.ndarray) -> "AcumuladorEstadistico":
+        '''
+        Fusiona una tabla de frecuencias ya calculada (p. ej. con contar_ordenados)
+        sin tocar los momentos, que deben haberse acumulado con los mismos datos.
+        '''
+        if self.con_frecuencias:
+            self.valores_unicos, self.conteos = combinar_frecuencias(
+                self.valores_unicos, self.conteos, valores_unicos, conteos)
+        else:
+            self.valores_unicos, self.conteos = valores_unicos, np.asarray(conteos, dtype=np.int64)
+        return self
+
+    def combinar(self, otro: "AcumuladorEstadistico") -> "AcumuladorEstadistico":
+        '''
+        Fusiona en este acumulador los estadísticos de otro (fórmulas de Chan / Pébay).
+        El resultado es exacto: equivale a haber acumulado ambos conjuntos juntos.
+
+        :param otro: Acumulador con los estadísticos parciales de otro bloque.
+        :return: El propio acumulador.
+        '''
+        if otro.n == 0:
+            return self
+        if self.con_frecuencias and otro.con_frecuencias:
+            self.valores_unicos, self.conteos = combinar_frecuencias(
+                self.valores_unicos, self.conteos, otro.valores_unicos, otro.conteos)
+        elif self.con_frecuencias:
+            raise ValueError("No se puede combinar con un acumulador sin tabla de frecuencias.")
+        if self.sketch is not None and otro.sketch is not None:
+            self.sketch.combinar(otro.sketch)
+
+        if self.n == 0:
+            self.n, self.suma, self.minimo, self.maximo = otro.n, otro.suma, otro.minimo, otro.maximo
+            self.media, self.m2, self.m3, self.m4 = otro.media, otro.m2, otro.m3, otro.m4
+            return self
+
+        n_a, n_b = self.n, otro.n
+        n = n_a + n_b
+        delta = otro.media - self.media
+
+        if self.momentos_superiores:
+            # M3 y M4 dependen de los M2/M3 previos: se actualizan antes que M2
+            self.m4 += (otro.m4
+                        + delta ** 4 * n_a * n_b * (n_a ** 2 - n_a * n_b + n_b ** 2) / n ** 3
+                        + 6 * delta ** 2 * (n_a ** 2 * otro.m2 + n_b ** 2 * self.m2) / n ** 2
+                        + 4 * delta * (n_a * otro.m3 - n_b * self.m3) / n)
+            self.m3 += (otro.m3
+                        + delta ** 3 * n_a * n_b * (n_a - n_b) / n ** 2
+                        + 3 * delta * (n_a * otro.m2 - n_b * self.m2) / n)
+
+        self.media += delta * n_b / n
+        self.m2 += otro.m2 + delta ** 2 * n_a * n_b / n
+        self.suma += otro.suma
+        self.n = n
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        return self
+
+    def quitar(self, bloque) -> "AcumuladorEstadistico":
+        '''
+        Elimina del acumulador un bloque de valores previamente incorporado, invirtiendo
+        las fórmulas de combinación. Requiere la tabla de frecuencias, de la que se
+        recuperan el mínimo y el máximo. No admite sketch (no es reversible).
+
+        :param bloque: Array o Serie con los valores a quitar.
+        :return: El propio acumulador.
+        '''
+        if not self.con_frecuencias or self.sketch is not None:
+            raise ValueError("Solo se pueden quitar valores de un acumulador con tabla de frecuencias y sin sketch.")
+        valores = np.asarray(bloque, dtype=np.float64)
+        valores = valores[~np.isnan(valores)]
+        if valores.size == 0:
+            return self
+
+        otro = AcumuladorEstadistico(self.momentos_superiores, frecuencias=True).actualizar(valores)
+        self.valores_unicos, self.conteos = restar_frecuencias(
+            self.valores_unicos, self.conteos, otro.valores_unicos, otro.conteos)
+
+        n, n_b = self.n, otro.n
+        n_a = n - n_b
+        if n_a == 0:
+            self.n, self.suma, self.media, self.m2, self.m3, self.m4 = 0, 0.0, 0.0, 0.0, 0.0, 0.0
+            self.minimo, self.maximo = np.inf, -np.inf
+            return self
+
+        # Se despejan los estadísticos de A de las fórmulas de combinar() (A + B = total)
+        media_a = (n * self.media - n_b * otro.media) / n_a
+        delta = otro.media - media_a
+        m2_a = self.m2 - otro.m2 - delta ** 2 * n_a * n_b / n
+        if self.momentos_superiores:
+            m3_a = (self.m3 - otro.m3
+                    - delta ** 3 * n_a * n_b * (n_a - n_b) / n ** 2
+                    - 3 * delta * (n_a * otro.m2 - n_b * m2_a) / n)
+            self.m4 = (self.m4 - otro.m4
+                       - delta ** 4 * n_a * n_b * (n_a ** 2 - n_a * n_b + n_b ** 2) / n ** 3
+                       - 6 * delta ** 2 * (n_a ** 2 * otro.m2 + n_b ** 2 * m2_a) / n ** 2
+                       - 4 * delta * (n_a * otro.m3 - n_b * m3_a) / n)
+            self.m3 = m3_a
+
+        self.n, self.media, self.m2 = n_a, media_a, max(m2_a, 0.0)
+        self.suma -= otro.suma
+        self.minimo, self.maximo = self.valores_unicos[0], self.valores_unicos[-1]
+        return self
+
+    def finalizar(self) -> dict:
+        '''
+        Devuelve las métricas acumuladas con las mismas claves que
+        calcular_metricas_principales. Sin tabla de frecuencias ni sketch solo incluye
+        las métricas basadas en momentos (n, minimo, maximo, media, varianza,
+        desviacion, coef_variacion, rango). Con sketch, los cuartiles y la mediana son
+        aproximados y su error estimado se añade en 'error_cuantiles'; la moda no
+        está disponible. Con momentos superiores añade las medidas de forma de
+        core.forma.medidas_forma: 'asimetria' y 'curtosis' (exceso, con la corrección
+        muestral de pandas), los coeficientes de Pearson y Bowley y Jarque–Bera.
+        '''
+        if self.n == 0:
+            metricas = {"n": 0, "minimo": np.nan, "maximo": np.nan, "media": np.nan,
+                        "varianza": np.nan, "desviacion": np.nan, "coef_variacion": np.nan,
+                        "rango": np.nan}
+        else:
+            varianza = self.m2 / (self.n - 1) if self.n > 1 else np.nan
+            desviacion = np.sqrt(varianza)
+            metricas = {
+                "n": self.n,
+                "minimo": self.minimo,
+                "maximo": self.maximo,
+                "media": self.media,
+                "varianza": varianza,
+                "desviacion": desviacion,
+                "coef_variacion": (desviacion / self.media) * 100 if self.media != 0 else 0,
+                "rango": self.maximo - self.minimo,
+            }
+
+        if self.con_frecuencias:
+            metricas.update(self._estadisticos_de_orden())
+        elif self.sketch is not None:
+            metricas.update(self._cuantiles_aproximados())
+        if self.momentos_superiores:
+            metricas.update(medidas_forma(self.n, self.m2, self.m3, self.m4,
+                                          **{clave: metricas[clave] for clave in _CLAVES_FORMA if clave in metricas}))
+        return _ordenar_claves(metricas)
+
+    def _estadisticos_de_orden(self) -> dict:
+        '''Cuartiles, mediana y moda exactos a partir de la tabla de frecuencias.'''
+        acumuladas = np.cumsum(self.conteos)
+        Q1 = cuantil_frecuencias(self.valores_unicos, self.conteos, 0.25, acumuladas)
+        Q3 = cuantil_frecuencias(self.valores_unicos, self.conteos, 0.75, acumuladas)
+        modas = self.valores_unicos[self.conteos == self.conteos.max()] if len(self.conteos) else self.valores_unicos
+        return {
+            "Q1": Q1,
+            "Q3": Q3,
+            "mediana": mediana_frecuencias(self.valores_unicos, self.conteos, acumuladas),
+            "moda": ", ".join(map(str, modas.tolist())),
+            "rango_intercuartilico": Q3 - Q1,
+        }
+
+    def _cuantiles_aproximados(self) -> dict:
+        '''Cuartiles y mediana estimados con el sketch, con su error en unidades de los datos.'''
+        (Q1, error_Q1), (mediana, error_mediana), (Q3, error_Q3) = (
+            self.sketch.cuantil_con_error(p) for p in (0.25, 0.5, 0.75))
+        return {
+            "Q1": Q1,
+            "Q3": Q3,
+            "mediana": mediana,
+            "moda": "N/D",
+            "rango_intercuartilico": Q3 - Q1,
+            "error_cuantiles": {"Q1": error_Q1, "mediana": error_mediana, "Q3": error_Q3},
+        }
+
+
+# Orden de claves de calcular_metricas_principales
+_CLAVES_METRICAS = ("n", "minimo", "maximo", "Q1", "Q3", "media", "mediana", "moda", "varianza",
+                    "desviacion", "coef_variacion", "rango", "rango_intercuartilico")
+
+
+# Métricas ya calculadas que usan los coeficientes de Pearson y Bowley
+_CLAVES_FORMA = ("media", "desviacion", "mediana", "Q1", "Q3")
+
+
+def _ordenar_claves(metricas: dict) -> dict:
+    ordenadas = {clave: metricas[clave] for clave in _CLAVES_METRICAS if clave in metricas}
+    ordenadas.update({clave: valor for clave, valor in metricas.items() if clave not in ordenadas})
+    return ordenadas
+
+
+def _acumular_particion(valores: np.ndarray, momentos_superiores: bool, frecuencias: bool,
+                        sketch_k: Optional[int], semilla: int) -> AcumuladorEstadistico:
+    '''Tarea de cada proceso: acumula su partición de los datos.'''
+    sketch = SketchCuantiles(sketch_k, semilla) if sketch_k else None
+    return AcumuladorEstadistico(momentos_superiores, frecuencias, sketch).actualizar_por_bloques(valores)
+
+
+def acumular_en_paralelo(valores, n_procesos: Optional[int] = None, momentos_superiores: bool = False,
+                         frecuencias: bool = False, sketch_k: Optional[int] = None) -> AcumuladorEstadistico:
+    '''
+    Reparte los valores entre procesos (concurrent.futures), acumula cada partición
+    por separado y combina los resultados parciales de forma exacta.
+
+    :param valores: Array con los valores numéricos.
+    :param n_procesos: Número de procesos (por defecto, todos los núcleos).
+    :param sketch_k: Si se indica, cada partición estima sus cuantiles con un sketch de parámetro k.
+    :return: Acumulador con los estadísticos de todos los valores.
+    '''
+    valores = np.asarray(valores, dtype=np.float64)
+    n_procesos = n_procesos or os.cpu_count() or 1
+    particiones = np.array_split(valores, n_procesos)
+
+    total = AcumuladorEstadistico(momentos_superiores, frecuencias,
+                                  SketchCuantiles(sketch_k) if sketch_k else None)
+    with ProcessPoolExecutor(max_workers=n_procesos) as ejecutor:
+        parciales = ejecutor.map(_acumular_particion, particiones,
+                                 [momentos_superiores] * n_procesos, [frecuencias] * n_procesos,
+                                 [sketch_k] * n_procesos, range(1, n_procesos + 1))
+        for parcial in parciales:
+            total.combinar(parcial)
+    return total
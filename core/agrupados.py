@@ -0,0 +1,106 @@
+# core/agrupados.py
+import numpy as np
+
+from core.forma import medidas_forma
+
+
+def cuantiles_agrupados(limites_inferiores, limites_superiores, frecuencias, probabilidades,
+                        acumuladas: np.ndarray = None) -> np.ndarray:
+    '''
+    Cuantiles de datos agrupados por interpolación lineal dentro de la clase:
+        Li + (p·N - F(i-1)) / fi · amplitud
+    siendo la clase i la primera cuya frecuencia acumulada alcanza p·N. Todas las
+    probabilidades se resuelven a la vez con una búsqueda binaria sobre las acumuladas.
+
+    :param limites_inferiores: Límite inferior de cada clase.
+    :param limites_superiores: Límite superior de cada clase.
+    :param frecuencias: Frecuencia absoluta de cada clase.
+    :param probabilidades: Escalar o array de probabilidades en [0, 1] (p. ej. deciles).
+    :param acumuladas: Frecuencias acumuladas ya calculadas, opcional.
+    :return: Array con un cuantil por probabilidad.
+    '''
+    limites_inferiores = np.asarray(limites_inferiores, dtype=np.float64)
+    limites_superiores = np.asarray(limites_superiores, dtype=np.float64)
+    frecuencias = np.asarray(frecuencias)
+    if acumuladas is None:
+        acumuladas = np.cumsum(frecuencias)
+
+    posiciones = np.asarray(probabilidades, dtype=np.float64) * acumuladas[-1]
+    clases = np.minimum(np.searchsorted(acumuladas, posiciones, side='left'), len(acumuladas) - 1)
+    anteriores = np.where(clases > 0, acumuladas[clases - 1], 0)
+    amplitudes = limites_superiores[clases] - limites_inferiores[clases]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return limites_inferiores[clases] + (posiciones - anteriores) / frecuencias[clases] * amplitudes
+
+
+def moda_agrupada(limites_inferiores, limites_superiores, frecuencias, marcas=None) -> float:
+    '''
+    Moda interpolada en la clase de mayor frecuencia (la primera si hay empate):
+        Li + d1 / (d1 + d2) · amplitud,  d1 = fi - f(i-1),  d2 = fi - f(i+1)
+    Si d1 + d2 = 0 se devuelve la marca de clase.
+    '''
+    frecuencias = np.asarray(frecuencias)
+    i = int(np.argmax(frecuencias))
+    anterior = frecuencias[i - 1] if i > 0 else 0
+    siguiente = frecuencias[i + 1] if i < len(frecuencias) - 1 else 0
+    d1 = frecuencias[i] - anterior
+    d2 = frecuencias[i] - siguiente
+    if d1 + d2 == 0:
+        if marcas is None:
+            return (limites_inferiores[i] + limites_superiores[i]) / 2
+        return marcas[i]
+    return limites_inferiores[i] + (d1 / (d1 + d2)) * (limites_superiores[i] - limites_inferiores[i])
+
+
+def metricas_agrupadas(limites_inferiores, limites_superiores, frecuencias, marcas=None) -> dict:
+    '''
+    Métricas de datos agrupados a partir de arrays de límites y frecuencias, en
+    O(k) y con cuartiles y mediana en una única búsqueda binaria.
+
+    :param marcas: Marcas de clase; por defecto el punto medio de cada clase.
+    :return: Diccionario con las mismas claves que calcular_metricas_principales, más las
+             medidas de forma (core.forma.medidas_forma) calculadas sobre las marcas de clase.
+    '''
+    limites_inferiores = np.asarray(limites_inferiores, dtype=np.float64)
+    limites_superiores = np.asarray(limites_superiores, dtype=np.float64)
+    frecuencias = np.asarray(frecuencias)
+    if marcas is None:
+        marcas = (limites_inferiores + limites_superiores) / 2
+    marcas = np.asarray(marcas, dtype=np.float64)
+
+    acumuladas = np.cumsum(frecuencias)
+    N = acumuladas[-1]
+
+    # Momentos ponderados por la frecuencia de cada marca de clase (M2, M3 y M4 de los
+    # mismos desvíos: la forma no necesita otra pasada)
+    media = np.dot(frecuencias, marcas) / N
+    desvios = marcas - media
+    ponderados = frecuencias * desvios * desvios
+    m2 = ponderados.sum()
+    m3 = np.dot(ponderados, desvios)
+    m4 = np.dot(ponderados, desvios * desvios)
+    varianza = m2 / (N - 1) if N > 1 else 0
+    desviacion = np.sqrt(varianza)
+    cv = (desviacion / media) * 100 if media != 0 else 0
+
+    Q1, mediana, Q3 = cuantiles_agrupados(limites_inferiores, limites_superiores, frecuencias,
+                                          (0.25, 0.5, 0.75), acumuladas)
+    moda = round(moda_agrupada(limites_inferiores, limites_superiores, frecuencias, marcas), 2)
+
+    metricas = {
+        "n": N,
+        "minimo": marcas.min(),
+        "maximo": marcas.max(),
+        "Q1": Q1,
+        "Q3": Q3,
+        "media": media,
+        "mediana": mediana,
+        "moda": moda,
+        "varianza": varianza,
+        "desviacion": desviacion,
+        "coef_variacion": cv,
+        "rango": limites_superiores.max() - limites_inferiores.min(),
+        "rango_intercuartilico": Q3 - Q1
+    }
+    metricas.update(medidas_forma(N, m2, m3, m4, media, desviacion, mediana, Q1, Q3))
+    return metricas
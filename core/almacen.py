@@ -0,0 +1,203 @@
+# core/almacen.py
+'''
+Almacén local de conjuntos de datos ya procesados. Cada propietario (usuario
+identificado o sesión del navegador) tiene su propio directorio, y en él cada
+conjunto se guarda una sola vez (identificado por la huella de sus valores) en
+un directorio con:
+
+    valores.npy      valores en el orden recibido (solo si no venían ordenados)
+    ordenados.npy    copia ordenada (sin NaN)
+    unicos.npy, conteos.npy   tabla de frecuencias
+    meta.json        nombre, fecha, n y métricas principales
+
+Al reabrirlo los arrays se abren como memoria mapeada (sin copiarlos ni volver a
+parsear el texto): métricas, tabla de frecuencias, intervalos con cualquier
+criterio y atípicos se obtienen de este índice (búsquedas binarias sobre la copia
+ordenada o la tabla de frecuencias), sin recorrer los datos.
+'''
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from core.analisis import _a_nativo
+from core.atipicos import analizar_atipicos
+from core.cache import huella_array
+from core.descriptive import ordenar_valores, calcular_metricas_principales, tabla_desde_frecuencias
+from core.frecuencias import contar_ordenados
+from core.intervals import calcular_numero_intervalos, calcular_limites, crear_intervalos
+
+# Versión del formato en disco (se comprueba al abrir)
+VERSION_ALMACEN = 1
+
+# Directorio por defecto (se puede cambiar con la variable de entorno STATBOARD_ALMACEN)
+RAIZ_PREDETERMINADA = Path.home() / ".statboard" / "almacen"
+
+
+class ConjuntoDatos:
+    '''Conjunto guardado en el almacén. Los arrays se abren (mapeados) la primera vez que se usan.'''
+
+    def __init__(self, ruta: Path):
+        self.ruta = Path(ruta)
+        with open(self.ruta / "meta.json", encoding="utf-8") as archivo:
+            self.meta = json.load(archivo)
+        if self.meta.get("version") != VERSION_ALMACEN:
+            raise ValueError(f"Versión de almacén no soportada en '{self.ruta.name}'.")
+        self._arrays = {}
+
+    def _array(self, nombre: str) -> np.ndarray:
+        if nombre not in self._arrays:
+            self._arrays[nombre] = np.load(self.ruta / f"{nombre}.npy", mmap_mode="r")
+        return self._arrays[nombre]
+
+    @property
+    def identificador(self) -> str:
+        return self.meta["identificador"]
+
+    @property
+    def nombre(self) -> str:
+        return self.meta["nombre"]
+
+    @property
+    def n(self) -> int:
+        '''Número de datos, incluidos los NaN (como la n de calcular_metricas_principales).'''
+        return self.meta["n"]
+
+    @property
+    def valores_ordenados(self) -> np.ndarray:
+        return self._array("ordenados")
+
+    @property
+    def valores(self) -> np.ndarray:
+        '''Valores en el orden en que se guardaron.'''
+        return self._array("valores") if self.meta["con_orden_original"] else self.valores_ordenados
+
+    def metricas(self) -> dict:
+        '''Métricas de calcular_metricas_principales, calculadas al guardar.'''
+        return dict(self.meta["metricas"])
+
+    def tabla_estadistica(self) -> pd.DataFrame:
+        '''Tabla de frecuencias (como crear_tabla_estadistica) a partir de la tabla guardada.'''
+        return tabla_desde_frecuencias(np.asarray(self._array("unicos")), np.asarray(self._array("conteos")), self.n)
+
+    def intervalos(self, criterio_intervalos: str) -> pd.DataFrame:
+        '''
+        Tabla de intervalos (como crear_intervalos) con cualquier criterio: k sale de los
+        metadatos y las frecuencias de búsquedas binarias sobre la copia ordenada.
+        '''
+        metricas = self.meta["metricas"]
+        # k se calcula con los datos válidos (sin NaN), como crear_intervalos
+        n_validos = len(self.valores_ordenados)
+        desviacion = metricas["desviacion"] if criterio_intervalos == "Regla de Scott" and n_validos > 1 else 0.0
+        k = calcular_numero_intervalos(criterio_intervalos, n_validos, metricas["rango"], desviacion)
+        limites = calcular_limites(metricas["minimo"], metricas["maximo"], k)
+        return crear_intervalos(None, criterio_intervalos, self.valores_ordenados, limites=limites)
+
+    def atipicos(self, metodo: str) -> dict:
+        '''Resumen de analizar_atipicos sobre la tabla de frecuencias (coste proporcional a los valores distintos).'''
+        return analizar_atipicos(np.asarray(self._array("unicos")), self.metricas(), metodo,
+                                 conteos=np.asarray(self._array("conteos")))
+
+
+class Almacen:
+    '''
+    Directorio de conjuntos de datos de un propietario. Guardar es idempotente (mismos
+    valores, mismo conjunto) y atómico: el conjunto se escribe en un directorio temporal
+    que se renombra al terminar, de modo que nunca se abre uno a medio escribir.
+
+    :param raiz: Directorio base (por defecto, STATBOARD_ALMACEN o RAIZ_PREDETERMINADA).
+    :param propietario: Identidad del propietario (p. ej. "usuario:<email>" o
+                        "sesion:<id>"); sus conjuntos van en un subdirectorio propio,
+                        nombrado por su huella. Sin propietario se usa la raíz.
+    '''
+
+    def __init__(self, raiz=None, propietario: Optional[str] = None):
+        self.raiz = Path(raiz or os.environ.get("STATBOARD_ALMACEN") or RAIZ_PREDETERMINADA)
+        if propietario is not None:
+            huella = hashlib.blake2b(propietario.encode("utf-8"), digest_size=16).hexdigest()
+            self.raiz = self.raiz / "propietarios" / huella
+
+    def guardar(self, valores, nombre: Optional[str] = None, n: Optional[int] = None) -> ConjuntoDatos:
+        '''
+        Guarda unos valores ya parseados con su índice.
+
+        :param valores: Array o Serie con los valores (los NaN no se guardan, pero cuentan en n).
+        :param nombre: Nombre descriptivo; por defecto, la fecha.
+        :param n: Número total de datos, si `valores` ya viene sin los NaN (p. ej. la copia
+                  ordenada de SesionIncremental, con n = n_valores). Por defecto, len(valores).
+        :return: El conjunto guardado (o el que ya existía con los mismos valores).
+        '''
+        valores = np.asarray(valores, dtype=np.float64)
+        n = len(valores) if n is None else int(n)
+        valores = valores[~np.isnan(valores)]
+        ordenados = ordenar_valores(valores)
+        if len(ordenados) == 0:
+            raise ValueError("No hay valores numéricos que guardar.")
+        identificador = huella_array(ordenados) + (f"-{n}" if n != len(ordenados) else "")
+        destino = self.raiz / identificador
+        if destino.exists():
+            return ConjuntoDatos(destino)
+
+        # n incluye los NaN, como en el análisis del texto (SesionIncremental.metricas)
+        metricas = calcular_metricas_principales(ordenados, valores_ordenados=ordenados, momentos_superiores=True)
+        metricas["n"] = n
+        unicos, conteos = contar_ordenados(ordenados)
+        con_orden_original = bool((np.diff(valores) < 0).any())
+        fecha = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+        temporal = self.raiz / f".{identificador}.{os.getpid()}.{time.monotonic_ns()}"
+        temporal.mkdir(parents=True)
+        try:
+            np.save(temporal / "ordenados.npy", ordenados)
+            if con_orden_original:
+                np.save(temporal / "valores.npy", valores)
+            np.save(temporal / "unicos.npy", unicos)
+            np.save(temporal / "conteos.npy", conteos)
+            with open(temporal / "meta.json", "w", encoding="utf-8") as archivo:
+                json.dump({
+                    "version": VERSION_ALMACEN,
+                    "identificador": identificador,
+                    "nombre": nombre or f"Datos {fecha}",
+                    "guardado": fecha,
+                    "n": n,
+                    "con_orden_original": con_orden_original,
+                    "metricas": _a_nativo(metricas),
+                }, archivo, ensure_ascii=False, indent=2)
+            os.replace(temporal, destino)
+        except OSError:
+            # Otro proceso guardó el mismo conjunto a la vez: se usa el suyo
+            shutil.rmtree(temporal, ignore_errors=True)
+            if not destino.exists():
+                raise
+        return ConjuntoDatos(destino)
+
+    def abrir(self, identificador: str) -> ConjuntoDatos:
+        ruta = self.raiz / identificador
+        if not (ruta / "meta.json").exists():
+            raise ValueError(f"No existe el conjunto de datos '{identificador}'.")
+        return ConjuntoDatos(ruta)
+
+    def listar(self) -> pd.DataFrame:
+        '''Conjuntos guardados (más recientes primero), sin abrir sus arrays.'''
+        filas = []
+        if self.raiz.exists():
+            for ruta in self.raiz.iterdir():
+                if ruta.name.startswith(".") or not (ruta / "meta.json").exists():
+                    continue
+                with open(ruta / "meta.json", encoding="utf-8") as archivo:
+                    meta = json.load(archivo)
+                filas.append({"identificador": meta["identificador"], "nombre": meta["nombre"],
+                              "n": meta["n"], "guardado": meta["guardado"]})
+        tabla = pd.DataFrame(filas, columns=["identificador", "nombre", "n", "guardado"])
+        return tabla.sort_values("guardado", ascending=False, ignore_index=True)
+
+    def eliminar(self, identificador: str):
+        '''Borra un conjunto guardado (no hace nada si no existe).'''
+        shutil.rmtree(self.raiz / identificador, ignore_errors=True)
@@ -0,0 +1,191 @@
+# core/analisis.py
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.acumulador import AcumuladorEstadistico
+from core.agrupados import metricas_agrupadas
+from core.atipicos import analizar_atipicos, METODOS_ATIPICOS
+from core.descriptive import (crear_tabla_estadistica, calcular_metricas_principales,
+                              calcular_metricas_agrupadas, ordenar_valores, tabla_desde_frecuencias)
+from core.frecuencias import validar_conteos
+from core.intervals import crear_intervalos
+
+TIPOS_DATOS = ("Discretos", "Por Intervalos")
+
+
+class ResultadoAnalisis(NamedTuple):
+    tabla: pd.DataFrame           # Tabla de frecuencias (columna 'Valores' + fi, hi, pi, Fi, Hi)
+    metricas: dict                # Métricas principales o agrupadas
+    atipicos: dict                # Resumen acotado de valores atípicos
+    tipo_datos: str               # "Discretos" o "Por Intervalos"
+
+    def resumen(self) -> dict:
+        '''Métricas y atípicos como tipos nativos de Python (serializables a JSON).'''
+        return {
+            "tipo_datos": self.tipo_datos,
+            "metricas": _a_nativo(self.metricas),
+            "atipicos": _a_nativo(self.atipicos),
+        }
+
+
+def _a_nativo(valor):
+    '''Convierte escalares y arrays de NumPy (también anidados) a tipos nativos.'''
+    if isinstance(valor, dict):
+        return {clave: _a_nativo(v) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_a_nativo(v) for v in valor]
+    if isinstance(valor, (np.generic, np.ndarray)):
+        return valor.tolist()
+    return valor
+
+
+def completar_tabla_intervalos(tabla_intervalos: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Añade a la tabla de intervalos (ver crear_intervalos) las frecuencias relativas,
+    porcentajes y acumuladas, y la columna 'Valores' (marca de clase) que usan los
+    gráficos y las métricas agrupadas. Se calculan sobre la propia tabla para no
+    perder los intervalos vacíos.
+
+    :return: Nueva tabla (la de entrada no se modifica).
+    '''
+    tabla = tabla_intervalos.copy()
+    total_n = tabla['Frecuencia Absoluta (fi)'].sum()
+
+    tabla['Frecuencia Relativa (hi)'] = tabla['Frecuencia Absoluta (fi)'] / total_n
+    tabla['Porcentaje (pi)'] = tabla['Frecuencia Relativa (hi)'] * 100
+    tabla['Frecuencia Acumulada (Fi)'] = tabla['Frecuencia Absoluta (fi)'].cumsum()
+    tabla['Frecuencia Rel Acumulada (Hi)'] = tabla['Frecuencia Relativa (hi)'].cumsum()
+    tabla['Valores'] = tabla['Marca de Clase']
+    return tabla
+
+
+def tabla_con_valores(tabla_estadistica: pd.DataFrame) -> pd.DataFrame:
+    '''Pasa el índice de valores de la tabla discreta a una columna 'Valores'.'''
+    tabla = tabla_estadistica.reset_index()
+    return tabla.rename(columns={tabla.columns[0]: 'Valores'})
+
+
+def analizar(valores, tipo_datos: str = "Discretos", criterio_intervalos: Optional[str] = None,
+             metodo_atipicos: str = METODOS_ATIPICOS[0], sketch_k: Optional[int] = None,
+             valores_ordenados: Optional[np.ndarray] = None) -> ResultadoAnalisis:
+    '''
+    Análisis completo de una variable: tabla de frecuencias, métricas y atípicos.
+    No depende de Streamlit, de modo que sirve igual para la aplicación que para
+    procesos por lotes (ver cli.py).
+
+    :param valores: Serie o array con los valores numéricos.
+    :param tipo_datos: "Discretos" o "Por Intervalos".
+    :param criterio_intervalos: Criterio de crear_intervalos (obligatorio por intervalos).
+    :param metodo_atipicos: Uno de METODOS_ATIPICOS.
+    :param sketch_k: Cuartiles aproximados con un sketch KLL de parámetro k (solo discretos).
+    :param valores_ordenados: Copia ordenada ya calculada (ver ordenar_valores).
+    :return: ResultadoAnalisis(tabla, metricas, atipicos, tipo_datos).
+    '''
+    if tipo_datos not in TIPOS_DATOS:
+        raise ValueError(f"Tipo de datos no reconocido: '{tipo_datos}'.")
+    serie = valores if isinstance(valores, pd.Series) else pd.Series(np.asarray(valores, dtype=np.float64), copy=False)
+
+    if tipo_datos == "Por Intervalos":
+        if criterio_intervalos is None:
+            raise ValueError("El análisis por intervalos requiere un criterio de intervalos.")
+        sketch_k = None
+    if valores_ordenados is None and not sketch_k:
+        valores_ordenados = ordenar_valores(serie)
+
+    if tipo_datos == "Por Intervalos":
+        tabla = completar_tabla_intervalos(crear_intervalos(serie, criterio_intervalos, valores_ordenados))
+        metricas = calcular_metricas_agrupadas(tabla)
+    else:
+        tabla = tabla_con_valores(crear_tabla_estadistica(serie))
+        metricas = calcular_metricas_principales(serie, valores_ordenados, momentos_superiores=True, sketch_k=sketch_k)
+
+    if valores_ordenados is not None:
+        atipicos = analizar_atipicos(valores_ordenados, metricas, metodo_atipicos)
+    else:
+        atipicos = analizar_atipicos(serie.to_numpy(), metricas, metodo_atipicos, ordenados=False)
+    return ResultadoAnalisis(tabla, metricas, atipicos, tipo_datos)
+
+
+def analizar_frecuencias(valores, conteos, tipo_datos: str = "Discretos",
+                         criterio_intervalos: Optional[str] = None,
+                         metodo_atipicos: str = METODOS_ATIPICOS[0]) -> ResultadoAnalisis:
+    '''
+    Análisis completo de una tabla ya agregada (valor, frecuencia), sin expandirla:
+    tiempo y memoria proporcionales al número de filas, no al total de datos.
+
+    :param valores: Valores de la tabla (pueden repetirse o venir desordenados).
+    :param conteos: Frecuencia de cada valor (enteros no negativos).
+    :return: ResultadoAnalisis equivalente al de analizar() sobre los datos expandidos.
+    '''
+    if tipo_datos not in TIPOS_DATOS:
+        raise ValueError(f"Tipo de datos no reconocido: '{tipo_datos}'.")
+    acumulador = AcumuladorEstadistico.desde_frecuencias(valores, conteos, momentos_superiores=True)
+    unicos, conteos = acumulador.valores_unicos, acumulador.conteos
+    if len(unicos) == 0:
+        raise ValueError("La tabla no contiene frecuencias positivas.")
+
+    if tipo_datos == "Por Intervalos":
+        if criterio_intervalos is None:
+            raise ValueError("El análisis por intervalos requiere un criterio de intervalos.")
+        tabla = completar_tabla_intervalos(crear_intervalos(None, criterio_intervalos, unicos, conteos=conteos))
+        metricas = calcular_metricas_agrupadas(tabla)
+    else:
+        tabla = tabla_con_valores(tabla_desde_frecuencias(unicos, conteos))
+        metricas = acumulador.finalizar()
+
+    atipicos = analizar_atipicos(unicos, metricas, metodo_atipicos, conteos=conteos)
+    return ResultadoAnalisis(tabla, metricas, atipicos, tipo_datos)
+
+
+def analizar_clases(limites_inferiores, limites_superiores, conteos,
+                    metodo_atipicos: str = METODOS_ATIPICOS[0]) -> ResultadoAnalisis:
+    '''
+    Análisis de una tabla de clases ya agregada (límite inferior, límite superior,
+    frecuencia). Los atípicos se evalúan sobre las marcas de clase ponderadas.
+
+    :return: ResultadoAnalisis con tipo_datos "Por Intervalos".
+    '''
+    limites_inferiores = np.asarray(limites_inferiores, dtype=np.float64)
+    limites_superiores = np.asarray(limites_superiores, dtype=np.float64)
+    conteos = validar_conteos(conteos)
+    if len(conteos) == 0 or conteos.sum() == 0:
+        raise ValueError("La tabla no contiene frecuencias positivas.")
+    if (limites_superiores <= limites_inferiores).any():
+        raise ValueError("Cada límite superior debe ser mayor que su límite inferior.")
+
+    orden = np.argsort(limites_inferiores, kind='stable')
+    limites_inferiores, limites_superiores, conteos = (
+        limites_inferiores[orden], limites_superiores[orden], conteos[orden])
+    if (limites_inferiores[1:] < limites_superiores[:-1]).any():
+        raise ValueError("Las clases no pueden solaparse.")
+
+    marcas = (limites_inferiores + limites_superiores) / 2
+    tabla = completar_tabla_intervalos(pd.DataFrame({
+        'Límite Inferior': limites_inferiores,
+        'Límite Superior': limites_superiores,
+        'Marca de Clase': marcas,
+        'Frecuencia Absoluta (fi)': conteos
+    }))
+    metricas = metricas_agrupadas(limites_inferiores, limites_superiores, conteos, marcas)
+
+    con_datos = conteos > 0
+    atipicos = analizar_atipicos(marcas[con_datos], metricas, metodo_atipicos, conteos=conteos[con_datos])
+    return ResultadoAnalisis(tabla, metricas, atipicos, "Por Intervalos")
+
+
+def analizar_tabla(tabla: np.ndarray, tipo_datos: str = "Discretos",
+                   criterio_intervalos: Optional[str] = None,
+                   metodo_atipicos: str = METODOS_ATIPICOS[0]) -> ResultadoAnalisis:
+    '''
+    Analiza una tabla agregada según su número de columnas (ver parser.parsear_tabla):
+    2 columnas = (valor, frecuencia); 3 columnas = (límite inferior, límite superior, frecuencia).
+    '''
+    tabla = np.asarray(tabla, dtype=np.float64)
+    if tabla.ndim != 2 or tabla.shape[1] not in (2, 3):
+        raise ValueError("La tabla debe tener 2 columnas (valor, frecuencia) "
+                         "o 3 (límite inferior, límite superior, frecuencia).")
+    if tabla.shape[1] == 2:
+        return analizar_frecuencias(tabla[:, 0], tabla[:, 1], tipo_datos, criterio_intervalos, metodo_atipicos)
+    return analizar_clases(tabla[:, 0], tabla[:, 1], tabla[:, 2], metodo_atipicos)
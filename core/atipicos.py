@@ -0,0 +1,186 @@
+# core/atipicos.py
+import numpy as np
+
+from core.frecuencias import cuantil_ordenado, cuantil_frecuencias, mediana_frecuencias
+
+METODOS_ATIPICOS = ("Tukey (1.5 IQR)", "MAD", "Percentiles")
+
+# Constante que hace de la MAD un estimador consistente de σ en datos normales
+ESCALA_MAD = 1.4826
+
+
+def _kesimo_desvio(valores_ordenados: np.ndarray, centro: float, k: int) -> float:
+    '''
+    k-ésimo (desde 0) menor desvío absoluto |x - centro| sobre un array ordenado,
+    en O(log n) y sin construir el array de desvíos.
+
+    Los desvíos a la izquierda del centro (A) y a la derecha (B) ya están ordenados,
+    así que basta una búsqueda binaria sobre cuántos elementos aporta cada lado.
+    '''
+    m = int(np.searchsorted(valores_ordenados, centro, side='left'))
+    n_a, n_b = m, len(valores_ordenados) - m
+
+    def a(i):
+        return centro - valores_ordenados[m - 1 - i]
+
+    def b(j):
+        return valores_ordenados[m + j] - centro
+
+    tomados = k + 1
+    inferior, superior = max(0, tomados - n_b), min(tomados, n_a)
+    while True:
+        i = (inferior + superior) // 2
+        j = tomados - i
+        if i > 0 and j < n_b and a(i - 1) > b(j):
+            superior = i - 1
+        elif j > 0 and i < n_a and b(j - 1) > a(i):
+            inferior = i + 1
+        else:
+            return max(a(i - 1) if i > 0 else -np.inf, b(j - 1) if j > 0 else -np.inf)
+
+
+def calcular_mad(valores, mediana: float, ordenados: bool = True, conteos: np.ndarray = None) -> float:
+    '''
+    Desviación absoluta mediana (MAD) respecto de la mediana dada.
+
+    :param valores: Valores numéricos (ordenados si ordenados=True).
+    :param mediana: Mediana de los valores.
+    :param ordenados: Si los valores ya están ordenados se calcula en O(log n) y sin copias.
+    :param conteos: Frecuencia de cada valor, si `valores` son los valores únicos de
+                    una tabla de frecuencias (mediana ponderada de los desvíos).
+    '''
+    n = len(valores)
+    if n == 0:
+        return np.nan
+    if conteos is not None:
+        desvios = np.abs(np.asarray(valores, dtype=np.float64) - mediana)
+        orden = np.argsort(desvios, kind='stable')
+        return float(mediana_frecuencias(desvios[orden], np.asarray(conteos)[orden]))
+    if not ordenados:
+        return float(np.median(np.abs(np.asarray(valores, dtype=np.float64) - mediana)))
+    if n % 2:
+        return float(_kesimo_desvio(valores, mediana, n // 2))
+    return float(_kesimo_desvio(valores, mediana, n // 2 - 1) + _kesimo_desvio(valores, mediana, n // 2)) / 2
+
+
+def calcular_limites(metodo: str, valores, metricas: dict, ordenados: bool = True,
+                     factor_tukey: float = 1.5, factor_mad: float = 3.0,
+                     percentiles: tuple = (0.01, 0.99), conteos: np.ndarray = None) -> tuple:
+    '''
+    Calcula los límites (inferior, superior) fuera de los cuales un valor es atípico.
+
+    - Tukey: [Q1 - 1.5·IQR, Q3 + 1.5·IQR], con los cuartiles de `metricas`.
+    - MAD: mediana ± 3 · 1.4826 · MAD (robusto frente a colas pesadas).
+    - Percentiles: [P1, P99] por defecto.
+
+    :param metodo: Uno de METODOS_ATIPICOS.
+    :param valores: Valores numéricos (ordenados si ordenados=True).
+    :param metricas: Diccionario de métricas con Q1, Q3, rango_intercuartilico y mediana.
+    :param conteos: Frecuencias, si `valores` son los valores únicos de una tabla de frecuencias.
+    :return: Tupla (limite_inferior, limite_superior).
+    '''
+    if metodo == "Tukey (1.5 IQR)":
+        iqr = metricas['rango_intercuartilico']
+        return metricas['Q1'] - factor_tukey * iqr, metricas['Q3'] + factor_tukey * iqr
+
+    if metodo == "MAD":
+        mediana = metricas['mediana']
+        mad = calcular_mad(valores, mediana, ordenados, conteos)
+        return mediana - factor_mad * ESCALA_MAD * mad, mediana + factor_mad * ESCALA_MAD * mad
+
+    if metodo == "Percentiles":
+        p_inferior, p_superior = percentiles
+        if conteos is not None:
+            return (cuantil_frecuencias(valores, conteos, p_inferior),
+                    cuantil_frecuencias(valores, conteos, p_superior))
+        if ordenados:
+            return cuantil_ordenado(valores, p_inferior), cuantil_ordenado(valores, p_superior)
+        limites = np.quantile(np.asarray(valores, dtype=np.float64), percentiles)
+        return float(limites[0]), float(limites[1])
+
+    raise ValueError(f"Método de detección de atípicos no reconocido: '{metodo}'.")
+
+
+def _inicios_unicos(tramo_ordenado: np.ndarray) -> np.ndarray:
+    '''Posición de la primera aparición de cada valor distinto de un tramo ordenado.'''
+    if len(tramo_ordenado) == 0:
+        return np.empty(0, dtype=np.intp)
+    return np.concatenate(([0], np.flatnonzero(tramo_ordenado[1:] != tramo_ordenado[:-1]) + 1))
+
+
+def detectar_atipicos(valores, limite_inferior: float, limite_superior: float, ordenados: bool = True,
+                      top_k: int = 10, max_unicos: int = 50, metodo: str = None,
+                      conteos: np.ndarray = None) -> dict:
+    '''
+    Localiza los valores atípicos y devuelve un resumen acotado en lugar de copiarlos todos.
+
+    Sobre datos ordenados los atípicos forman un prefijo y un sufijo del array: sus
+    conteos salen de dos búsquedas binarias y los extremos son vistas, sin copias.
+    Con datos sin ordenar solo se extraen (y ordenan) los propios atípicos.
+
+    :param valores: Valores numéricos.
+    :param limite_inferior: Los valores menores que este límite son atípicos.
+    :param limite_superior: Los valores mayores que este límite son atípicos.
+    :param ordenados: Indica si `valores` ya está ordenado (sin NaN).
+    :param top_k: Número de valores más extremos a devolver por cada lado.
+    :param max_unicos: Máximo de valores atípicos distintos a listar (los más extremos).
+    :param metodo: Método con el que se calcularon los límites (informativo).
+    :param conteos: Frecuencia de cada valor, si `valores` son los valores únicos
+                    ordenados de una tabla de frecuencias (no se expanden los datos).
+    :return: Diccionario con límites, conteos, extremos y valores únicos (acotados).
+    '''
+    if ordenados or conteos is not None:
+        corte_inferior = int(np.searchsorted(valores, limite_inferior, side='left'))
+        corte_superior = int(np.searchsorted(valores, limite_superior, side='right'))
+        inferiores = valores[:corte_inferior]
+        superiores = valores[corte_superior:]
+    else:
+        valores = np.asarray(valores, dtype=np.float64)
+        inferiores = np.sort(valores[valores < limite_inferior])
+        superiores = np.sort(valores[valores > limite_superior])
+
+    if conteos is None:
+        n_inferiores, n_superiores = len(inferiores), len(superiores)
+        extremos_inferiores = inferiores[:top_k]
+        extremos_superiores = superiores[::-1][:top_k]
+        inicios_inf = _inicios_unicos(inferiores)
+        inicios_sup = _inicios_unicos(superiores)
+    else:
+        # Cada valor único aporta su frecuencia; los extremos se repiten según ella
+        conteos_inf, conteos_sup = conteos[:corte_inferior], conteos[corte_superior:]
+        n_inferiores, n_superiores = int(conteos_inf.sum()), int(conteos_sup.sum())
+        extremos_inferiores = np.repeat(inferiores[:top_k], conteos_inf[:top_k])[:top_k]
+        extremos_superiores = np.repeat(superiores[::-1][:top_k], conteos_sup[::-1][:top_k])[:top_k]
+        inicios_inf = np.arange(len(inferiores))
+        inicios_sup = np.arange(len(superiores))
+
+    # El cupo de valores distintos se reparte entre ambos lados (el sobrante de uno
+    # pasa al otro) y en cada lado se listan los más extremos
+    cupo_inf = min(len(inicios_inf), max(max_unicos // 2, max_unicos - len(inicios_sup)))
+    cupo_sup = min(len(inicios_sup), max_unicos - cupo_inf)
+    unicos_inf = inferiores[inicios_inf[:cupo_inf]]
+    unicos_sup = superiores[inicios_sup[len(inicios_sup) - cupo_sup:]]
+
+    return {
+        "metodo": metodo,
+        "limite_inferior": limite_inferior,
+        "limite_superior": limite_superior,
+        "n_inferiores": n_inferiores,
+        "n_superiores": n_superiores,
+        "n_atipicos": n_inferiores + n_superiores,
+        "extremos_inferiores": extremos_inferiores.tolist(),
+        "extremos_superiores": extremos_superiores.tolist(),
+        "n_unicos": len(inicios_inf) + len(inicios_sup),
+        "unicos": unicos_inf.tolist() + unicos_sup.tolist(),
+    }
+
+
+def analizar_atipicos(valores, metricas: dict, metodo: str = "Tukey (1.5 IQR)", ordenados: bool = True,
+                      top_k: int = 10, max_unicos: int = 50, conteos: np.ndarray = None) -> dict:
+    '''
+    Calcula los límites con el método elegido y resume los atípicos en una sola llamada.
+    Con `conteos`, `valores` son los valores únicos ordenados de una tabla de frecuencias.
+    '''
+    limite_inferior, limite_superior = calcular_limites(metodo, valores, metricas, ordenados, conteos=conteos)
+    return detectar_atipicos(valores, limite_inferior, limite_superior, ordenados, top_k, max_unicos, metodo,
+                             conteos=conteos)
@@ -0,0 +1,338 @@
+# core/bootstrap.py
+'''
+Intervalos de confianza bootstrap (percentil) para las métricas principales:
+media, mediana, Q1, Q3, desviación estándar y coeficiente de variación.
+
+Las remuestras se generan por lotes y cada lote se evalúa de forma vectorizada
+(una fila por remuestra), con las mismas definiciones que calcular_metricas_principales:
+    - núcleo de índices: matriz (lote, n) de índices sobre la copia ordenada; los
+      estadísticos de orden salen de np.partition sobre los índices, sin ordenar
+      cada remuestra.
+    - núcleo de conteos: con muchos valores repetidos (o partiendo de una tabla de
+      frecuencias) cada remuestra es un vector multinomial de conteos sobre los
+      valores distintos, de coste proporcional a su número y no a n.
+
+Cada lote tiene su propio flujo aleatorio (SeedSequence.spawn), de modo que el
+resultado final no depende del número de procesos ni del orden en que terminan
+los lotes. Los lotes se reparten entre procesos y los intervalos se recalculan a
+medida que llegan, por lo que pueden mostrarse antes de terminar y cortarse por
+tiempo o por cancelación.
+
+Los procesos forman un único grupo compartido por todas las sesiones, arrancado
+con forkserver (o spawn) y no con fork: la aplicación tiene varios hilos y un fork
+podría heredar cerrojos tomados. Los datos de cada cálculo se vuelcan una sola vez
+a un archivo mapeado en memoria que los procesos abren por su ruta; su primer byte
+es la señal de parada, que los procesos consultan entre trozos de cada lote.
+'''
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterator, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.frecuencias import contar_ordenados, normalizar_frecuencias, _interpolar
+
+# Estadísticos con intervalo, en el orden de las columnas de cada lote
+ESTADISTICOS_BOOTSTRAP = ("media", "mediana", "Q1", "Q3", "desviacion", "coef_variacion")
+
+NIVELES_CONFIANZA = (0.90, 0.95, 0.99)
+N_REMUESTRAS = 2000
+
+# Elementos (remuestras × valores) por lote: acota la memoria de cada lote (~16 bytes por elemento)
+MAX_ELEMENTOS_LOTE = 1_000_000
+
+# Lotes mínimos en que se divide el trabajo, para repartirlo y poder informar el progreso
+MIN_LOTES = 8
+
+# Con menos valores distintos que n / FACTOR_CONTEOS se usa el núcleo de conteos
+FACTOR_CONTEOS = 4
+
+# Trabajo (n × remuestras) por debajo del cual no compensa repartir los lotes entre procesos
+MIN_TRABAJO_PARALELO = 20_000_000
+
+# Elementos (remuestras × valores) por trozo de lote: cada cuánto se comprueba si hay que parar
+ELEMENTOS_TROZO = 125_000
+
+# Alineación en bytes de los arrays dentro del archivo compartido (el byte 0 es la señal de parada)
+ALINEACION_COMPARTIDO = 64
+
+
+class ResultadoBootstrap(NamedTuple):
+    intervalos: pd.DataFrame    # Índice: estadístico; columnas estimacion, inferior, superior, error_estandar
+    remuestras: int             # Remuestras evaluadas hasta el momento
+    solicitadas: int            # Remuestras pedidas
+    nivel: float                # Nivel de confianza
+
+    @property
+    def completo(self) -> bool:
+        return self.remuestras >= self.solicitadas
+
+
+class Remuestreo:
+    '''
+    Datos a remuestrear y núcleo elegido. Se construye con la copia ordenada de los
+    valores o con una tabla de frecuencias (valores distintos y conteos); los procesos
+    lo reciben a través de un archivo mapeado en memoria (ver _volcar_remuestreo).
+    '''
+
+    def __init__(self, valores_ordenados: Optional[np.ndarray] = None,
+                 valores_unicos=None, conteos=None):
+        if valores_ordenados is not None:
+            self.valores_ordenados = np.asarray(valores_ordenados, dtype=np.float64)
+            self.valores_unicos, self.conteos = contar_ordenados(self.valores_ordenados)
+            self.n = len(self.valores_ordenados)
+        else:
+            self.valores_unicos, self.conteos = normalizar_frecuencias(valores_unicos, conteos)
+            self.valores_ordenados = None
+            self.n = int(self.conteos.sum())
+        if self.n < 2:
+            raise ValueError("Se necesitan al menos 2 valores para el bootstrap.")
+
+        self.por_conteos = (self.valores_ordenados is None
+                            or len(self.valores_unicos) * FACTOR_CONTEOS <= self.n)
+        if self.por_conteos:
+            # Solo hace falta la tabla: no se copia la serie completa a los procesos
+            self.valores_ordenados = None
+            self._probabilidades = self.conteos / self.n
+            # Desvíos respecto de la media original (evita la cancelación en la varianza)
+            self._centro = float(self.conteos @ self.valores_unicos / self.n)
+
+        # Posiciones (desde 0) de los estadísticos de orden: mediana y cuartiles
+        self._h = {p: (self.n - 1) * p for p in (0.25, 0.75)}
+        rangos = {self.n // 2, (self.n - 1) // 2}
+        for h in self._h.values():
+            rangos |= {int(np.floor(h)), min(int(np.floor(h)) + 1, self.n - 1)}
+        self._rangos = np.array(sorted(rangos), dtype=np.intp)
+
+    @property
+    def coste(self) -> int:
+        '''Elementos que ocupa una remuestra en el núcleo elegido.'''
+        return len(self.valores_unicos) if self.por_conteos else self.n
+
+    def tamano_lote(self, n_remuestras: int) -> int:
+        return int(np.clip(MAX_ELEMENTOS_LOTE // self.coste, 1, -(-n_remuestras // MIN_LOTES)))
+
+    def estimacion(self) -> np.ndarray:
+        '''Estadísticos de la muestra original (una fila de lote).'''
+        return self._estadisticos(self.conteos[np.newaxis, :]) if self.por_conteos \
+            else self._estadisticos_indices(np.arange(self.n)[np.newaxis, :])
+
+    def lote(self, semilla: np.random.SeedSequence, tamano: int,
+             detener: Optional[Callable[[], bool]] = None) -> Optional[np.ndarray]:
+        '''
+        Evalúa un lote de remuestras, por trozos de ELEMENTOS_TROZO elementos.
+
+        :param detener: Función opcional que se consulta antes de cada trozo; si devuelve
+                        True el lote se abandona.
+        :return: Array (tamano, len(ESTADISTICOS_BOOTSTRAP)), o None si se abandonó.
+        '''
+        rng = np.random.default_rng(semilla)
+        filas = max(1, ELEMENTOS_TROZO // self.coste)
+        trozos = []
+        for inicio in range(0, tamano, filas):
+            if detener is not None and detener():
+                return None
+            filas_trozo = min(filas, tamano - inicio)
+            if self.por_conteos:
+                trozos.append(self._estadisticos(rng.multinomial(self.n, self._probabilidades,
+                                                                 size=filas_trozo)))
+            else:
+                trozos.append(self._estadisticos_indices(rng.integers(0, self.n, size=(filas_trozo, self.n))))
+        return np.concatenate(trozos)
+
+    def _estadisticos_indices(self, indices: np.ndarray) -> np.ndarray:
+        muestras = self.valores_ordenados[indices]
+        media = muestras.mean(axis=1)
+        varianza = muestras.var(axis=1, ddof=1)
+        # Los valores están ordenados: basta particionar los índices en los rangos necesarios
+        orden = self.valores_ordenados[np.partition(indices, self._rangos, axis=1)[:, self._rangos]]
+        return self._componer(media, varianza, orden)
+
+    def _estadisticos(self, conteos: np.ndarray) -> np.ndarray:
+        desvios = self.valores_unicos - self._centro
+        suma = conteos @ desvios
+        media = self._centro + suma / self.n
+        varianza = (conteos @ (desvios * desvios) - suma * suma / self.n) / (self.n - 1)
+        acumuladas = np.cumsum(conteos, axis=1)
+        # Valor en cada rango: el primero cuya frecuencia acumulada lo supera
+        posiciones = (acumuladas[:, :, np.newaxis] <= self._rangos).sum(axis=1)
+        return self._componer(media, varianza, self.valores_unicos[posiciones])
+
+    def _componer(self, media: np.ndarray, varianza: np.ndarray, orden: np.ndarray) -> np.ndarray:
+        '''Columnas de ESTADISTICOS_BOOTSTRAP a partir de los momentos y los valores en self._rangos.'''
+        en_rango = {int(r): orden[:, i] for i, r in enumerate(self._rangos)}
+        n = self.n
+        mediana = en_rango[n // 2] if n % 2 else (en_rango[n // 2 - 1] + en_rango[n // 2]) / 2
+        cuartiles = []
+        for h in self._h.values():
+            i = int(np.floor(h))
+            cuartiles.append(_interpolar(en_rango[i], en_rango[min(i + 1, n - 1)], h - i))
+        desviacion = np.sqrt(np.maximum(varianza, 0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            coef_variacion = np.where(media != 0, desviacion / media * 100, 0)
+        return np.column_stack((media, mediana, cuartiles[0], cuartiles[1], desviacion, coef_variacion))
+
+
+def intervalos_percentil(estimacion: np.ndarray, replicas: np.ndarray, nivel: float) -> pd.DataFrame:
+    '''
+    Intervalos percentil y error estándar de cada estadístico a partir de las réplicas.
+    Sin réplicas (cancelado o sin tiempo antes del primer lote) los límites son NaN.
+    '''
+    alfa = 1 - nivel
+    if len(replicas):
+        inferior, superior = np.quantile(replicas, [alfa / 2, 1 - alfa / 2], axis=0)
+    else:
+        inferior = superior = np.full(len(ESTADISTICOS_BOOTSTRAP), np.nan)
+    return pd.DataFrame({
+        "estimacion": estimacion.ravel(),
+        "inferior": inferior,
+        "superior": superior,
+        "error_estandar": replicas.std(axis=0, ddof=1) if len(replicas) > 1 else np.nan,
+    }, index=pd.Index(ESTADISTICOS_BOOTSTRAP, name="estadistico"))
+
+
+# Grupo de procesos compartido por todas las sesiones (se crea al primer uso)
+_ejecutor: Optional[ProcessPoolExecutor] = None
+_cerrojo_ejecutor = threading.Lock()
+
+
+def _enviar_lote(compartido: tuple, semilla: np.random.SeedSequence, tamano: int):
+    '''Envía un lote al grupo de procesos compartido, creándolo (o recreándolo si se rompió).'''
+    global _ejecutor
+    with _cerrojo_ejecutor:
+        for _ in range(2):
+            if _ejecutor is None:
+                metodos = multiprocessing.get_all_start_methods()
+                contexto = multiprocessing.get_context("forkserver" if "forkserver" in metodos else "spawn")
+                _ejecutor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=contexto)
+            try:
+                return _ejecutor.submit(_lote_trabajador, compartido, semilla, tamano)
+            except BrokenProcessPool:
+                _ejecutor = None
+        raise BrokenProcessPool("No se pudo arrancar el grupo de procesos del bootstrap.")
+
+
+def _volcar_remuestreo(remuestreo: Remuestreo) -> tuple:
+    '''
+    Vuelca los arrays del remuestreo a un archivo temporal (en /dev/shm si existe, es
+    decir, en memoria) tras un byte de parada a 0. Quien lo llama debe borrar el archivo.
+
+    :return: Tupla (ruta, atributos sin arrays, [(atributo, dtype, forma, desplazamiento)]).
+    '''
+    atributos, disposicion = {}, []
+    directorio = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    descriptor, ruta = tempfile.mkstemp(prefix="statboard_bootstrap_", dir=directorio)
+    try:
+        with os.fdopen(descriptor, "wb") as archivo:
+            archivo.write(bytes(ALINEACION_COMPARTIDO))
+            for nombre, valor in vars(remuestreo).items():
+                if not isinstance(valor, np.ndarray):
+                    atributos[nombre] = valor
+                    continue
+                desplazamiento = -(-archivo.tell() // ALINEACION_COMPARTIDO) * ALINEACION_COMPARTIDO
+                archivo.write(bytes(desplazamiento - archivo.tell()))
+                archivo.write(np.ascontiguousarray(valor).data)
+                disposicion.append((nombre, valor.dtype.str, valor.shape, desplazamiento))
+    except BaseException:
+        os.remove(ruta)
+        raise
+    return ruta, atributos, disposicion
+
+
+def _lote_trabajador(compartido: tuple, semilla: np.random.SeedSequence, tamano: int) -> Optional[np.ndarray]:
+    '''
+    Evalúa un lote en un proceso del grupo sobre los datos del archivo compartido (sin
+    copiarlos). Devuelve None si el cálculo ya terminó o se ha pedido parar.
+    '''
+    ruta, atributos, disposicion = compartido
+    try:
+        mapa = np.memmap(ruta, dtype=np.uint8, mode="r")
+    except FileNotFoundError:
+        return None
+    remuestreo = Remuestreo.__new__(Remuestreo)
+    vars(remuestreo).update(atributos)
+    for nombre, dtype, forma, desplazamiento in disposicion:
+        setattr(remuestreo, nombre, np.ndarray(forma, dtype=dtype, buffer=mapa, offset=desplazamiento))
+    return remuestreo.lote(semilla, tamano, detener=lambda: mapa[0] != 0)
+
+
+def bootstrap_progresivo(remuestreo: Remuestreo, n_remuestras: int = N_REMUESTRAS, nivel: float = 0.95,
+                         semilla: Optional[int] = 0, n_procesos: Optional[int] = None,
+                         presupuesto_s: Optional[float] = None, intervalo_s: float = 0.25,
+                         cancelar: Optional[threading.Event] = None) -> Iterator[ResultadoBootstrap]:
+    '''
+    Bootstrap por lotes que devuelve intervalos cada vez más precisos a medida que
+    terminan los lotes (como mucho uno cada intervalo_s segundos, y siempre el último).
+
+    :param n_procesos: Lotes evaluados a la vez en el grupo de procesos compartido (por
+                       defecto, tantos como núcleos). Con poco trabajo o un solo proceso
+                       los lotes se evalúan en el proceso actual.
+    :param presupuesto_s: Tiempo máximo; al agotarse se devuelve el resultado parcial.
+    :param cancelar: Evento que, al activarse, detiene el cálculo tras el lote en curso.
+                     En paralelo, los lotes que ya se están evaluando se abandonan en el
+                     siguiente trozo (ELEMENTOS_TROZO) y los aún no empezados no se evalúan.
+    :return: Iterador de ResultadoBootstrap (el último es el definitivo).
+    '''
+    tamano = remuestreo.tamano_lote(n_remuestras)
+    tamanos = [tamano] * (n_remuestras // tamano) + ([n_remuestras % tamano] if n_remuestras % tamano else [])
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    estimacion = remuestreo.estimacion()
+    inicio = time.perf_counter()
+    limite = inicio + presupuesto_s if presupuesto_s is not None else np.inf
+
+    lotes, ultimo_envio = [], inicio
+
+    def _resultado():
+        replicas = np.concatenate(lotes) if lotes else np.empty((0, len(ESTADISTICOS_BOOTSTRAP)))
+        return ResultadoBootstrap(intervalos_percentil(estimacion, replicas, nivel), len(replicas),
+                                  n_remuestras, nivel)
+
+    def _detener() -> bool:
+        return time.perf_counter() >= limite or (cancelar is not None and cancelar.is_set())
+
+    n_procesos = min(n_procesos or os.cpu_count() or 1, len(tamanos))
+    if n_procesos <= 1 or remuestreo.coste * n_remuestras < MIN_TRABAJO_PARALELO:
+        for semilla_lote, tamano_lote in zip(semillas, tamanos):
+            lotes.append(remuestreo.lote(semilla_lote, tamano_lote))
+            if len(lotes) < len(tamanos) and _detener():
+                break
+            if len(lotes) < len(tamanos) and time.perf_counter() - ultimo_envio >= intervalo_s:
+                ultimo_envio = time.perf_counter()
+                yield _resultado()
+        yield _resultado()
+        return
+
+    compartido = _volcar_remuestreo(remuestreo)
+    parada = np.memmap(compartido[0], dtype=np.uint8, mode="r+", shape=(1,))
+    por_enviar = iter(zip(semillas, tamanos))
+    pendientes = set()
+    try:
+        while True:
+            # Como mucho n_procesos lotes a la vez: el grupo se reparte entre las sesiones
+            for semilla_lote, tamano_lote in por_enviar:
+                pendientes.add(_enviar_lote(compartido, semilla_lote, tamano_lote))
+                if len(pendientes) >= n_procesos:
+                    break
+            if not pendientes or _detener():
+                break
+            espera = min(intervalo_s, max(limite - time.perf_counter(), 0))
+            terminados, pendientes = wait(pendientes, timeout=espera, return_when=FIRST_COMPLETED)
+            lotes.extend(lote for lote in (futuro.result() for futuro in terminados) if lote is not None)
+            if pendientes and terminados and time.perf_counter() - ultimo_envio >= intervalo_s:
+                ultimo_envio = time.perf_counter()
+                yield _resultado()
+        yield _resultado()
+    finally:
+        # Cancelación, presupuesto agotado o cierre del generador: los lotes en cola se
+        # descartan y los que se están evaluando ven la señal y paran en el siguiente trozo
+        parada[0] = 1
+        for futuro in pendientes:
+            futuro.cancel()
+        del parada
+        os.remove(compartido[0])
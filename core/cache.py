@@ -0,0 +1,116 @@
+# core/cache.py
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Límites por defecto de la caché del pipeline
+MAX_ENTRADAS = 128
+MAX_BYTES = 256 * 1024 ** 2
+
+
+def huella_array(valores) -> str:
+    '''
+    Huella (blake2b de 128 bits) del contenido de un array numérico. Se calcula
+    sobre el buffer en memoria, sin convertir los valores a texto ni copiarlos
+    (salvo que el array no sea contiguo).
+    '''
+    valores = np.ascontiguousarray(valores)
+    resumen = hashlib.blake2b(digest_size=16)
+    resumen.update(f"{valores.dtype.str}{valores.shape}".encode())
+    resumen.update(memoryview(valores).cast("B"))
+    return resumen.hexdigest()
+
+
+def tamano_aproximado(valor) -> int:
+    '''
+    Memoria aproximada (en bytes) de un resultado del pipeline. Las figuras de Plotly
+    se miden por su JSON (como tamano_carga en core.instrumentacion): sys.getsizeof
+    solo vería el objeto contenedor. Se serializan una vez, al guardarlas.
+    '''
+    if hasattr(valor, "to_plotly_json"):
+        return len(valor.to_json())
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        uso = valor.memory_usage(index=True, deep=False)
+        return int(uso.sum()) if isinstance(uso, pd.Series) else int(uso)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamano_aproximado(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(tamano_aproximado(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+class CachePipeline:
+    '''
+    Caché LRU acotada por número de entradas y por memoria para los resultados
+    intermedios del análisis (tabla, intervalos, métricas, atípicos, gráficos).
+
+    Cada entrada se identifica por su etapa y una clave (normalmente la huella de
+    los datos más las opciones que afectan a esa etapa), de modo que cambiar de
+    modo o de criterio solo recalcula las etapas afectadas. Lleva contadores de
+    aciertos y fallos por etapa. Es segura entre hilos (sesiones de Streamlit).
+    '''
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS, max_bytes: int = MAX_BYTES):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = {}
+        self.fallos = {}
+
+    def obtener(self, etapa: str, clave, calcular):
+        '''
+        Devuelve el resultado de la etapa para la clave, calculándolo con `calcular()`
+        (sin argumentos) si no está en caché.
+        '''
+        identificador = (etapa, clave)
+        with self._lock:
+            if identificador in self._entradas:
+                self._entradas.move_to_end(identificador)
+                self.aciertos[etapa] = self.aciertos.get(etapa, 0) + 1
+                return self._entradas[identificador][0]
+            self.fallos[etapa] = self.fallos.get(etapa, 0) + 1
+
+        # El cálculo se hace fuera del bloqueo para no serializar las sesiones
+        valor = calcular()
+        tamano = tamano_aproximado(valor)
+        if tamano > self.max_bytes:
+            return valor
+
+        with self._lock:
+            if identificador not in self._entradas:
+                self._entradas[identificador] = (valor, tamano)
+                self._bytes += tamano
+            self._desalojar()
+        return valor
+
+    def _desalojar(self):
+        '''Elimina las entradas menos usadas recientemente hasta respetar los límites.'''
+        while self._entradas and (len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes):
+            _, (_, tamano) = self._entradas.popitem(last=False)
+            self._bytes -= tamano
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estadisticas(self) -> pd.DataFrame:
+        '''Aciertos, fallos y tasa de aciertos por etapa, más el uso actual de la caché.'''
+        with self._lock:
+            etapas = sorted(set(self.aciertos) | set(self.fallos))
+            tabla = pd.DataFrame({
+                'Aciertos': [self.aciertos.get(e, 0) for e in etapas],
+                'Fallos': [self.fallos.get(e, 0) for e in etapas],
+            }, index=pd.Index(etapas, name='Etapa'))
+            tabla['Tasa de Aciertos'] = tabla['Aciertos'] / (tabla['Aciertos'] + tabla['Fallos'])
+            tabla.attrs['entradas'] = len(self._entradas)
+            tabla.attrs['bytes'] = self._bytes
+        return tabla
@@ -0,0 +1,87 @@
+# core/forma.py
+'''
+Medidas de forma (asimetría y curtosis) y diagnóstico rápido de normalidad a partir
+de los momentos centrales ya acumulados (M2, M3, M4: sumas de las potencias de los
+desvíos respecto de la media), de modo que no requieren otra pasada por los datos:
+
+    G1 = g1 · √(n(n-1)) / (n-2),          g1 = √n · M3 / M2^(3/2)
+    G2 = ((n+1)·g2 + 6)(n-1) / ((n-2)(n-3)),   g2 = n · M4 / M2² - 3
+    Pearson = 3 (media - mediana) / s
+    Bowley  = (Q3 + Q1 - 2·mediana) / (Q3 - Q1)
+    JB = n/6 · (g1² + g2²/4),   p = exp(-JB/2)   (χ² con 2 grados de libertad)
+
+El resumen QQ compara los cuantiles de la muestra en una rejilla reducida de
+probabilidades con los de la normal de igual media y desviación.
+'''
+from statistics import NormalDist
+
+import numpy as np
+
+# Puntos de la rejilla del resumen QQ: p = i / (PUNTOS_QQ + 1), i = 1..PUNTOS_QQ
+PUNTOS_QQ = 99
+
+# Nivel de significación con el que se interpreta el test de Jarque–Bera
+ALFA_NORMALIDAD = 0.05
+
+
+def medidas_forma(n: int, m2: float, m3: float, m4: float, media: float = np.nan,
+                  desviacion: float = np.nan, mediana: float = np.nan,
+                  Q1: float = np.nan, Q3: float = np.nan) -> dict:
+    '''
+    Asimetría (G1) y curtosis en exceso (G2) muestrales, como Series.skew/kurt, más
+    los coeficientes de Pearson y Bowley y el test de Jarque–Bera.
+
+    :param n: Número de datos.
+    :param m2, m3, m4: Sumas de las potencias 2, 3 y 4 de los desvíos respecto de la media.
+    :param media, desviacion, mediana, Q1, Q3: Métricas ya calculadas (para Pearson y Bowley).
+    :return: Diccionario con asimetria, curtosis, asimetria_pearson, asimetria_bowley,
+             jarque_bera y p_jarque_bera (NaN si no hay datos suficientes).
+    '''
+    asimetria = curtosis = jarque_bera = p_jarque_bera = np.nan
+    if n >= 3 and m2 > 0:
+        g1 = np.sqrt(n) * m3 / m2 ** 1.5
+        g2 = n * m4 / m2 ** 2 - 3
+        asimetria = g1 * np.sqrt(n * (n - 1)) / (n - 2)
+        if n >= 4:
+            curtosis = ((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3))
+        jarque_bera = n / 6 * (g1 ** 2 + g2 ** 2 / 4)
+        p_jarque_bera = float(np.exp(-jarque_bera / 2))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pearson = 3 * (media - mediana) / desviacion if desviacion > 0 else np.nan
+        bowley = (Q3 + Q1 - 2 * mediana) / (Q3 - Q1) if Q3 > Q1 else np.nan
+    return {
+        "asimetria": asimetria,
+        "curtosis": curtosis,
+        "asimetria_pearson": pearson,
+        "asimetria_bowley": bowley,
+        "jarque_bera": jarque_bera,
+        "p_jarque_bera": p_jarque_bera,
+    }
+
+
+def resumen_qq(cuantiles, media: float, desviacion: float, puntos: int = PUNTOS_QQ) -> dict:
+    '''
+    Resumen QQ frente a la normal N(media, desviacion) en una rejilla de `puntos` probabilidades.
+
+    :param cuantiles: Función que recibe un array de probabilidades y devuelve los cuantiles
+                      de la muestra (p. ej. lambda p: cuantiles_tabla(tabla, p),
+                      ver core.descriptive).
+    :return: Diccionario con probabilidades, teoricos, muestrales, correlacion (coeficiente de
+             correlación del gráfico QQ) y desviacion_maxima (mayor diferencia, en desviaciones).
+    '''
+    probabilidades = np.arange(1, puntos + 1) / (puntos + 1)
+    muestrales = np.asarray(cuantiles(probabilidades), dtype=np.float64)
+    if not desviacion > 0:
+        return {"probabilidades": probabilidades, "teoricos": np.full(puntos, media),
+                "muestrales": muestrales, "correlacion": np.nan, "desviacion_maxima": np.nan}
+    normal = NormalDist(media, desviacion)
+    teoricos = np.array([normal.inv_cdf(p) for p in probabilidades])
+    correlacion = np.corrcoef(teoricos, muestrales)[0, 1] if np.ptp(muestrales) > 0 else np.nan
+    return {
+        "probabilidades": probabilidades,
+        "teoricos": teoricos,
+        "muestrales": muestrales,
+        "correlacion": correlacion,
+        "desviacion_maxima": np.max(np.abs(muestrales - teoricos)) / desviacion,
+    }
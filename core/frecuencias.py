@@ -0,0 +1,259 @@
+# core/frecuencias.py
+import numpy as np
+
+# Conteo por np.bincount: el rango de los enteros no debe superar este múltiplo del
+# número de datos (o MIN_RANGO_BINCOUNT), para que el array de conteos no domine
+MAX_RANGO_POR_DATO = 4
+MIN_RANGO_BINCOUNT = 1 << 16
+
+# Bloque (en datos) para contar enteros de rango pequeño sin salir de la caché
+TAMANO_BLOQUE_CONTEO = 1 << 16
+
+# Columnas derivadas de la tabla de frecuencias, en el orden en que se muestran
+COLUMNAS_DERIVADAS = ('Frecuencia Relativa (hi)', 'Porcentaje (pi)',
+                      'Frecuencia Acumulada (Fi)', 'Frecuencia Rel Acumulada (Hi)')
+
+
+def contar_ordenados(valores_ordenados: np.ndarray) -> tuple:
+    '''
+    Cuenta las repeticiones de cada valor de un array ordenado (codificación por rachas).
+
+    :return: Tupla (valores_unicos, conteos).
+    '''
+    if len(valores_ordenados) == 0:
+        return valores_ordenados[:0], np.empty(0, dtype=np.int64)
+    inicios = np.flatnonzero(valores_ordenados[1:] != valores_ordenados[:-1]) + 1
+    inicios = np.concatenate(([0], inicios))
+    conteos = np.diff(np.append(inicios, len(valores_ordenados)))
+    return valores_ordenados[inicios], conteos
+
+
+def validar_conteos(conteos) -> np.ndarray:
+    '''
+    Comprueba que las frecuencias sean enteros no negativos (aunque lleguen como float).
+
+    :return: Frecuencias como int64.
+    '''
+    conteos = np.asarray(conteos, dtype=np.float64)
+    if not np.isfinite(conteos).all() or (conteos < 0).any() or (conteos != np.round(conteos)).any():
+        raise ValueError("Las frecuencias deben ser enteros no negativos.")
+    return conteos.astype(np.int64)
+
+
+def normalizar_frecuencias(valores, conteos) -> tuple:
+    '''
+    Valida una tabla (valor, frecuencia) recibida de fuera y la lleva a la forma
+    canónica: valores únicos ordenados (sin NaN) y conteos int64 positivos.
+    Los valores repetidos se suman y las filas con frecuencia cero se descartan.
+
+    :return: Tupla (valores_unicos, conteos).
+    '''
+    valores = np.asarray(valores, dtype=np.float64)
+    conteos = validar_conteos(conteos)
+    if valores.shape != conteos.shape or valores.ndim != 1:
+        raise ValueError("Los valores y las frecuencias deben ser columnas de igual longitud.")
+
+    validos = ~np.isnan(valores) & (conteos > 0)
+    valores, conteos = valores[validos], conteos[validos]
+    if len(valores) and (np.diff(valores) > 0).all():
+        return valores, conteos
+    unicos, inversos = np.unique(valores, return_inverse=True)
+    return unicos, np.bincount(inversos, weights=conteos, minlength=len(unicos)).astype(np.int64)
+
+
+def contar_frecuencias(valores) -> tuple:
+    '''
+    Tabla de frecuencias (valores únicos ordenados y conteos) eligiendo la estrategia
+    más rápida según los datos (se ignoran los NaN):
+
+    - Enteros en un rango acotado: se desplazan al mínimo, se guardan en el tipo entero
+      más estrecho que admite el rango y se cuentan con np.bincount (O(n), sin ordenar).
+    - En otro caso: ordenación y conteo por rachas (O(n log n), sin tablas hash).
+
+    :return: Tupla (valores_unicos float64, conteos int64).
+    '''
+    valores = np.asarray(valores, dtype=np.float64)
+    if len(valores) == 0:
+        return valores, np.empty(0, dtype=np.int64)
+
+    # min/max propagan los NaN: solo se filtra (y copia) si realmente hay alguno
+    minimo, maximo = valores.min(), valores.max()
+    if np.isnan(minimo):
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return valores, np.empty(0, dtype=np.int64)
+        minimo, maximo = valores.min(), valores.max()
+
+    # Solo con un mínimo entero: con desplazamientos enteros sobre un mínimo decimal
+    # (p. ej. -49.9, 0.1, 5.1) presentes + minimo no reproduce exactamente los valores
+    rango = maximo - minimo
+    if (np.isfinite(rango) and minimo == np.floor(minimo)
+            and rango < max(MAX_RANGO_POR_DATO * len(valores), MIN_RANGO_BINCOUNT)):
+        conteos = _contar_enteros(valores, minimo, int(rango))
+        if conteos is not None:
+            presentes = np.flatnonzero(conteos)
+            return presentes + minimo, conteos[presentes]
+    return contar_ordenados(np.sort(valores))
+
+
+def _contar_enteros(valores: np.ndarray, minimo: float, rango: int):
+    '''
+    np.bincount sobre los valores desplazados al mínimo, guardados en el tipo entero
+    más estrecho que admite el rango. Con rangos pequeños se recorre por bloques que
+    caben en caché. Devuelve None en cuanto encuentra un valor no entero.
+    '''
+    tipo = np.min_scalar_type(rango)
+    tamano_bloque = TAMANO_BLOQUE_CONTEO if rango < TAMANO_BLOQUE_CONTEO else len(valores)
+    conteos = np.zeros(rango + 1, dtype=np.int64)
+    for inicio in range(0, len(valores), tamano_bloque):
+        bloque = valores[inicio:inicio + tamano_bloque]
+        desplazados = bloque - minimo if minimo else bloque
+        codigos = desplazados.astype(tipo)
+        if not (codigos == desplazados).all():
+            return None
+        conteos += np.bincount(codigos, minlength=rango + 1)
+    return conteos
+
+
+def columnas_derivadas(conteos: np.ndarray, n: int = None, columnas=None,
+                       inicio: int = 0, fin: int = None) -> dict:
+    '''
+    Calcula solo las columnas derivadas pedidas (hi, pi, Fi, Hi), y solo para las filas
+    [inicio, fin) de la tabla: las acumuladas parten de la suma de las filas anteriores.
+
+    :param conteos: Frecuencias absolutas de toda la tabla.
+    :param n: Total de datos; por defecto, la suma de los conteos.
+    :param columnas: Nombres de las columnas a calcular (por defecto, todas).
+    :return: Diccionario {columna: array}, redondeadas a 4 decimales como la tabla.
+    '''
+    if columnas is None:
+        columnas = COLUMNAS_DERIVADAS
+    if n is None:
+        n = int(np.sum(conteos))
+    fin = len(conteos) if fin is None else fin
+    tramo = conteos[inicio:fin]
+    previos = int(np.sum(conteos[:inicio]))
+
+    resultado = {}
+    relativas = tramo / n
+    if 'Frecuencia Relativa (hi)' in columnas:
+        resultado['Frecuencia Relativa (hi)'] = np.round(relativas, 4)
+    if 'Porcentaje (pi)' in columnas:
+        resultado['Porcentaje (pi)'] = np.round(relativas * 100, 4)
+    if 'Frecuencia Acumulada (Fi)' in columnas:
+        resultado['Frecuencia Acumulada (Fi)'] = np.cumsum(tramo) + previos
+    if 'Frecuencia Rel Acumulada (Hi)' in columnas:
+        resultado['Frecuencia Rel Acumulada (Hi)'] = np.round(np.cumsum(relativas) + previos / n, 4)
+    return resultado
+
+
+def combinar_frecuencias(unicos_a: np.ndarray, conteos_a: np.ndarray,
+                         unicos_b: np.ndarray, conteos_b: np.ndarray) -> tuple:
+    '''
+    Fusiona dos tablas de frecuencias (valores únicos ordenados y sus conteos).
+
+    :return: Tupla (valores_unicos, conteos) de la tabla combinada.
+    '''
+    if len(unicos_a) == 0:
+        return unicos_b, conteos_b
+    if len(unicos_b) == 0:
+        return unicos_a, conteos_a
+    unicos, inversos = np.unique(np.concatenate((unicos_a, unicos_b)), return_inverse=True)
+    conteos = np.bincount(inversos, weights=np.concatenate((conteos_a, conteos_b)), minlength=len(unicos))
+    return unicos, conteos.astype(np.int64)
+
+
+def restar_frecuencias(unicos_a: np.ndarray, conteos_a: np.ndarray,
+                       unicos_b: np.ndarray, conteos_b: np.ndarray) -> tuple:
+    '''
+    Resta a la tabla A los conteos de la tabla B (cuyos valores deben estar en A)
+    y elimina los valores que quedan con frecuencia cero.
+
+    :return: Tupla (valores_unicos, conteos) resultante.
+    '''
+    posiciones = np.searchsorted(unicos_a, unicos_b)
+    if len(unicos_b) and (posiciones.max() >= len(unicos_a) or not np.array_equal(unicos_a[posiciones], unicos_b)):
+        raise ValueError("Se intentan quitar valores que no están en la tabla de frecuencias.")
+    conteos = conteos_a.copy()
+    conteos[posiciones] -= conteos_b
+    if (conteos < 0).any():
+        raise ValueError("Se intentan quitar más repeticiones de las registradas.")
+    presentes = conteos > 0
+    return unicos_a[presentes], conteos[presentes]
+
+
+def _valor_en_rango(valores_unicos: np.ndarray, acumuladas: np.ndarray, rango: int) -> float:
+    '''Valor que ocupa la posición `rango` (desde 0) en los datos ordenados.'''
+    return valores_unicos[np.searchsorted(acumuladas, rango, side='right')]
+
+
+def cuantil_ordenado(valores_ordenados: np.ndarray, p: float) -> float:
+    '''
+    Cuantil p con interpolación lineal (igual que Series.quantile) sobre un array
+    ya ordenado, en O(1).
+    '''
+    n = len(valores_ordenados)
+    if n == 0:
+        return np.nan
+    h = (n - 1) * p
+    i = int(np.floor(h))
+    return _interpolar(valores_ordenados[i], valores_ordenados[min(i + 1, n - 1)], h - i)
+
+
+def cuantil_frecuencias(valores_unicos: np.ndarray, conteos: np.ndarray, p: float,
+                        acumuladas: np.ndarray = None) -> float:
+    '''
+    Cuantil p con interpolación lineal a partir de una tabla de frecuencias,
+    sin expandir los datos: equivale a cuantil_ordenado sobre los datos repetidos.
+
+    :param acumuladas: Frecuencias acumuladas ya calculadas (np.cumsum(conteos)), opcional.
+    '''
+    if acumuladas is None:
+        acumuladas = np.cumsum(conteos)
+    n = int(acumuladas[-1]) if len(acumuladas) else 0
+    if n == 0:
+        return np.nan
+    h = (n - 1) * p
+    i = int(np.floor(h))
+    a = _valor_en_rango(valores_unicos, acumuladas, i)
+    b = _valor_en_rango(valores_unicos, acumuladas, min(i + 1, n - 1))
+    return _interpolar(a, b, h - i)
+
+
+def cuantiles_frecuencias(valores_unicos: np.ndarray, conteos: np.ndarray, probabilidades,
+                          acumuladas: np.ndarray = None) -> np.ndarray:
+    '''
+    Varios cuantiles a la vez (como cuantil_frecuencias), con una sola búsqueda
+    binaria vectorizada sobre las frecuencias acumuladas.
+    '''
+    if acumuladas is None:
+        acumuladas = np.cumsum(conteos)
+    probabilidades = np.asarray(probabilidades, dtype=np.float64)
+    n = int(acumuladas[-1]) if len(acumuladas) else 0
+    if n == 0:
+        return np.full(probabilidades.shape, np.nan)
+    h = (n - 1) * probabilidades
+    i = np.floor(h).astype(np.intp)
+    a = valores_unicos[np.searchsorted(acumuladas, i, side='right')]
+    b = valores_unicos[np.searchsorted(acumuladas, np.minimum(i + 1, n - 1), side='right')]
+    t = h - i
+    return np.where(t >= 0.5, b - (b - a) * (1 - t), a + (b - a) * t)
+
+
+def mediana_frecuencias(valores_unicos: np.ndarray, conteos: np.ndarray,
+                        acumuladas: np.ndarray = None) -> float:
+    '''Mediana (media de los dos centrales si n es par, como Series.median).'''
+    if acumuladas is None:
+        acumuladas = np.cumsum(conteos)
+    n = int(acumuladas[-1]) if len(acumuladas) else 0
+    if n == 0:
+        return np.nan
+    if n % 2:
+        return _valor_en_rango(valores_unicos, acumuladas, n // 2)
+    return (_valor_en_rango(valores_unicos, acumuladas, n // 2 - 1)
+            + _valor_en_rango(valores_unicos, acumuladas, n // 2)) / 2
+
+
+def _interpolar(a: float, b: float, t: float) -> float:
+    # Misma interpolación que numpy para reproducir exactamente sus resultados
+    return b - (b - a) * (1 - t) if t >= 0.5 else a + (b - a) * t
@@ -0,0 +1,148 @@
+# core/incremental.py
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from core.acumulador import AcumuladorEstadistico
+from core.cache import huella_array
+from core.descriptive import ordenar_valores, tabla_desde_frecuencias
+from core.frecuencias import contar_ordenados
+from core.parser import SEPARADORES, parsear_valores
+
+# Espacios en blanco que np.fromstring acepta como separador
+_ESPACIOS = " \t\n\r\f\v"
+
+
+def _fin_ultimo_separador(texto: str, caracteres: str) -> int:
+    '''
+    Posición justo después del último separador del texto (0 si no hay ninguno).
+    Se busca desde el final en ventanas crecientes para no recorrer todo el texto
+    por cada carácter que no aparezca cerca del final.
+    '''
+    ventana = 256
+    while True:
+        inicio = max(0, len(texto) - ventana)
+        posicion = max(texto.rfind(c, inicio) for c in caracteres)
+        if posicion >= 0 or inicio == 0:
+            return posicion + 1
+        ventana *= 16
+
+
+class SesionIncremental:
+    '''
+    Mantiene el estado del análisis entre ediciones del texto de entrada para
+    recalcular solo lo que cambió.
+
+    Si el texto nuevo conserva el anterior hasta un límite de token (se añadieron o
+    quitaron valores al final), solo se parsea el tramo modificado: los valores
+    añadidos se incorporan al acumulador y los quitados se descuentan de forma exacta
+    (momentos y tabla de frecuencias). Cualquier otra edición reconstruye todo.
+    '''
+
+    def __init__(self, momentos_superiores: bool = False):
+        self.momentos_superiores = momentos_superiores
+        self.texto = None
+        self.opciones = None
+        self.acumulador = AcumuladorEstadistico(momentos_superiores, frecuencias=True)
+        self.n_valores = 0
+        self.errores = []
+        self.n_errores = 0
+        self.ultima_actualizacion = None
+        self.n_anadidos = 0
+        self.n_quitados = 0
+        self._ordenados = None
+        self._huella = None
+
+    def actualizar(self, texto: str, separador_decimal: str = '.',
+                   separador_miles: Optional[str] = None) -> str:
+        '''
+        Sincroniza el estado con el texto actual.
+
+        :return: "sin cambios", "incremental" o "completa" según el trabajo realizado.
+        '''
+        opciones = (separador_decimal, separador_miles)
+        if texto == self.texto and opciones == self.opciones:
+            self.ultima_actualizacion = "sin cambios"
+        elif opciones == self.opciones and not self.n_errores and self._aplicar_diferencia(texto, opciones):
+            self.ultima_actualizacion = "incremental"
+        else:
+            self._reconstruir(texto, opciones)
+            self.ultima_actualizacion = "completa"
+        self.texto, self.opciones = texto, opciones
+        return self.ultima_actualizacion
+
+    def _aplicar_diferencia(self, texto: str, opciones: tuple) -> bool:
+        '''
+        Aplica la edición como diferencia si ambos textos comparten un prefijo que
+        termina en un separador. Devuelve False si hay que reconstruir.
+        '''
+        anterior = self.texto
+        caracteres = _ESPACIOS + "".join(c for c in SEPARADORES if c not in opciones)
+
+        # Valores añadidos al final o quitados del final (cortando en el último separador)
+        corte = _fin_ultimo_separador(anterior, caracteres)
+        if not texto.startswith(anterior[:corte]):
+            corte = _fin_ultimo_separador(texto, caracteres)
+            if not anterior.startswith(texto[:corte]):
+                return False
+
+        quitados = parsear_valores(anterior[corte:], *opciones, max_errores=0)
+        anadidos = parsear_valores(texto[corte:], *opciones, max_errores=0)
+        if quitados.n_errores or anadidos.n_errores:
+            return False
+
+        self.acumulador.quitar(quitados.valores)
+        self.acumulador.actualizar(anadidos.valores)
+        self.n_valores += len(anadidos.valores) - len(quitados.valores)
+        self.n_anadidos, self.n_quitados = len(anadidos.valores), len(quitados.valores)
+        self._ordenados = None
+        self._huella = None
+        return True
+
+    def _reconstruir(self, texto: str, opciones: tuple):
+        valores, self.errores, self.n_errores = parsear_valores(texto, *opciones)
+        ordenados = ordenar_valores(valores)
+        self.acumulador = AcumuladorEstadistico(self.momentos_superiores).actualizar_por_bloques(ordenados)
+        self.acumulador.incorporar_frecuencias(*contar_ordenados(ordenados))
+        self.n_valores = len(valores)
+        self.n_anadidos, self.n_quitados = len(valores), 0
+        self._ordenados = ordenados
+        self._huella = None
+
+    def frecuencias(self) -> tuple:
+        '''
+        Tabla de frecuencias actual (valores únicos ordenados y conteos), sin copiarla:
+        intervalos y atípicos se calculan sobre ella (ver crear_intervalos y
+        analizar_atipicos con `conteos`) en tiempo proporcional a los valores distintos.
+        '''
+        return self.acumulador.valores_unicos, self.acumulador.conteos
+
+    def valores_ordenados(self) -> np.ndarray:
+        '''
+        Copia ordenada de los valores (sin NaN). Tras una actualización incremental se
+        expande desde la tabla de frecuencias (O(n), sin volver a ordenar): solo para
+        quien necesita los datos expandidos, como el bootstrap o el almacén.
+        '''
+        if self._ordenados is None:
+            self._ordenados = np.repeat(self.acumulador.valores_unicos, self.acumulador.conteos)
+        return self._ordenados
+
+    def huella(self) -> str:
+        '''
+        Huella del contenido actual, sobre la tabla de frecuencias (todos los resultados
+        son invariantes al orden) y sin expandirla. Se calcula una vez por versión de los datos.
+        '''
+        if self._huella is None:
+            self._huella = huella_array(self.acumulador.valores_unicos) + huella_array(self.acumulador.conteos)
+        return self._huella
+
+    def metricas(self) -> dict:
+        '''Métricas principales (mismo formato que calcular_metricas_principales).'''
+        metricas = self.acumulador.finalizar()
+        metricas["n"] = self.n_valores
+        return metricas
+
+    def tabla_estadistica(self) -> pd.DataFrame:
+        '''Tabla de frecuencias de datos discretos (mismo formato que crear_tabla_estadistica).'''
+        return tabla_desde_frecuencias(self.acumulador.valores_unicos, self.acumulador.conteos, n=self.n_valores)
@@ -0,0 +1,250 @@
+# core/ingesta.py
+import os
+import shutil
+import tempfile
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.acumulador import AcumuladorEstadistico
+
+# Valores leídos por bloque: acota la memoria pico independientemente del tamaño del archivo
+TAMANO_BLOQUE = 1_000_000
+
+FORMATOS_ARCHIVO = {
+    ".csv": "csv",
+    ".txt": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".npy": "npy",
+    ".bin": "binario",
+    ".dat": "binario",
+    ".raw": "binario",
+}
+
+TIPOS_BINARIOS = ("float64", "float32", "int64", "int32", "int16", "uint8")
+
+# Bytes por bloque al copiar un archivo subido a disco
+TAMANO_BLOQUE_COPIA = 1 << 20
+
+
+def detectar_formato(nombre_archivo: str) -> str:
+    '''
+    Determina el formato de un archivo a partir de su extensión.
+
+    :param nombre_archivo: Nombre o ruta del archivo.
+    :return: 'csv', 'parquet', 'npy' o 'binario'.
+    '''
+    extension = os.path.splitext(nombre_archivo)[1].lower()
+    if extension not in FORMATOS_ARCHIVO:
+        raise ValueError(f"Formato de archivo no soportado: '{extension}'.")
+    return FORMATOS_ARCHIVO[extension]
+
+
+def _rebobinar(origen):
+    '''Vuelve al inicio los orígenes tipo archivo para poder releerlos.'''
+    if hasattr(origen, "seek"):
+        origen.seek(0)
+    return origen
+
+
+def copiar_a_temporal(origen) -> str:
+    '''
+    Copia un archivo ya abierto (p. ej. el devuelto por st.file_uploader) a un archivo
+    temporal en disco, por bloques de TAMANO_BLOQUE_COPIA bytes, para leerlo después
+    desde su ruta: memoria mapeada (.npy, binario) o por bloques (CSV, Parquet), sin
+    otra copia completa en memoria. Quien lo llama debe borrar el archivo.
+
+    :return: Ruta del archivo temporal.
+    '''
+    descriptor, ruta = tempfile.mkstemp(prefix="statboard_")
+    try:
+        with os.fdopen(descriptor, "wb") as destino:
+            shutil.copyfileobj(_rebobinar(origen), destino, TAMANO_BLOQUE_COPIA)
+    except BaseException:
+        os.remove(ruta)
+        raise
+    return ruta
+
+
+def _importar_pyarrow():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError("Para leer archivos Parquet instala 'pyarrow' (pip install pyarrow).") from error
+    return pq
+
+
+def _abrir_array(origen, formato: str, dtype: str) -> np.ndarray:
+    '''
+    Abre un .npy o un binario crudo sin copiar los datos: memoria mapeada si
+    es una ruta, o una vista sobre el contenido si es un archivo en memoria
+    (BytesIO.getvalue no copia un buffer creado a partir de bytes, a diferencia
+    de getbuffer). Para archivos subidos conviene copiar_a_temporal y pasar la ruta.
+    '''
+    if isinstance(origen, (str, os.PathLike)):
+        if formato == "npy":
+            return np.load(origen, mmap_mode="r")
+        return np.memmap(origen, dtype=dtype, mode="r")
+
+    buffer = origen.getvalue() if hasattr(origen, "getvalue") else _rebobinar(origen).read()
+    if formato == "binario":
+        return np.frombuffer(buffer, dtype=dtype)
+
+    cabecera = _rebobinar(origen)
+    version = np.lib.format.read_magic(cabecera)
+    if version == (1, 0):
+        forma, orden_fortran, dtype_npy = np.lib.format.read_array_header_1_0(cabecera)
+    else:
+        forma, orden_fortran, dtype_npy = np.lib.format.read_array_header_2_0(cabecera)
+    datos = np.frombuffer(buffer, dtype=dtype_npy, count=int(np.prod(forma)), offset=cabecera.tell())
+    return datos.reshape(forma, order="F" if orden_fortran else "C")
+
+
+def listar_columnas(origen, formato: str) -> list:
+    '''
+    Devuelve las columnas seleccionables de un archivo (sin leer los datos).
+
+    :param origen: Ruta o archivo (p. ej. el devuelto por st.file_uploader).
+    :param formato: 'csv', 'parquet', 'npy' o 'binario'.
+    :return: Lista de nombres de columna (índices para arrays 2-D, vacía si 1-D).
+    '''
+    if formato == "csv":
+        return list(pd.read_csv(_rebobinar(origen), nrows=0).columns)
+    if formato == "parquet":
+        return list(_importar_pyarrow().ParquetFile(_rebobinar(origen)).schema_arrow.names)
+    if formato == "npy":
+        datos = _abrir_array(origen, formato, "float64")
+        return list(range(datos.shape[1])) if datos.ndim == 2 else []
+    return []
+
+
+def leer_bloques(origen, formato: str, columna=None, tamano_bloque: int = TAMANO_BLOQUE,
+                 dtype: str = "float64") -> Iterator[np.ndarray]:
+    '''
+    Lee una columna numérica de un archivo en bloques acotados de float64.
+
+    :param origen: Ruta o archivo.
+    :param formato: 'csv', 'parquet', 'npy' o 'binario'.
+    :param columna: Columna a leer (nombre en CSV/Parquet, índice en .npy 2-D).
+                    Si es None se usa la primera.
+    :param tamano_bloque: Número máximo de valores por bloque.
+    :param dtype: Tipo de los datos en binarios crudos.
+    :return: Iterador de arrays float64.
+    '''
+    if formato == "csv":
+        usecols = [columna] if columna is not None else [0]
+        lector = pd.read_csv(_rebobinar(origen), usecols=usecols, chunksize=tamano_bloque)
+        for bloque in lector:
+            yield pd.to_numeric(bloque.iloc[:, 0], errors="coerce").to_numpy(dtype=np.float64)
+
+    elif formato == "parquet":
+        archivo = _importar_pyarrow().ParquetFile(_rebobinar(origen))
+        nombre = columna if columna is not None else archivo.schema_arrow.names[0]
+        for lote in archivo.iter_batches(batch_size=tamano_bloque, columns=[nombre]):
+            yield lote.column(0).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+
+    elif formato in ("npy", "binario"):
+        datos = _abrir_array(origen, formato, dtype)
+        if datos.ndim == 2:
+            datos = datos[:, columna if columna is not None else 0]
+        elif datos.ndim != 1:
+            raise ValueError("Solo se admiten arrays de una o dos dimensiones.")
+        for inicio in range(0, len(datos), tamano_bloque):
+            yield np.asarray(datos[inicio:inicio + tamano_bloque], dtype=np.float64)
+
+    else:
+        raise ValueError(f"Formato de archivo no soportado: '{formato}'.")
+
+
+def contar_valores(origen, formato: str, columna=None, dtype: str = "float64") -> Optional[int]:
+    '''
+    Número de valores de la columna sin leer los datos (metadatos de Parquet,
+    tamaño del array), o None si solo se conoce al recorrer el archivo (CSV).
+    '''
+    if formato == "parquet":
+        return _importar_pyarrow().ParquetFile(_rebobinar(origen)).metadata.num_rows
+    if formato in ("npy", "binario"):
+        return len(_abrir_array(origen, formato, dtype))
+    return None
+
+
+def acumular_archivo(origen, formato: str, columna=None, tamano_bloque: int = TAMANO_BLOQUE,
+                     dtype: str = "float64",
+                     acumulador: Optional[AcumuladorEstadistico] = None,
+                     al_avanzar: Optional[Callable[[AcumuladorEstadistico, int], None]] = None
+                     ) -> AcumuladorEstadistico:
+    '''
+    Recorre un archivo una única vez, bloque a bloque, acumulando sus estadísticos.
+
+    :param al_avanzar: Función opcional que se llama tras cada bloque con el acumulador y
+                       el número de valores leídos hasta el momento (para informar el
+                       progreso o interrumpir la lectura lanzando una excepción).
+    :return: Acumulador con los estadísticos de toda la columna.
+    '''
+    acumulador = acumulador if acumulador is not None else AcumuladorEstadistico()
+    leidos = 0
+    for bloque in leer_bloques(origen, formato, columna, tamano_bloque, dtype):
+        acumulador.actualizar(bloque)
+        leidos += len(bloque)
+        if al_avanzar is not None:
+            al_avanzar(acumulador, leidos)
+    return acumulador
+
+
+def histograma_archivo(origen, formato: str, minimo: float, maximo: float, n_barras: int, columna=None,
+                       tamano_bloque: int = TAMANO_BLOQUE, dtype: str = "float64",
+                       al_avanzar: Optional[Callable[[int], None]] = None) -> tuple:
+    '''
+    Frecuencias de la columna en n_barras intervalos iguales entre minimo y maximo
+    (obtenidos de una pasada previa), en una sola pasada por bloques.
+
+    :param al_avanzar: Función opcional que se llama tras cada bloque con los valores leídos.
+    :return: Tupla (limites, conteos), con len(limites) == n_barras + 1.
+    '''
+    if minimo == maximo:
+        # Como en crear_intervalos: un único intervalo de amplitud 1 centrado en el valor
+        minimo, maximo, n_barras = minimo - 0.5, maximo + 0.5, 1
+    limites = np.linspace(minimo, maximo, n_barras + 1)
+    conteos = np.zeros(n_barras, dtype=np.int64)
+    leidos = 0
+    for bloque in leer_bloques(origen, formato, columna, tamano_bloque, dtype):
+        conteos += np.histogram(bloque[~np.isnan(bloque)], bins=limites)[0]
+        leidos += len(bloque)
+        if al_avanzar is not None:
+            al_avanzar(leidos)
+    return limites, conteos
+
+
+def leer_columnas(origen, formato: str, columnas: list, columna_grupo=None,
+                  dtype: str = "float64") -> pd.DataFrame:
+    '''
+    Lee varias columnas de un archivo en un único DataFrame (para el análisis de
+    varias series). Solo se leen las columnas pedidas; las numéricas se convierten
+    a float64 (lo no numérico queda como NaN) y la de grupo se conserva tal cual.
+
+    :param columnas: Columnas numéricas (nombres en CSV/Parquet, índices en .npy 2-D).
+    :param columna_grupo: Columna opcional con la clave de grupo.
+    :return: DataFrame con las columnas pedidas (y la de grupo, si se indicó).
+    '''
+    seleccion = list(columnas) + ([columna_grupo] if columna_grupo is not None
+                                  and columna_grupo not in columnas else [])
+    if formato == "csv":
+        tabla = pd.read_csv(_rebobinar(origen), usecols=seleccion)[seleccion]
+    elif formato == "parquet":
+        tabla = _importar_pyarrow().read_table(_rebobinar(origen), columns=seleccion).to_pandas()
+    elif formato in ("npy", "binario"):
+        datos = _abrir_array(origen, formato, dtype)
+        if datos.ndim == 1:
+            datos, seleccion = datos.reshape(-1, 1), [0]
+        elif datos.ndim != 2:
+            raise ValueError("Solo se admiten arrays de una o dos dimensiones.")
+        return pd.DataFrame(np.asarray(datos[:, seleccion], dtype=np.float64), columns=seleccion)
+    else:
+        raise ValueError(f"Formato de archivo no soportado: '{formato}'.")
+
+    for columna in columnas:
+        if columna != columna_grupo:
+            tabla[columna] = pd.to_numeric(tabla[columna], errors="coerce").astype(np.float64)
+    return tabla
@@ -0,0 +1,234 @@
+# core/instrumentacion.py
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Optional
+
+import pandas as pd
+
+from core.cache import tamano_aproximado
+
+# Etapas del análisis, en el orden en que se ejecutan
+ETAPAS = ("parseo", "tabla", "intervalos", "metricas", "histograma", "normalidad", "atipicos", "boxplot",
+          "bootstrap", "renderizado")
+
+# Límites (segundos) de los buckets del histograma de latencias para Prometheus
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+registro = logging.getLogger("statboard.instrumentacion")
+
+# tracemalloc es global al proceso y las sesiones de Streamlit son hilos: se cuentan las
+# sesiones (hilos) que trazan para que lo arranque la primera y lo detenga la última
+_candado_trazas = threading.Lock()
+_hilos_trazando = {}        # identificador del hilo -> bloques trazar_memoria abiertos
+_trazas_propias = False     # tracemalloc lo arrancó trazar_memoria (y no, p. ej., -X tracemalloc)
+_altas_trazas = 0           # veces que un hilo ha empezado a trazar: invalida los picos en curso
+
+
+def tamano_carga(objeto, serializar: bool = False) -> Optional[int]:
+    '''
+    Tamaño (bytes) del resultado de una etapa. Las figuras de Plotly se miden por su
+    JSON, que es lo que se envía al navegador, solo si serializar es True (cuesta
+    tanto como serializarlas de nuevo).
+    '''
+    if objeto is None:
+        return None
+    if hasattr(objeto, "to_plotly_json"):
+        return len(objeto.to_json()) if serializar else None
+    return tamano_aproximado(objeto)
+
+
+@contextmanager
+def trazar_memoria(activo: bool = True):
+    '''
+    Activa tracemalloc durante el bloque (si no estaba ya activo) para que las
+    etapas registren su memoria pico. Ralentiza la ejecución, por lo que se
+    reserva al modo diagnóstico. Es seguro entre sesiones: tracemalloc se detiene
+    al salir el último hilo que lo pidió, y solo si lo arrancó esta función.
+    '''
+    global _trazas_propias, _altas_trazas
+    if not activo:
+        yield
+        return
+    hilo = threading.get_ident()
+    with _candado_trazas:
+        if not _hilos_trazando and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _trazas_propias = True
+        _hilos_trazando[hilo] = _hilos_trazando.get(hilo, 0) + 1
+        _altas_trazas += 1
+    try:
+        yield
+    finally:
+        with _candado_trazas:
+            _hilos_trazando[hilo] -= 1
+            if not _hilos_trazando[hilo]:
+                del _hilos_trazando[hilo]
+            if not _hilos_trazando and _trazas_propias:
+                tracemalloc.stop()
+                _trazas_propias = False
+
+
+def _iniciar_pico() -> Optional[tuple]:
+    '''
+    Reinicia el pico de tracemalloc si solo lo usa el hilo actual (o nadie mediante
+    trazar_memoria, p. ej. si se arrancó con -X tracemalloc).
+
+    :return: Tupla (memoria inicial, altas) para _leer_pico, o None si no se puede medir.
+    '''
+    with _candado_trazas:
+        if not tracemalloc.is_tracing() or set(_hilos_trazando) - {threading.get_ident()}:
+            return None
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0], _altas_trazas
+
+
+def _leer_pico(inicio: Optional[tuple]) -> Optional[int]:
+    '''Memoria pico desde _iniciar_pico, o None si entretanto otro hilo empezó a trazar.'''
+    if inicio is None:
+        return None
+    memoria_inicial, altas = inicio
+    with _candado_trazas:
+        if altas != _altas_trazas or not tracemalloc.is_tracing():
+            return None
+        return tracemalloc.get_traced_memory()[1] - memoria_inicial
+
+
+class Instrumentacion:
+    '''
+    Mediciones de una ejecución del análisis: tiempo de reloj, tiempo de CPU del
+    hilo, memoria pico (si tracemalloc está activo) y tamaño del resultado de cada
+    etapa. Una etapa medida varias veces (p. ej. el renderizado, repartido en
+    bloques) acumula sus tiempos y cargas y conserva el mayor pico. Las etapas no
+    deben anidarse: cada una reinicia el pico de tracemalloc. Como el pico es global
+    al proceso, no se mide (queda en None) si otra sesión está trazando a la vez.
+
+    Uso:
+        with instrumentacion.etapa("tabla") as medicion:
+            tabla = crear_tabla_estadistica(serie)
+            medicion.carga(tabla)
+    '''
+
+    def __init__(self, serializar_cargas: bool = False):
+        self.serializar_cargas = serializar_cargas
+        self._mediciones = {}
+
+    @contextmanager
+    def etapa(self, nombre: str):
+        medicion = _Medicion(self.serializar_cargas)
+        inicio_pico = _iniciar_pico()
+        inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield medicion
+        finally:
+            fila = {
+                "etapa": nombre,
+                "tiempo_s": time.perf_counter() - inicio,
+                "cpu_s": time.thread_time() - inicio_cpu,
+                "pico_bytes": _leer_pico(inicio_pico),
+                "carga_bytes": medicion.bytes,
+            }
+            self._acumular(fila)
+            registro.info(json.dumps({"evento": "etapa", **fila}))
+
+    def _acumular(self, fila: dict):
+        anterior = self._mediciones.get(fila["etapa"])
+        if anterior is None:
+            self._mediciones[fila["etapa"]] = fila
+            return
+        anterior["tiempo_s"] += fila["tiempo_s"]
+        anterior["cpu_s"] += fila["cpu_s"]
+        for clave, combinar in (("pico_bytes", max), ("carga_bytes", lambda a, b: a + b)):
+            if fila[clave] is not None:
+                anterior[clave] = fila[clave] if anterior[clave] is None else combinar(anterior[clave], fila[clave])
+
+    def mediciones(self) -> list:
+        '''Una medición (diccionario) por etapa, en el orden de ETAPAS.'''
+        orden = {nombre: i for i, nombre in enumerate(ETAPAS)}
+        return sorted((dict(fila) for fila in self._mediciones.values()),
+                      key=lambda fila: orden.get(fila["etapa"], len(ETAPAS)))
+
+    def tabla(self) -> pd.DataFrame:
+        '''Mediciones como DataFrame indexado por etapa, con una fila 'total'.'''
+        tabla = pd.DataFrame(self.mediciones(),
+                             columns=["etapa", "tiempo_s", "cpu_s", "pico_bytes", "carga_bytes"]).set_index("etapa")
+        tabla.loc["total"] = [tabla["tiempo_s"].sum(), tabla["cpu_s"].sum(),
+                              tabla["pico_bytes"].max(), tabla["carga_bytes"].sum(min_count=1)]
+        return tabla
+
+    def a_json_lineas(self, **contexto) -> str:
+        '''Registro estructurado: un objeto JSON por línea y etapa, con el contexto indicado.'''
+        return "\n".join(json.dumps({**contexto, **fila}) for fila in self.mediciones())
+
+
+class _Medicion:
+    '''Objeto que recibe el bloque medido para informar el tamaño de su resultado.'''
+
+    def __init__(self, serializar: bool):
+        self._serializar = serializar
+        self.bytes = None
+
+    def carga(self, *objetos):
+        for objeto in objetos:
+            tamano = tamano_carga(objeto, self._serializar)
+            if tamano is not None:
+                self.bytes = tamano if self.bytes is None else self.bytes + tamano
+
+
+class RegistroEtapas:
+    '''
+    Agregado de las mediciones de todas las ejecuciones del proceso (histograma de
+    latencias, CPU acumulada y último pico/carga por etapa), exportable en el
+    formato de texto de Prometheus. Es seguro entre hilos (sesiones de Streamlit).
+    '''
+
+    def __init__(self, limites: tuple = LIMITES_LATENCIA):
+        self.limites = tuple(limites)
+        self._etapas = {}
+        self._candado = threading.Lock()
+
+    def registrar(self, instrumentacion: Instrumentacion):
+        with self._candado:
+            for fila in instrumentacion.mediciones():
+                etapa = self._etapas.setdefault(fila["etapa"], {
+                    "buckets": [0] * len(self.limites), "n": 0, "tiempo_s": 0.0, "cpu_s": 0.0,
+                    "pico_bytes": None, "carga_bytes": None})
+                for i, limite in enumerate(self.limites):
+                    if fila["tiempo_s"] <= limite:
+                        etapa["buckets"][i] += 1
+                etapa["n"] += 1
+                etapa["tiempo_s"] += fila["tiempo_s"]
+                etapa["cpu_s"] += fila["cpu_s"]
+                for clave in ("pico_bytes", "carga_bytes"):
+                    if fila[clave] is not None:
+                        etapa[clave] = fila[clave]
+
+    def a_prometheus(self, prefijo: str = "statboard") -> str:
+        '''Exposición en formato de texto de Prometheus (versión 0.0.4).'''
+        with self._candado:
+            etapas = {nombre: {**datos, "buckets": list(datos["buckets"])} for nombre, datos in self._etapas.items()}
+
+        lineas = [f"# HELP {prefijo}_etapa_duracion_segundos Tiempo de reloj por etapa del análisis.",
+                  f"# TYPE {prefijo}_etapa_duracion_segundos histogram"]
+        for nombre, datos in etapas.items():
+            for limite, cuenta in zip(self.limites, datos["buckets"]):
+                lineas.append(f'{prefijo}_etapa_duracion_segundos_bucket{{etapa="{nombre}",le="{limite}"}} {cuenta}')
+            lineas.append(f'{prefijo}_etapa_duracion_segundos_bucket{{etapa="{nombre}",le="+Inf"}} {datos["n"]}')
+            lineas.append(f'{prefijo}_etapa_duracion_segundos_sum{{etapa="{nombre}"}} {datos["tiempo_s"]}')
+            lineas.append(f'{prefijo}_etapa_duracion_segundos_count{{etapa="{nombre}"}} {datos["n"]}')
+
+        lineas += [f"# HELP {prefijo}_etapa_cpu_segundos_total Tiempo de CPU acumulado por etapa.",
+                   f"# TYPE {prefijo}_etapa_cpu_segundos_total counter"]
+        lineas += [f'{prefijo}_etapa_cpu_segundos_total{{etapa="{nombre}"}} {datos["cpu_s"]}'
+                   for nombre, datos in etapas.items()]
+
+        for clave, descripcion in (("pico_bytes", "Memoria pico de la última medición por etapa."),
+                                   ("carga_bytes", "Tamaño del resultado de la última medición por etapa.")):
+            metrica = f"{prefijo}_etapa_{clave}"
+            lineas += [f"# HELP {metrica} {descripcion}", f"# TYPE {metrica} gauge"]
+            lineas += [f'{metrica}{{etapa="{nombre}"}} {datos[clave]}'
+                       for nombre, datos in etapas.items() if datos[clave] is not None]
+        return "\n".join(lineas) + "\n"
@@ -2,26 +2,23 @@
 import pandas as pd
 import numpy as np
 
-def crear_intervalos(serie_valores: pd.Series,criterio_intervalos:str):
+def calcular_numero_intervalos(criterio_intervalos: str, n: int, rango: float, desviacion: float = None) -> int:
     '''
-    Crea intervalos para datos continuos basados en el criterio seleccionado.
-    
-    :param serie_valores: Serie de Pandas con los valores numéricos.
-    :param criterio_intervalos: Criterio para definir los intervalos
-    :return: DataFrame con los intervalos y sus frecuencias.
-    '''
-    n = len(serie_valores)
-    valor_min = serie_valores.min()
-    valor_max = serie_valores.max()
-    rango = valor_max - valor_min
+    Calcula el número de intervalos k según el criterio seleccionado.
 
+    :param criterio_intervalos: "Raíz cuadrada", "Regla de Sturges", "Regla de Scott" o un entero.
+    :param n: Número de datos.
+    :param rango: Rango de los datos (máximo - mínimo).
+    :param desviacion: Desviación estándar (solo para la Regla de Scott).
+    :return: Número de intervalos (>= 1).
+    '''
     if criterio_intervalos == "Regla de Sturges":
         k = int(np.ceil(1 + np.log2(n)))
     elif criterio_intervalos == "Raíz cuadrada":
         k = int(np.ceil(np.sqrt(n)))
     elif criterio_intervalos == "Regla de Scott":
-        h = 3.5 * serie_valores.std() / (n ** (1/3))
-        k = int(np.ceil(rango / h))
+        h = 3.5 * desviacion / (n ** (1/3))
+        k = int(np.ceil(rango / h)) if h > 0 else 1
     else:
         try:
             k = int(criterio_intervalos)
@@ -29,16 +26,100 @@ def crear_intervalos(serie_valores: pd.Series,criterio_intervalos:str):
                 raise ValueError("El número de intervalos debe ser mayor a cero.")
         except ValueError:
             raise ValueError("Criterio de intervalos no reconocido.")
-    
-    ancho_intervalo = round(rango / k)
-    limites_inferiores = [valor_min + i * ancho_intervalo for i in range(k)]
-    limites_superiores= [limites_inferiores[i] + ancho_intervalo for i in range(k)]
-    marcas_de_clase = [(limites_inferiores[i] + limites_superiores[i]) / 2 for i in range(k)]
-    frecuencias, _ = np.histogram(serie_valores, bins=k, range=(valor_min, valor_max))
+    return max(k, 1)
+
+def calcular_limites(valor_min: float, valor_max: float, k: int) -> np.ndarray:
+    '''
+    Calcula los k + 1 límites de k intervalos de igual amplitud entre el mínimo y el máximo.
+    Son exactamente los límites con los que se cuentan las frecuencias (sin redondeos).
+    Si todos los datos son iguales se usa un único intervalo de amplitud 1 centrado en el valor.
+    '''
+    if valor_max == valor_min:
+        return np.array([valor_min - 0.5, valor_max + 0.5])
+    return np.linspace(valor_min, valor_max, k + 1)
+
+def contar_en_intervalos(valores, limites: np.ndarray, ordenados: bool = False,
+                         conteos: np.ndarray = None) -> np.ndarray:
+    '''
+    Cuenta los valores de cada intervalo [Li, Ls); el último intervalo incluye su límite superior.
+
+    Con valores ordenados basta una búsqueda binaria por límite (O(k log n), sin recorrer
+    los datos); sin ordenar, una sola pasada asigna cada valor a su intervalo.
+
+    :param valores: Valores numéricos (sin NaN).
+    :param limites: Límites de los intervalos (k + 1 valores crecientes).
+    :param ordenados: Indica si `valores` ya está ordenado.
+    :param conteos: Frecuencia de cada valor, si `valores` son los valores únicos
+                    ordenados de una tabla de frecuencias.
+    :return: Array de k frecuencias absolutas.
+    '''
+    k = len(limites) - 1
+    if ordenados or conteos is not None:
+        cortes = np.searchsorted(valores, limites[1:-1], side='left')
+        inicio = np.searchsorted(valores, limites[0], side='left')
+        fin = np.searchsorted(valores, limites[-1], side='right')
+        posiciones = np.concatenate(([inicio], cortes, [fin]))
+        if conteos is not None:
+            # Las posiciones sobre los valores únicos se traducen a datos con las acumuladas
+            posiciones = np.concatenate(([0], np.cumsum(conteos)))[posiciones]
+        return np.diff(posiciones)
+
+    # Límites equiespaciados: np.histogram asigna por aritmética entera, por bloques del
+    # tamaño de la caché, con los mismos límites (linspace) que se muestran en la tabla.
+    # Límites arbitrarios (precalculados): asignación por searchsorted.
+    equiespaciados = np.array_equal(limites, np.linspace(limites[0], limites[-1], k + 1))
+    if equiespaciados:
+        frecuencias, _ = np.histogram(valores, bins=k, range=(limites[0], limites[-1]))
+    else:
+        frecuencias, _ = np.histogram(valores, bins=limites)
+    return frecuencias
+
+def crear_intervalos(serie_valores: pd.Series, criterio_intervalos: str,
+                     valores_ordenados: np.ndarray = None, limites: np.ndarray = None,
+                     conteos: np.ndarray = None):
+    '''
+    Crea intervalos para datos continuos basados en el criterio seleccionado.
+
+    :param serie_valores: Serie de Pandas con los valores numéricos.
+    :param criterio_intervalos: Criterio para definir los intervalos
+    :param valores_ordenados: Copia ordenada de los valores (ver ordenar_valores). Permite
+                              reagrupar con otro criterio sin volver a recorrer los datos.
+    :param limites: Límites ya calculados (k + 1 valores); si se indican se ignora el criterio.
+    :param conteos: Frecuencias de una tabla ya agregada: en ese caso `valores_ordenados`
+                    son sus valores únicos y todo se calcula sin expandir los datos.
+    :return: DataFrame con los intervalos y sus frecuencias.
+    '''
+    if conteos is not None:
+        n = int(np.sum(conteos))
+        valor_min, valor_max = valores_ordenados[0], valores_ordenados[-1]
+        datos = valores_ordenados
+    elif valores_ordenados is not None:
+        n = len(valores_ordenados)
+        valor_min, valor_max = valores_ordenados[0], valores_ordenados[-1]
+        datos = valores_ordenados
+    else:
+        datos = np.asarray(serie_valores, dtype=np.float64)
+        datos = datos[~np.isnan(datos)]
+        n = len(datos)
+        valor_min, valor_max = datos.min(), datos.max()
+
+    if limites is None:
+        desviacion = 0.0
+        if criterio_intervalos == "Regla de Scott" and n > 1:
+            if conteos is None:
+                desviacion = np.std(datos, ddof=1)
+            else:
+                media = np.dot(conteos, datos) / n
+                desviacion = np.sqrt(np.dot(conteos, (datos - media) ** 2) / (n - 1))
+        k = calcular_numero_intervalos(criterio_intervalos, n, valor_max - valor_min, desviacion)
+        limites = calcular_limites(valor_min, valor_max, k)
+    limites = np.asarray(limites, dtype=np.float64)
+
+    frecuencias = contar_en_intervalos(datos, limites, ordenados=valores_ordenados is not None, conteos=conteos)
     tabla_frecuencias = pd.DataFrame({
-        'Límite Inferior': limites_inferiores,
-        'Límite Superior': limites_superiores,
-        'Marca de Clase': marcas_de_clase,
+        'Límite Inferior': limites[:-1],
+        'Límite Superior': limites[1:],
+        'Marca de Clase': (limites[:-1] + limites[1:]) / 2,
         'Frecuencia Absoluta (fi)': frecuencias
     })
     return tabla_frecuencias
@@ -0,0 +1,349 @@
+# core/multiserie.py
+'''
+Análisis de varias series a la vez: columnas de una tabla o una columna dividida
+por una clave de grupo. Todas las series se ordenan juntas y se concatenan en un
+único array (segmentos contiguos, uno por serie); métricas, intervalos y límites
+de atípicos se obtienen con reducciones sobre ese array (reduceat, bincount,
+índices calculados por serie), sin recorrer las series en Python.
+'''
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from core.atipicos import METODOS_ATIPICOS, ESCALA_MAD
+from core.intervals import calcular_numero_intervalos
+
+# Columnas de la tabla comparativa (mismas claves que calcular_metricas_principales)
+CLAVES_METRICAS = ("n", "minimo", "maximo", "Q1", "Q3", "media", "mediana", "moda", "varianza",
+                   "desviacion", "coef_variacion", "rango", "rango_intercuartilico")
+
+
+class Segmentos(NamedTuple):
+    valores: np.ndarray       # Valores de todas las series, ordenados dentro de cada una y concatenados
+    longitudes: np.ndarray    # Número de valores (sin NaN) de cada serie
+    nombres: list             # Nombre de cada serie (columna o grupo)
+
+    @property
+    def inicios(self) -> np.ndarray:
+        '''Posición del primer valor de cada serie en `valores`.'''
+        return np.concatenate(([0], np.cumsum(self.longitudes)[:-1])).astype(np.intp)
+
+    @property
+    def ids(self) -> np.ndarray:
+        '''Índice de serie de cada valor.'''
+        return np.repeat(np.arange(len(self.longitudes)), self.longitudes)
+
+
+class ResultadoMultiserie(NamedTuple):
+    comparacion: pd.DataFrame     # Una fila por serie: métricas y límites/conteos de atípicos
+    intervalos: pd.DataFrame      # Tablas de intervalos de todas las series (columna 'Serie')
+
+
+def segmentar_columnas(datos) -> Segmentos:
+    '''
+    Segmentos de las columnas de un DataFrame o de un array 2-D (una serie por
+    columna). Todas las columnas se ordenan en una sola llamada sobre la matriz
+    traspuesta; los NaN quedan al final de cada fila y se descartan.
+    '''
+    if isinstance(datos, pd.DataFrame):
+        nombres = list(datos.columns)
+        matriz = datos.to_numpy(dtype=np.float64)
+    else:
+        matriz = np.asarray(datos, dtype=np.float64)
+        if matriz.ndim == 1:
+            matriz = matriz.reshape(-1, 1)
+        nombres = list(range(matriz.shape[1]))
+    if matriz.ndim != 2:
+        raise ValueError("Se esperaba una tabla o un array de dos dimensiones.")
+
+    ordenada = np.sort(np.ascontiguousarray(matriz.T), axis=1)
+    validos = ~np.isnan(ordenada)
+    return Segmentos(ordenada[validos], validos.sum(axis=1), nombres)
+
+
+def segmentar_grupos(valores, grupos) -> Segmentos:
+    '''
+    Segmentos de una columna dividida por una clave de grupo (una serie por valor
+    distinto de la clave, en orden). Se descartan los valores NaN y las filas sin grupo.
+    '''
+    valores = np.asarray(valores, dtype=np.float64)
+    codigos, etiquetas = pd.factorize(np.asarray(grupos), sort=True)
+    if len(codigos) != len(valores):
+        raise ValueError("Los valores y los grupos deben tener la misma longitud.")
+    validos = ~np.isnan(valores) & (codigos >= 0)
+    valores, codigos = valores[validos], codigos[validos]
+    orden = np.lexsort((valores, codigos))
+    return Segmentos(valores[orden], np.bincount(codigos, minlength=len(etiquetas)), list(etiquetas))
+
+
+def cuantiles_segmentados(segmentos: Segmentos, p: float) -> np.ndarray:
+    '''
+    Cuantil p de cada serie con interpolación lineal (como cuantil_ordenado).
+    Las series vacías devuelven NaN.
+    '''
+    n = segmentos.longitudes
+    resultado = np.full(len(n), np.nan)
+    con_datos = n > 0
+    if not con_datos.any():
+        return resultado
+    n, inicios = n[con_datos], segmentos.inicios[con_datos]
+    h = (n - 1) * p
+    i = np.floor(h).astype(np.intp)
+    t = h - i
+    a = segmentos.valores[inicios + i]
+    b = segmentos.valores[inicios + np.minimum(i + 1, n - 1)]
+    # Misma interpolación que numpy (ver frecuencias._interpolar)
+    resultado[con_datos] = np.where(t >= 0.5, b - (b - a) * (1 - t), a + (b - a) * t)
+    return resultado
+
+
+def busqueda_segmentada(segmentos: Segmentos, serie: np.ndarray, objetivos: np.ndarray,
+                        lado: str = 'left') -> np.ndarray:
+    '''
+    np.searchsorted de cada objetivo dentro de su serie, para todos a la vez: una
+    búsqueda binaria vectorizada (O(log n) pasos sobre los objetivos, sin tocar el
+    resto de los valores).
+
+    :param serie: Índice de serie de cada objetivo.
+    :param objetivos: Valores a buscar.
+    :param lado: 'left' o 'right', como en np.searchsorted.
+    :return: Posición de cada objetivo relativa al inicio de su serie.
+    '''
+    inicios = segmentos.inicios[serie]
+    bajo, alto = inicios.copy(), inicios + segmentos.longitudes[serie]
+    objetivos = np.asarray(objetivos, dtype=np.float64)
+    pendientes = np.flatnonzero(bajo < alto)
+    while len(pendientes):
+        medio = (bajo[pendientes] + alto[pendientes]) // 2
+        valor = segmentos.valores[medio]
+        avanzar = valor < objetivos[pendientes] if lado == 'left' else valor <= objetivos[pendientes]
+        bajo[pendientes] = np.where(avanzar, medio + 1, bajo[pendientes])
+        alto[pendientes] = np.where(avanzar, alto[pendientes], medio)
+        pendientes = pendientes[bajo[pendientes] < alto[pendientes]]
+    return bajo - inicios
+
+
+def _modas(segmentos: Segmentos) -> list:
+    '''Moda(s) de cada serie como texto, a partir de las rachas de valores iguales.'''
+    valores, ids = segmentos.valores, segmentos.ids
+    k = len(segmentos.longitudes)
+    if len(valores) == 0:
+        return [""] * k
+    nueva_racha = np.ones(len(valores), dtype=bool)
+    nueva_racha[1:] = (valores[1:] != valores[:-1]) | (ids[1:] != ids[:-1])
+    inicios_racha = np.flatnonzero(nueva_racha)
+    largos = np.diff(np.append(inicios_racha, len(valores)))
+    serie_racha = ids[inicios_racha]
+
+    # Racha más larga de cada serie (las rachas de una serie son contiguas)
+    maximos = np.zeros(k, dtype=largos.dtype)
+    con_datos = segmentos.longitudes > 0
+    primeras = np.searchsorted(serie_racha, np.flatnonzero(con_datos))
+    maximos[con_datos] = np.maximum.reduceat(largos, primeras)
+
+    modales = largos == maximos[serie_racha]
+    valores_modales = valores[inicios_racha[modales]]
+    cortes = np.searchsorted(serie_racha[modales], np.arange(1, k))
+    return [", ".join(map(str, parte.tolist())) for parte in np.split(valores_modales, cortes)]
+
+
+def metricas_segmentadas(segmentos: Segmentos) -> pd.DataFrame:
+    '''
+    Métricas de calcular_metricas_principales para todas las series a la vez.
+
+    :return: DataFrame con una fila por serie (índice 'Serie') y una columna por métrica.
+    '''
+    valores, n = segmentos.valores, segmentos.longitudes
+    k = len(n)
+    con_datos = n > 0
+    inicios = segmentos.inicios[con_datos]
+    n_con_datos = n[con_datos]
+
+    minimo, maximo, media, varianza = (np.full(k, np.nan) for _ in range(4))
+    if con_datos.any():
+        minimo[con_datos] = valores[inicios]
+        maximo[con_datos] = valores[inicios + n_con_datos - 1]
+        media[con_datos] = np.add.reduceat(valores, inicios) / n_con_datos
+        # Segunda pasada sobre los desvíos, con el término de corrección de la suma
+        desvios = valores - media[segmentos.ids]
+        suma = np.add.reduceat(desvios, inicios)
+        m2 = np.add.reduceat(desvios * desvios, inicios) - suma * suma / n_con_datos
+        with np.errstate(divide='ignore', invalid='ignore'):
+            varianza[con_datos] = np.where(n_con_datos > 1, m2 / (n_con_datos - 1), np.nan)
+    desviacion = np.sqrt(varianza)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coef_variacion = np.where(media != 0, desviacion / media * 100, 0)
+
+    Q1 = cuantiles_segmentados(segmentos, 0.25)
+    Q3 = cuantiles_segmentados(segmentos, 0.75)
+    metricas = pd.DataFrame({
+        "n": n,
+        "minimo": minimo,
+        "maximo": maximo,
+        "Q1": Q1,
+        "Q3": Q3,
+        "media": media,
+        "mediana": cuantiles_segmentados(segmentos, 0.5),
+        "moda": _modas(segmentos),
+        "varianza": varianza,
+        "desviacion": desviacion,
+        "coef_variacion": coef_variacion,
+        "rango": maximo - minimo,
+        "rango_intercuartilico": Q3 - Q1,
+    }, index=pd.Index(segmentos.nombres, name="Serie"))
+    return metricas
+
+
+def limites_atipicos_segmentados(segmentos: Segmentos, metricas: pd.DataFrame,
+                                 metodo: str = METODOS_ATIPICOS[0], factor_tukey: float = 1.5,
+                                 factor_mad: float = 3.0, percentiles: tuple = (0.01, 0.99)) -> pd.DataFrame:
+    '''
+    Límites de atípicos (como calcular_limites) y conteos por lado de cada serie.
+
+    :param metricas: Resultado de metricas_segmentadas para los mismos segmentos.
+    :return: DataFrame con limite_inferior, limite_superior, n_inferiores, n_superiores y n_atipicos.
+    '''
+    if metodo == "Tukey (1.5 IQR)":
+        iqr = metricas["rango_intercuartilico"].to_numpy()
+        inferior = metricas["Q1"].to_numpy() - factor_tukey * iqr
+        superior = metricas["Q3"].to_numpy() + factor_tukey * iqr
+    elif metodo == "MAD":
+        # Mediana de los desvíos absolutos de cada serie: se ordenan todos a la vez por (serie, desvío)
+        ids = segmentos.ids
+        mediana = metricas["mediana"].to_numpy()
+        desvios = np.abs(segmentos.valores - mediana[ids])
+        desvios = desvios[np.lexsort((desvios, ids))]
+        mad = cuantiles_segmentados(segmentos._replace(valores=desvios), 0.5)
+        inferior = mediana - factor_mad * ESCALA_MAD * mad
+        superior = mediana + factor_mad * ESCALA_MAD * mad
+    elif metodo == "Percentiles":
+        inferior = cuantiles_segmentados(segmentos, percentiles[0])
+        superior = cuantiles_segmentados(segmentos, percentiles[1])
+    else:
+        raise ValueError(f"Método de detección de atípicos no reconocido: '{metodo}'.")
+
+    # Sobre series ordenadas los atípicos son un prefijo y un sufijo: dos búsquedas por serie
+    series = np.arange(len(segmentos.longitudes))
+    n_inferiores = busqueda_segmentada(segmentos, series, inferior, 'left')
+    n_superiores = segmentos.longitudes - busqueda_segmentada(segmentos, series, superior, 'right')
+    return pd.DataFrame({
+        "limite_inferior": inferior,
+        "limite_superior": superior,
+        "n_inferiores": n_inferiores,
+        "n_superiores": n_superiores,
+        "n_atipicos": n_inferiores + n_superiores,
+    }, index=metricas.index)
+
+
+def _numero_intervalos(criterio_intervalos: str, n: np.ndarray, rango: np.ndarray,
+                       desviacion: np.ndarray) -> np.ndarray:
+    '''Versión vectorizada de calcular_numero_intervalos (un k por serie).'''
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if criterio_intervalos == "Regla de Sturges":
+            k = np.ceil(1 + np.log2(n))
+        elif criterio_intervalos == "Raíz cuadrada":
+            k = np.ceil(np.sqrt(n))
+        elif criterio_intervalos == "Regla de Scott":
+            h = 3.5 * desviacion / (n ** (1 / 3))
+            k = np.where(h > 0, np.ceil(rango / h), 1)
+        else:
+            k = np.full(len(n), calcular_numero_intervalos(criterio_intervalos, 1, 0.0))
+    return np.maximum(np.nan_to_num(k, nan=1), 1).astype(np.intp)
+
+
+def intervalos_segmentados(segmentos: Segmentos, criterio_intervalos: str,
+                           metricas: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Tablas de intervalos (como crear_intervalos + completar_tabla_intervalos) de todas
+    las series: los límites se generan para todas a la vez y, como cada serie está
+    ordenada, las frecuencias salen de una búsqueda binaria por límite (sin recorrer
+    los valores).
+
+    :return: DataFrame con la columna 'Serie' y las columnas de la tabla de intervalos.
+    '''
+    n = segmentos.longitudes
+    con_datos = n > 0
+    minimo = metricas["minimo"].to_numpy()
+    maximo = metricas["maximo"].to_numpy()
+    # Como en crear_intervalos, la desviación de Scott solo se usa con más de un dato
+    desviacion = np.where(n > 1, metricas["desviacion"].to_numpy(), 0.0)
+    constantes = maximo == minimo
+
+    k = np.where(con_datos, _numero_intervalos(criterio_intervalos, n, maximo - minimo, desviacion), 0)
+    k[con_datos & constantes] = 1
+
+    # Límites de todas las series: Li + j·(rango / k), con el último igual al máximo (como np.linspace)
+    n_limites = np.where(con_datos, k + 1, 0)
+    serie_limite = np.repeat(np.arange(len(n)), n_limites)
+    inicio_limites = np.concatenate(([0], np.cumsum(n_limites)[:-1]))
+    j = np.arange(n_limites.sum()) - inicio_limites[serie_limite]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        paso = (maximo - minimo) / k
+    limites = j * paso[serie_limite] + minimo[serie_limite]
+    ultimos = inicio_limites[con_datos] + k[con_datos]
+    limites[ultimos] = maximo[con_datos]
+    # Series constantes: un único intervalo de amplitud 1 centrado en el valor
+    fijas = con_datos & constantes
+    limites[inicio_limites[fijas]] = minimo[fijas] - 0.5
+    limites[inicio_limites[fijas] + 1] = maximo[fijas] + 0.5
+
+    # Posición de cada límite en su serie: el primero (mínimo) abre la serie y el último
+    # (máximo) la cierra, de modo que el último intervalo incluye su límite superior
+    posiciones = busqueda_segmentada(segmentos, serie_limite, limites, 'left')
+    posiciones[inicio_limites[con_datos]] = 0
+    posiciones[ultimos] = n[con_datos]
+    inicio_clases = np.concatenate(([0], np.cumsum(k)[:-1]))
+    es_limite_superior = np.ones(len(limites), dtype=bool)
+    es_limite_superior[inicio_limites[con_datos]] = False
+    frecuencias = np.diff(posiciones)[es_limite_superior[1:]]
+
+    # Límites inferior y superior de cada clase (se descarta el último / el primero de cada serie)
+    serie_clase = np.repeat(np.arange(len(n)), k)
+    posicion = np.arange(int(k.sum())) - inicio_clases[serie_clase] + inicio_limites[serie_clase]
+    inferiores, superiores = limites[posicion], limites[posicion + 1]
+    acumuladas = np.cumsum(frecuencias)
+    acumuladas -= np.concatenate(([0], acumuladas))[inicio_clases][serie_clase]
+    total = n[serie_clase]
+
+    return pd.DataFrame({
+        'Serie': np.asarray(segmentos.nombres, dtype=object)[serie_clase],
+        'Límite Inferior': inferiores,
+        'Límite Superior': superiores,
+        'Marca de Clase': (inferiores + superiores) / 2,
+        'Frecuencia Absoluta (fi)': frecuencias,
+        'Frecuencia Relativa (hi)': frecuencias / total,
+        'Porcentaje (pi)': frecuencias / total * 100,
+        'Frecuencia Acumulada (Fi)': acumuladas,
+        'Frecuencia Rel Acumulada (Hi)': acumuladas / total,
+    })
+
+
+def analizar_segmentos(segmentos: Segmentos, criterio_intervalos: str = "Regla de Sturges",
+                       metodo_atipicos: str = METODOS_ATIPICOS[0]) -> ResultadoMultiserie:
+    '''Métricas, atípicos e intervalos de todas las series de unos segmentos.'''
+    metricas = metricas_segmentadas(segmentos)
+    atipicos = limites_atipicos_segmentados(segmentos, metricas, metodo_atipicos)
+    intervalos = intervalos_segmentados(segmentos, criterio_intervalos, metricas)
+    return ResultadoMultiserie(metricas.join(atipicos), intervalos)
+
+
+def analizar_columnas(datos, criterio_intervalos: str = "Regla de Sturges",
+                      metodo_atipicos: str = METODOS_ATIPICOS[0]) -> ResultadoMultiserie:
+    '''
+    Análisis comparativo de varias columnas numéricas.
+
+    :param datos: DataFrame o array 2-D (una serie por columna; los NaN se ignoran).
+    '''
+    return analizar_segmentos(segmentar_columnas(datos), criterio_intervalos, metodo_atipicos)
+
+
+def analizar_grupos(valores, grupos, criterio_intervalos: str = "Regla de Sturges",
+                    metodo_atipicos: str = METODOS_ATIPICOS[0]) -> ResultadoMultiserie:
+    '''
+    Análisis comparativo de una columna dividida por una clave de grupo.
+
+    :param valores: Valores numéricos.
+    :param grupos: Clave de grupo de cada valor (cualquier tipo; los nulos se descartan).
+    '''
+    return analizar_segmentos(segmentar_grupos(valores, grupos), criterio_intervalos, metodo_atipicos)
@@ -0,0 +1,137 @@
+# core/parser.py
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+# Formatos numéricos disponibles: (separador decimal, separador de miles)
+FORMATOS_NUMERICOS = {
+    "1234.5 (punto decimal)": (".", None),
+    "1234,5 (coma decimal)": (",", None),
+    "1.234,5 (miles con punto)": (",", "."),
+    "1,234.5 (miles con coma)": (".", ","),
+}
+
+# Caracteres que, además de los espacios en blanco, separan valores
+SEPARADORES = ",;|"
+
+_LITERALES_NAN = {"nan", "+nan", "-nan"}
+
+# Bytes que np.fromstring(sep=" ") trata como separador (espacios en blanco ASCII)
+_ES_ESPACIO = np.zeros(256, dtype=bool)
+_ES_ESPACIO[list(b" \t\n\r\f\v")] = True
+
+
+class ResultadoParseo(NamedTuple):
+    valores: np.ndarray           # Valores válidos (float64)
+    errores: list                 # [(posición, token), ...] hasta max_errores
+    n_errores: int                # Total de tokens inválidos
+
+
+def _tabla_traduccion(separador_decimal: str, separador_miles: Optional[str]) -> dict:
+    '''
+    Construye la tabla de str.translate que normaliza el texto en una sola copia:
+    separadores -> espacio, decimal -> '.', miles -> eliminado.
+    '''
+    if separador_decimal not in (".", ","):
+        raise ValueError("El separador decimal debe ser '.' o ','.")
+    if separador_miles is not None and separador_miles == separador_decimal:
+        raise ValueError("El separador de miles no puede coincidir con el decimal.")
+
+    tabla = {ord(c): " " for c in SEPARADORES if c not in (separador_decimal, separador_miles)}
+    if separador_miles is not None:
+        tabla[ord(separador_miles)] = None
+    if separador_decimal == ",":
+        tabla[ord(",")] = "."
+    return tabla
+
+
+def _contar_tokens(texto: str) -> int:
+    '''
+    Número de tokens separados por espacios en blanco, contando los inicios de token
+    sobre los bytes del texto (vectorizado, sin crear una cadena por token).
+    '''
+    espacios = _ES_ESPACIO[np.frombuffer(texto.encode(), dtype=np.uint8)]
+    if len(espacios) == 0:
+        return 0
+    return int(not espacios[0]) + int(np.count_nonzero(espacios[:-1] & ~espacios[1:]))
+
+
+def _localizar_errores(texto: str, max_errores: int) -> ResultadoParseo:
+    '''
+    Camino lento (solo si el camino rápido falla): tokeniza y convierte de forma
+    vectorizada, localizando los tokens inválidos por su posición.
+    '''
+    tokens = np.array(texto.split(), dtype=object)
+    valores = pd.to_numeric(pd.Series(tokens, copy=False), errors="coerce").to_numpy(dtype=np.float64)
+
+    # to_numeric devuelve NaN tanto para los errores como para literales 'nan' válidos
+    candidatos = np.flatnonzero(np.isnan(valores))
+    invalidos = [i for i in candidatos if tokens[i].lower() not in _LITERALES_NAN]
+
+    mascara = np.ones(len(valores), dtype=bool)
+    mascara[invalidos] = False
+    errores = [(int(i) + 1, tokens[i]) for i in invalidos[:max_errores]]
+    return ResultadoParseo(valores[mascara], errores, len(invalidos))
+
+
+def parsear_valores(texto: str, separador_decimal: str = ".",
+                    separador_miles: Optional[str] = None,
+                    max_errores: int = 20) -> ResultadoParseo:
+    '''
+    Convierte un texto con valores numéricos directamente en un array float64.
+
+    El texto se normaliza con una única pasada de str.translate y se tokeniza en C
+    con np.fromstring (comprobando que se leyeron todos los tokens). Solo si hay tokens inválidos se recurre a un camino más lento
+    que informa cada token inválido por su posición (1 = primer valor), sin descartar
+    el resto de la entrada.
+
+    :param texto: Cadena con valores separados por espacios, saltos de línea, comas o ';'.
+    :param separador_decimal: '.' o ','. Con ',' la coma deja de separar valores.
+    :param separador_miles: Carácter de miles a ignorar ('.', ',') o None.
+    :param max_errores: Máximo de tokens inválidos a reportar.
+    :return: ResultadoParseo(valores, errores, n_errores).
+    '''
+    texto_limpio = texto.translate(_tabla_traduccion(separador_decimal, separador_miles))
+    if not texto_limpio or texto_limpio.isspace():
+        return ResultadoParseo(np.empty(0, dtype=np.float64), [], 0)
+
+    try:
+        valores = np.fromstring(texto_limpio, dtype=np.float64, sep=" ")
+    except ValueError:
+        return _localizar_errores(texto_limpio, max_errores)
+    # NumPy 1.x no lanza ValueError ante un token inválido: avisa con un DeprecationWarning
+    # y devuelve los valores anteriores. Se detecta porque faltan valores.
+    if len(valores) != _contar_tokens(texto_limpio):
+        return _localizar_errores(texto_limpio, max_errores)
+    return ResultadoParseo(valores, [], 0)
+
+
+def parsear_tabla(texto: str, separador_decimal: str = ".",
+                  separador_miles: Optional[str] = None) -> np.ndarray:
+    '''
+    Convierte un texto con una fila por línea (p. ej. "valor frecuencia" o
+    "límite_inferior límite_superior frecuencia") en un array 2-D float64.
+    El número de columnas lo fija la primera línea no vacía.
+
+    :raises ValueError: Si hay tokens no numéricos o filas con distinto número de columnas.
+    :return: Array de forma (filas, columnas); (0, 0) si el texto está vacío.
+    '''
+    tabla = _tabla_traduccion(separador_decimal, separador_miles)
+    primera = next((linea for linea in texto.splitlines() if linea.strip()), "")
+    n_columnas = len(primera.translate(tabla).split())
+    if n_columnas == 0:
+        return np.empty((0, 0), dtype=np.float64)
+
+    valores, errores, n_errores = parsear_valores(texto, separador_decimal, separador_miles, max_errores=1)
+    if n_errores:
+        posicion, token = errores[0]
+        raise ValueError(f"Valor no numérico en la tabla (posición {posicion}: '{token}').")
+    # Se comprueba fila a fila: con filas desiguales el total puede ser múltiplo de
+    # n_columnas y el reshape formaría pares (valor, frecuencia) equivocados
+    for numero, linea in enumerate(texto.splitlines(), start=1):
+        n_tokens = len(linea.translate(tabla).split())
+        if n_tokens and n_tokens != n_columnas:
+            raise ValueError(f"La línea {numero} tiene {n_tokens} columnas: todas las filas deben tener "
+                             f"{n_columnas} columnas, como la primera.")
+    return valores.reshape(-1, n_columnas)
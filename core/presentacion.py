@@ -0,0 +1,147 @@
+# core/presentacion.py
+'''
+Presentación de la tabla de frecuencias: vista paginada (solo se formatea y se
+envía al navegador la página visible) y exportación completa por bloques a
+CSV o Parquet, escrita en un archivo temporal en disco en lugar de construir el
+archivo entero en memoria.
+'''
+import os
+import tempfile
+from typing import BinaryIO, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+# Tamaños de página ofrecidos en la vista de la tabla
+FILAS_POR_PAGINA = (50, 100, 500, 1000)
+
+# Filas por bloque al exportar (también tamaño de los row groups de Parquet)
+FILAS_POR_BLOQUE = 100_000
+
+FORMATOS_EXPORTACION = {"CSV": ("csv", "text/csv"),
+                        "Parquet": ("parquet", "application/vnd.apache.parquet")}
+
+
+def etiquetas_intervalos(limites_inferiores, limites_superiores, decimales: int = 2) -> np.ndarray:
+    '''
+    Etiquetas "[ Li , Ls )" de un conjunto de intervalos, formateadas por columnas
+    (operaciones de cadena de NumPy) en lugar de fila a fila.
+
+    :return: Array de cadenas, una por intervalo.
+    '''
+    formato = f"%.{decimales}f"
+    inferiores = np.char.mod(formato, np.asarray(limites_inferiores, dtype=np.float64))
+    superiores = np.char.mod(formato, np.asarray(limites_superiores, dtype=np.float64))
+    return np.char.add(np.char.add(np.char.add("[ ", inferiores), " , "), np.char.add(superiores, " )"))
+
+
+def n_paginas(n_filas: int, filas_por_pagina: int) -> int:
+    '''Número de páginas (al menos una, aunque la tabla esté vacía).'''
+    return max(1, -(-n_filas // filas_por_pagina))
+
+
+def pagina_tabla(tabla: pd.DataFrame, pagina: int, filas_por_pagina: int,
+                 columnas: Optional[list] = None) -> pd.DataFrame:
+    '''
+    Porción visible de la tabla. Si es una tabla por intervalos añade la columna
+    'Intervalos' solo para las filas de la página.
+
+    :param pagina: Número de página, empezando en 1 (se acota al rango válido).
+    :param columnas: Columnas a devolver y su orden (por defecto, todas).
+    :return: Nuevo DataFrame con a lo sumo filas_por_pagina filas.
+    '''
+    pagina = min(max(1, pagina), n_paginas(len(tabla), filas_por_pagina))
+    inicio = (pagina - 1) * filas_por_pagina
+    vista = tabla.iloc[inicio:inicio + filas_por_pagina]
+    if 'Límite Inferior' in vista.columns:
+        vista = vista.assign(Intervalos=etiquetas_intervalos(vista['Límite Inferior'].to_numpy(),
+                                                             vista['Límite Superior'].to_numpy()))
+    return vista[columnas] if columnas is not None else vista
+
+
+def _bloques(tabla: pd.DataFrame, filas_por_bloque: int, columnas: Optional[list]) -> Iterator[pd.DataFrame]:
+    '''Bloques de filas de la tabla; las columnas se seleccionan bloque a bloque, sin copiar la tabla.'''
+    for inicio in range(0, len(tabla), filas_por_bloque):
+        bloque = tabla.iloc[inicio:inicio + filas_por_bloque]
+        yield bloque[columnas] if columnas is not None else bloque
+
+
+def bloques_csv(tabla: pd.DataFrame, filas_por_bloque: int = FILAS_POR_BLOQUE,
+                columnas: Optional[list] = None) -> Iterator[bytes]:
+    '''
+    CSV de la tabla (sin índice) en bloques de bytes UTF-8. El primero lleva la
+    cabecera y la marca BOM para que Excel reconozca los acentos.
+
+    :param columnas: Columnas a exportar y su orden (por defecto, todas).
+    '''
+    if tabla.empty:
+        vacia = tabla[columnas] if columnas is not None else tabla
+        yield vacia.to_csv(index=False).encode("utf-8-sig")
+        return
+    for i, bloque in enumerate(_bloques(tabla, filas_por_bloque, columnas)):
+        yield bloque.to_csv(index=False, header=i == 0).encode("utf-8-sig" if i == 0 else "utf-8")
+
+
+def _importar_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError("Para exportar a Parquet instala 'pyarrow' (pip install pyarrow).") from error
+    return pa, pq
+
+
+def escribir_parquet(tabla: pd.DataFrame, destino, filas_por_bloque: int = FILAS_POR_BLOQUE,
+                     columnas: Optional[list] = None) -> None:
+    '''
+    Escribe la tabla (sin índice) en Parquet, un row group por bloque de filas.
+
+    :param destino: Ruta o archivo binario abierto para escritura.
+    :param columnas: Columnas a exportar y su orden (por defecto, todas).
+    '''
+    pa, pq = _importar_pyarrow()
+    cabecera = tabla.iloc[:0]
+    esquema = pa.Schema.from_pandas(cabecera[columnas] if columnas is not None else cabecera,
+                                    preserve_index=False)
+    with pq.ParquetWriter(destino, esquema) as escritor:
+        for bloque in _bloques(tabla, filas_por_bloque, columnas):
+            escritor.write_table(pa.Table.from_pandas(bloque, schema=esquema, preserve_index=False))
+
+
+def escribir_tabla(tabla: pd.DataFrame, destino, formato: str,
+                   filas_por_bloque: int = FILAS_POR_BLOQUE, columnas: Optional[list] = None) -> None:
+    '''
+    Exporta la tabla completa por bloques.
+
+    :param destino: Ruta o archivo binario abierto para escritura.
+    :param formato: "csv" o "parquet".
+    :param columnas: Columnas a exportar y su orden (por defecto, todas).
+    '''
+    if formato == "parquet":
+        escribir_parquet(tabla, destino, filas_por_bloque, columnas)
+    elif formato == "csv":
+        if isinstance(destino, (str, os.PathLike)):
+            with open(destino, "wb") as archivo:
+                archivo.writelines(bloques_csv(tabla, filas_por_bloque, columnas))
+        else:
+            destino.writelines(bloques_csv(tabla, filas_por_bloque, columnas))
+    else:
+        raise ValueError(f"Formato de exportación no reconocido: '{formato}'.")
+
+
+def exportar_tabla(tabla: pd.DataFrame, formato: str, columnas: Optional[list] = None) -> BinaryIO:
+    '''
+    Exporta la tabla por bloques a un archivo temporal sin nombre (se borra al cerrarlo)
+    y lo devuelve abierto para lectura desde el principio, p. ej. para st.download_button:
+    mientras se genera, en memoria solo hay un bloque de filas, no el archivo completo.
+
+    :param columnas: Columnas a exportar y su orden (por defecto, todas).
+    :return: Archivo binario de solo lectura.
+    '''
+    with tempfile.TemporaryFile(prefix="statboard_") as archivo:
+        escribir_tabla(tabla, archivo, formato, columnas=columnas)
+        archivo.flush()
+        # Descriptor duplicado: el archivo (ya sin nombre en disco) vive hasta cerrar el lector
+        lector = open(os.dup(archivo.fileno()), "rb")
+    lector.seek(0)
+    return lector
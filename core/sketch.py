@@ -0,0 +1,158 @@
+# core/sketch.py
+import numpy as np
+
+
+def _fusionar(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    '''Fusiona dos arrays ordenados en uno ordenado, en O(len(b) · log len(a)), sin reordenar.'''
+    if not len(a):
+        return b
+    if not len(b):
+        return a
+    # Posición final de cada elemento de b: los de a menores o iguales más los de b anteriores
+    posiciones = np.searchsorted(a, b, side="right") + np.arange(len(b))
+    resultado = np.empty(len(a) + len(b), dtype=np.float64)
+    de_a = np.ones(len(resultado), dtype=bool)
+    de_a[posiciones] = False
+    resultado[posiciones] = b
+    resultado[de_a] = a
+    return resultado
+
+
+class SketchCuantiles:
+    '''
+    Sketch KLL (Karnin, Lang y Liberty, 2016) para estimar cuantiles con memoria
+    acotada sobre flujos de datos arbitrariamente grandes.
+
+    Mantiene una jerarquía de compactadores: el nivel h guarda, ordenados, elementos
+    de peso 2^h. Cuando un nivel se llena se promueve uno de cada dos elementos al
+    nivel superior, fusionándolos con los que ya tenía (nunca se reordena un nivel
+    entero: solo se ordena cada bloque nuevo al llegar). La memoria es O(k) y el
+    error de rango normalizado ~ 2.3 / k^0.97 (≈ 1.3 % con k = 200, con 99 % de
+    confianza). Dos sketches con el mismo k se
+    combinan sin perder garantías, lo que permite acumular bloques o particiones.
+    '''
+
+    def __init__(self, k: int = 200, semilla: int = 0):
+        '''
+        :param k: Parámetro de precisión: mayor k, menor error y más memoria.
+        :param semilla: Semilla del generador aleatorio de las compactaciones.
+        '''
+        if k < 8:
+            raise ValueError("El parámetro k del sketch debe ser al menos 8.")
+        self.k = k
+        self.n = 0
+        # Extremos exactos: las compactaciones pueden descartar el mínimo y el máximo
+        self.minimo, self.maximo = np.inf, -np.inf
+        self.niveles = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(semilla)
+
+    def _capacidad(self, nivel: int) -> int:
+        '''Capacidad del nivel: decrece geométricamente (factor 2/3) hacia los niveles bajos.'''
+        profundidad = len(self.niveles) - nivel - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** profundidad)))
+
+    def _tamano(self) -> int:
+        return sum(len(nivel) for nivel in self.niveles)
+
+    def _compactar(self):
+        '''Compacta los niveles llenos hasta que el sketch vuelve a caber en su capacidad.'''
+        while self._tamano() >= sum(self._capacidad(h) for h in range(len(self.niveles))):
+            for h in range(len(self.niveles)):
+                if len(self.niveles[h]) < self._capacidad(h):
+                    continue
+                if h + 1 == len(self.niveles):
+                    self.niveles.append(np.empty(0, dtype=np.float64))
+
+                nivel = self.niveles[h]
+                # Con un número impar de elementos, uno permanece en este nivel
+                resto = nivel[:len(nivel) % 2]
+                pares = nivel[len(nivel) % 2:]
+                # Uno de cada dos de un nivel ordenado sigue ordenado: basta fusionarlos
+                promovidos = pares[self._rng.integers(2)::2]
+                self.niveles[h] = resto.copy()
+                self.niveles[h + 1] = _fusionar(self.niveles[h + 1], promovidos)
+                break
+
+    def actualizar(self, bloque) -> "SketchCuantiles":
+        '''
+        Incorpora un bloque de valores (se ignoran los NaN).
+
+        :return: El propio sketch.
+        '''
+        valores = np.asarray(bloque, dtype=np.float64)
+        valores = valores[~np.isnan(valores)]
+        if valores.size:
+            self.n += valores.size
+            ordenados = np.sort(valores)
+            self.minimo, self.maximo = min(self.minimo, ordenados[0]), max(self.maximo, ordenados[-1])
+            self.niveles[0] = _fusionar(self.niveles[0], ordenados)
+            self._compactar()
+        return self
+
+    def combinar(self, otro: "SketchCuantiles") -> "SketchCuantiles":
+        '''
+        Fusiona otro sketch (con el mismo k) en este.
+
+        :return: El propio sketch.
+        '''
+        if otro.k != self.k:
+            raise ValueError("Solo se pueden combinar sketches con el mismo parámetro k.")
+        while len(self.niveles) < len(otro.niveles):
+            self.niveles.append(np.empty(0, dtype=np.float64))
+        for h, nivel in enumerate(otro.niveles):
+            self.niveles[h] = _fusionar(self.niveles[h], nivel)
+        self.n += otro.n
+        self.minimo, self.maximo = min(self.minimo, otro.minimo), max(self.maximo, otro.maximo)
+        self._compactar()
+        return self
+
+    @staticmethod
+    def k_para_error(error_rango: float) -> int:
+        '''
+        Parámetro k mínimo para alcanzar un error de rango normalizado dado.
+
+        :param error_rango: Error deseado como fracción de n (p. ej. 0.01 = 1 %).
+        '''
+        return max(8, int(np.ceil((2.296 / error_rango) ** (1 / 0.9723))))
+
+    def error_rango(self) -> float:
+        '''Error de rango normalizado estimado (fracción de n, 99 % de confianza).'''
+        return 2.296 / self.k ** 0.9723
+
+    def cuantiles(self, probabilidades) -> np.ndarray:
+        '''
+        Estima varios cuantiles a la vez.
+
+        :param probabilidades: Iterable de probabilidades en [0, 1] (p = 0 y p = 1 son
+                               el mínimo y el máximo exactos).
+        :return: Array con los cuantiles estimados.
+        '''
+        probabilidades = np.clip(np.asarray(probabilidades, dtype=np.float64), 0, 1)
+        if self.n == 0:
+            return np.full(probabilidades.shape, np.nan)
+
+        elementos = np.concatenate(self.niveles)
+        pesos = np.concatenate([np.full(len(nivel), 2 ** h, dtype=np.float64)
+                                for h, nivel in enumerate(self.niveles)])
+        orden = np.argsort(elementos, kind="stable")
+        elementos = elementos[orden]
+        acumulados = np.cumsum(pesos[orden])
+
+        posiciones = np.searchsorted(acumulados, probabilidades * acumulados[-1], side="left")
+        estimados = elementos[np.minimum(posiciones, len(elementos) - 1)]
+        return np.where(probabilidades <= 0, self.minimo, np.where(probabilidades >= 1, self.maximo, estimados))
+
+    def cuantil(self, p: float) -> float:
+        return float(self.cuantiles([p])[0])
+
+    def cuantil_con_error(self, p: float) -> tuple:
+        '''
+        Estima el cuantil p junto con su error en unidades de los datos: la mayor distancia
+        del valor a los cuantiles p - ε y p + ε, siendo ε el error de rango. El cuantil
+        exacto está entre ambos (con la confianza de ε), luego dentro de valor ± error.
+
+        :return: Tupla (valor, error).
+        '''
+        eps = self.error_rango()
+        inferior, valor, superior = self.cuantiles([p - eps, p, p + eps])
+        return float(valor), float(max(valor - inferior, superior - valor))
@@ -0,0 +1,207 @@
+# core/trabajos.py
+'''
+Trabajos en segundo plano con resultados progresivos.
+
+Un trabajo es una secuencia de etapas que se ejecuta en un ejecutor compartido
+(concurrent.futures). Cada etapa publica sus resultados en cuanto los tiene (y
+puede publicar versiones parciales mientras avanza), de modo que la interfaz
+muestra primero lo barato y lo va refinando sin bloquear la página. Las etapas
+comprueban la cancelación entre bloques: un trabajo cancelado deja de consumir
+CPU en cuanto termina el bloque en curso.
+'''
+import io
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.acumulador import AcumuladorEstadistico
+from core.ingesta import leer_bloques, acumular_archivo, histograma_archivo, contar_valores
+from core.sketch import SketchCuantiles
+from core.visualization import crear_histograma, MAX_BARRAS
+
+# Valores de la muestra inicial (primer bloque del archivo): primeras métricas casi inmediatas
+TAMANO_MUESTRA = 100_000
+
+# Tiempo mínimo entre dos publicaciones parciales de una misma etapa
+INTERVALO_PUBLICACION_S = 0.5
+
+
+class Cancelado(Exception):
+    '''Se lanza dentro de una etapa cuando su trabajo ha sido cancelado.'''
+
+
+class Trabajo:
+    '''
+    Secuencia de etapas ejecutada en segundo plano. Cada etapa es una función que
+    recibe el propio trabajo, lee los resultados anteriores con resultados(),
+    publica los suyos con publicar() y llama a comprobar() entre bloques.
+
+    Los resultados se leen desde otro hilo (la sesión de Streamlit): resultados()
+    devuelve una copia coherente y `version` aumenta con cada publicación.
+
+    :param al_terminar: Función opcional que se llama una vez, al terminar el trabajo (bien,
+                        con error o cancelado, aunque no llegue a empezar), p. ej. para
+                        borrar el archivo temporal que leen sus etapas.
+    '''
+
+    def __init__(self, clave, etapas: list, al_terminar: Optional[Callable[[], None]] = None):
+        self.clave = clave
+        self.etapas = list(etapas)
+        self._al_terminar = al_terminar
+        self.version = 0
+        self.etapa_actual = None
+        self.error = None
+        self.inicio = None
+        self.duracion = None
+        self._resultados = {}
+        self._candado = threading.Lock()
+        self._cancelado = threading.Event()
+        self._futuro = None
+
+    def iniciar(self, ejecutor: Executor) -> "Trabajo":
+        self._futuro = ejecutor.submit(self._ejecutar)
+        return self
+
+    def _ejecutar(self):
+        self.inicio = time.perf_counter()
+        try:
+            for nombre, etapa in self.etapas:
+                self.comprobar()
+                self.etapa_actual = nombre
+                etapa(self)
+            self.etapa_actual = None
+        except Cancelado:
+            pass
+        except Exception as error:  # Se informa en la interfaz en lugar de perderse en el hilo
+            self.error = error
+        finally:
+            self.duracion = time.perf_counter() - self.inicio
+            self._terminar()
+
+    def _terminar(self):
+        al_terminar, self._al_terminar = self._al_terminar, None
+        if al_terminar is not None:
+            al_terminar()
+
+    def publicar(self, **resultados):
+        with self._candado:
+            self._resultados.update(resultados)
+            self.version += 1
+
+    def resultados(self) -> dict:
+        with self._candado:
+            return dict(self._resultados)
+
+    def comprobar(self):
+        '''Interrumpe la etapa en curso si el trabajo fue cancelado.'''
+        if self._cancelado.is_set():
+            raise Cancelado()
+
+    def cancelar(self):
+        '''Cancela el trabajo: si aún no empezó no llega a ejecutarse; si no, se detiene tras el bloque en curso.'''
+        self._cancelado.set()
+        if self._futuro is not None and self._futuro.cancel():
+            # No llegó a ejecutarse: _ejecutar no hará la limpieza
+            self._terminar()
+
+    @property
+    def cancelado(self) -> bool:
+        return self._cancelado.is_set()
+
+    @property
+    def terminado(self) -> bool:
+        return self._futuro is not None and self._futuro.done()
+
+    def esperar(self, timeout: Optional[float] = None) -> dict:
+        '''Espera a que termine el trabajo y devuelve sus resultados (uso fuera de la interfaz).'''
+        if self._futuro is not None:
+            self._futuro.exception(timeout)
+        return self.resultados()
+
+
+class GestorTrabajos:
+    '''
+    Trabajo en curso de una sesión. Al enviar uno con otra clave (p. ej. el usuario
+    cambia de archivo o de columna y vuelve a enviar) el anterior se cancela; con la
+    misma clave se reutiliza el que ya está en marcha o terminado.
+    '''
+
+    def __init__(self):
+        self.actual: Optional[Trabajo] = None
+
+    def enviar(self, ejecutor: Executor, clave, crear_etapas: Callable[[], list],
+               al_terminar: Optional[Callable[[], None]] = None) -> Trabajo:
+        '''
+        :param crear_etapas: Se llama solo si hace falta un trabajo nuevo.
+        :param al_terminar: Limpieza del trabajo nuevo (ver Trabajo); se descarta si se reutiliza el actual.
+        '''
+        actual = self.actual
+        if actual is not None and actual.clave == clave and not actual.cancelado and actual.error is None:
+            return actual
+        if actual is not None:
+            actual.cancelar()
+        self.actual = Trabajo(clave, crear_etapas(), al_terminar).iniciar(ejecutor)
+        return self.actual
+
+    def cancelar(self):
+        if self.actual is not None:
+            self.actual.cancelar()
+
+
+def etapas_archivo(datos, formato: str, columna=None, dtype: str = "float64",
+                   sketch_k: Optional[int] = None) -> list:
+    '''
+    Etapas del análisis de un archivo, de la más barata a la más cara:
+        muestra     métricas del primer bloque ('metricas', con 'parcial' = True)
+        pasada      recorrido completo; publica 'metricas' parciales a medida que avanza
+                    (con 'progreso' si se conoce el total) y las definitivas al terminar
+        histograma  segunda pasada que agrupa los valores en MAX_BARRAS intervalos
+                    entre el mínimo y el máximo ('histograma', figura de Plotly)
+
+    :param datos: Ruta del archivo (ver copiar_a_temporal: se mapea en memoria o se lee por
+                  bloques desde disco) o su contenido en bytes. Cada etapa lo relee desde el principio.
+    '''
+    def _origen():
+        return io.BytesIO(datos) if isinstance(datos, (bytes, bytearray)) else datos
+
+    def muestra(trabajo: Trabajo):
+        bloque = next(leer_bloques(_origen(), formato, columna, TAMANO_MUESTRA, dtype), np.empty(0))
+        total = contar_valores(_origen(), formato, columna, dtype)
+        trabajo.publicar(metricas=AcumuladorEstadistico(True).actualizar(bloque).finalizar(), parcial=True,
+                         total=total, progreso=min(len(bloque) / total, 1.0) if total else None)
+
+    def pasada(trabajo: Trabajo):
+        total = trabajo.resultados()["total"]
+        ultima = time.perf_counter()
+
+        def al_avanzar(acumulador: AcumuladorEstadistico, leidos: int):
+            nonlocal ultima
+            trabajo.comprobar()
+            if time.perf_counter() - ultima >= INTERVALO_PUBLICACION_S:
+                ultima = time.perf_counter()
+                trabajo.publicar(metricas=acumulador.finalizar(), progreso=leidos / total if total else None)
+
+        acumulador = AcumuladorEstadistico(True, sketch=SketchCuantiles(sketch_k) if sketch_k else None)
+        acumular_archivo(_origen(), formato, columna, dtype=dtype, acumulador=acumulador, al_avanzar=al_avanzar)
+        trabajo.publicar(metricas=acumulador.finalizar(), parcial=False, progreso=1.0)
+
+    def histograma(trabajo: Trabajo):
+        metricas = trabajo.resultados()["metricas"]
+        if metricas["n"] == 0:
+            return
+        limites, conteos = histograma_archivo(_origen(), formato, metricas["minimo"], metricas["maximo"],
+                                              MAX_BARRAS, columna, dtype=dtype,
+                                              al_avanzar=lambda _: trabajo.comprobar())
+        tabla = pd.DataFrame({
+            'Límite Inferior': limites[:-1],
+            'Límite Superior': limites[1:],
+            'Valores': (limites[:-1] + limites[1:]) / 2,
+            'Frecuencia Absoluta (fi)': conteos,
+        })
+        trabajo.publicar(histograma=crear_histograma(tabla, umbral_categorias=0))
+
+    return [("muestra", muestra), ("pasada", pasada), ("histograma", histograma)]
@@ -1,24 +1,12 @@
 # core/utils.py
-import pandas as pd
-import streamlit as st
-
-@st.cache_data
-def procesar_datos(cadena_valores: str) -> pd.Series:
+def formatear_errores(errores: list, n_errores: int) -> str:
     '''
-    Procesa una cadena de valores separados por espacios o comas.
-    Maneja errores si el usuario introduce texto no numérico.
-    
-    :param cadena_valores: Cadena con valores separados por espacios.
-    :return: Serie de Pandas.
+    Mensaje con los tokens no numéricos descartados y su posición.
+
+    :param errores: Lista [(posición, token), ...] (posiblemente acotada).
+    :param n_errores: Total de tokens inválidos.
     '''
-    try:
-        if not cadena_valores.strip():
-            return pd.Series(dtype=float)  # Retorna una Serie vacía si la cadena está vacía
-        
-        cadena_limpia = cadena_valores.replace(',', ' ')  # Reemplaza comas por espacios
-        lista_valores = cadena_limpia.split()   
-        lista_valores = [float(valor) for valor in lista_valores]  # Convierte a valores flotantes
-        return pd.Series(lista_valores)
-    except ValueError:
-        st.error("Error: Por favor, introduce solo números enteros separados por espacios o comas.")
-        return pd.Series(dtype=float)
\ No newline at end of file
+    detalle = ", ".join(f"posición {pos}: '{token}'" for pos, token in errores)
+    if n_errores > len(errores):
+        detalle += f" … (y {n_errores - len(errores)} más)"
+    return f"Se ignoraron {n_errores} valores no numéricos → {detalle}"
@@ -1,9 +1,61 @@
 # core/visualization.py
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 import plotly.express as px
-import matplotlib.pyplot as plt
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# Con más valores distintos que este umbral el eje pasa a ser numérico: una categoría
+# por valor genera figuras de megabytes que el navegador no puede dibujar con fluidez
+UMBRAL_CATEGORIAS = 100
+
+# Boxplots memoizados (cada uno es una figura pequeña: solo el resumen)
+MAX_BOXPLOTS_MEMOIZADOS = 32
+
+# Resolución máxima del histograma numérico (del orden del ancho en píxeles del gráfico)
+MAX_BARRAS = 400
+
+# Paneles máximos en los histogramas comparativos (el resto de series solo aparece en la tabla)
+MAX_SERIES_GRAFICADAS = 24
+
+def reagrupar_frecuencias(valores, conteos, max_barras: int = MAX_BARRAS) -> tuple:
+    '''
+    Reagrupa una tabla de frecuencias (valores ordenados y conteos) en, como máximo,
+    `max_barras` barras de igual amplitud, sumando los conteos de cada barra. Si ya
+    hay pocos valores distintos, cada uno conserva su barra, que se extiende hasta
+    el punto medio con sus vecinos.
+
+    :return: Tupla (centros, anchos, conteos) de las barras.
+    '''
+    valores = np.asarray(valores, dtype=np.float64)
+    conteos = np.asarray(conteos)
+    if len(valores) <= max_barras:
+        # Una barra por valor, hasta la mitad de la separación con cada vecino (con una
+        # única menor separación común, los datos irregulares quedarían en barras finísimas)
+        if len(valores) > 1:
+            medios = (valores[:-1] + valores[1:]) / 2
+            bordes = np.concatenate(([2 * valores[0] - medios[0]], medios, [2 * valores[-1] - medios[-1]]))
+        else:
+            bordes = valores[:1] + np.array([-0.5, 0.5])
+        return (bordes[:-1] + bordes[1:]) / 2, np.diff(bordes), conteos
+    frecuencias, limites = np.histogram(valores, bins=max_barras, weights=conteos)
+    return (limites[:-1] + limites[1:]) / 2, np.diff(limites), frecuencias.astype(np.int64)
+
+def crear_histograma(tabla_estadistica: pd.DataFrame, umbral_categorias: int = UMBRAL_CATEGORIAS,
+                     max_barras: int = MAX_BARRAS):
+    '''
+    Crea el histograma de la tabla de frecuencias (columnas 'Valores' y 'Frecuencia Absoluta (fi)').
+
+    Con pocos valores distintos cada valor es una categoría del eje. Por encima de
+    `umbral_categorias` se usa un eje numérico y, si hace falta, las frecuencias se
+    reagrupan en el servidor a `max_barras` barras: la figura tiene un tamaño acotado
+    sea cual sea el número de datos.
+    '''
+    if len(tabla_estadistica) > umbral_categorias:
+        return _crear_histograma_numerico(tabla_estadistica, max_barras)
 
-def crear_histograma(tabla_estadistica: pd.DataFrame):
     datos = tabla_estadistica.reset_index()
     datos['Valores'] = datos['Valores'].astype(str)
 
@@ -30,92 +82,165 @@ def crear_histograma(tabla_estadistica: pd.DataFrame):
 
     return fig
 
-def crear_boxplot(metricas: dict, serie_original: pd.Series):
+def _crear_histograma_numerico(tabla_estadistica: pd.DataFrame, max_barras: int):
+    '''
+    Histograma con eje numérico en una única traza de barras pre-agrupadas
+    (los arrays viajan codificados en binario dentro del JSON de Plotly).
+    '''
+    if 'Límite Inferior' in tabla_estadistica and len(tabla_estadistica) <= max_barras:
+        # Tabla por intervalos: cada barra ocupa exactamente su intervalo
+        inferiores = tabla_estadistica['Límite Inferior'].to_numpy()
+        superiores = tabla_estadistica['Límite Superior'].to_numpy()
+        centros, anchos = (inferiores + superiores) / 2, superiores - inferiores
+        conteos = tabla_estadistica['Frecuencia Absoluta (fi)'].to_numpy()
+    else:
+        centros, anchos, conteos = reagrupar_frecuencias(
+            tabla_estadistica['Valores'], tabla_estadistica['Frecuencia Absoluta (fi)'], max_barras)
+
+    fig = go.Figure(go.Bar(
+        x=centros,
+        y=conteos,
+        width=anchos,
+        marker_line_width=0,
+        hovertemplate="≈ %{x:.4g}<br>Frecuencia: %{y}<extra></extra>"
+    ))
+    fig.update_layout(
+        bargap=0,
+        bargroupgap=0,
+        yaxis_title='Frecuencia Absoluta',
+        xaxis_title='Valores',
+        height=500
+    )
+    return fig
+
+def crear_histogramas_multiples(tabla_intervalos: pd.DataFrame, columnas: int = 3,
+                                max_series: int = MAX_SERIES_GRAFICADAS):
+    '''
+    Histogramas pequeños (uno por serie, en cuadrícula) a partir de la tabla de
+    intervalos de core.multiserie. Cada panel es una única traza de barras con su
+    propio eje x; se grafican como máximo max_series series.
+    '''
+    series = tabla_intervalos['Serie'].unique()[:max_series]
+    filas = max(1, -(-len(series) // columnas))
+    fig = make_subplots(rows=filas, cols=columnas, subplot_titles=[str(s) for s in series],
+                        vertical_spacing=min(0.3 / filas, 0.08), horizontal_spacing=0.05)
+
+    for i, (serie, tabla) in enumerate(tabla_intervalos[tabla_intervalos['Serie'].isin(series)]
+                                       .groupby('Serie', sort=False)):
+        inferiores = tabla['Límite Inferior'].to_numpy()
+        superiores = tabla['Límite Superior'].to_numpy()
+        fig.add_trace(go.Bar(
+            x=(inferiores + superiores) / 2,
+            y=tabla['Frecuencia Absoluta (fi)'].to_numpy(),
+            width=superiores - inferiores,
+            name=str(serie),
+            marker_line_color='white',
+            marker_line_width=1,
+            hovertemplate="[%{customdata[0]:.4g}, %{customdata[1]:.4g})<br>Frecuencia: %{y}<extra></extra>",
+            customdata=np.column_stack((inferiores, superiores)),
+        ), row=i // columnas + 1, col=i % columnas + 1)
+
+    fig.update_layout(bargap=0, showlegend=False, height=max(300, 260 * filas))
+    return fig
+
+def crear_boxplot(metricas: dict, atipicos: dict):
     """
-    Crea un boxplot usando métricas pre-calculadas y detecta outliers
-    basándose en la SERIE ORIGINAL de datos.
+    Crea un boxplot usando métricas pre-calculadas y el resumen de valores
+    atípicos producido por core.atipicos (límites, conteos y valores únicos acotados).
+
+    La figura solo contiene el resumen (cinco números y los atípicos acotados), no
+    los datos, y se memoiza por esos valores: las re-ejecuciones con los mismos
+    datos reutilizan la figura. No debe modificarse la figura devuelta.
     
     Args:
         metricas (dict): Diccionario con Q1, Q3, IQR, Mediana.
-        serie_original (pd.Series): La serie de datos crudos (numéricos).
+        atipicos (dict): Resumen devuelto por analizar_atipicos / detectar_atipicos.
         
     Returns:
-        fig: Figura de matplotlib.
-        outliers_series: Serie de pandas con los valores atípicos detectados.
+        fig: Figura de Plotly.
     """
-    fig, ax = plt.subplots(figsize=(8, 6))
-    
+    return _crear_boxplot_memoizado(
+        float(metricas['Q1']), float(metricas['mediana']), float(metricas['Q3']),
+        float(atipicos['limite_inferior']), float(atipicos['limite_superior']),
+        tuple(float(v) for v in atipicos['unicos'])
+    )
+
+@lru_cache(maxsize=MAX_BOXPLOTS_MEMOIZADOS)
+def _crear_boxplot_memoizado(q1: float, mediana: float, q3: float,
+                             limite_inferior: float, limite_superior: float, unicos: tuple):
     # -----------------------------------------------------
-    # 1. Configurar la Caja (Usando métricas calculadas)
+    # 1. Caja y bigotes precalculados (sin enviar los datos)
     # -----------------------------------------------------
-    iqr = metricas['rango_intercuartilico']
-    q1 = metricas['Q1']
-    q3 = metricas['Q3']
-    mediana = metricas['mediana']
-    
-    # Límites de Tukey (Bigotes)
-    limite_inferior = q1 - (1.5 * iqr)
-    limite_superior = q3 + (1.5 * iqr)
-    
-    stats = [{
-        'med': mediana,
-        'q1': q1,
-        'q3': q3,
-        'whislo': limite_inferior, 
-        'whishi': limite_superior,
-        'label': 'Distribución'
-    }]
-    
-    # Dibujamos la caja base (sin outliers automáticos)
-    ax.bxp(stats, showfliers=False, patch_artist=True, 
-           boxprops=dict(facecolor='#ADD8E6', edgecolor='blue'), # Azul claro
-           medianprops=dict(color='red', linewidth=2))
-    
+    fig = go.Figure(go.Box(
+        x=['Distribución'],
+        q1=[q1],
+        median=[mediana],
+        q3=[q3],
+        lowerfence=[limite_inferior],
+        upperfence=[limite_superior],
+        boxpoints=False,
+        fillcolor='#ADD8E6',
+        line=dict(color='blue'),
+        name='Distribución',
+        hoverinfo='y'
+    ))
+
     # -----------------------------------------------------
-    # 2. Detectar y Graficar Outliers usando la SERIE ORIGINAL
+    # 2. Outliers (solo los valores únicos, acotados) con su etiqueta
     # -----------------------------------------------------
-    
-    # Filtramos directamente sobre la serie de datos crudos
-    outliers_series = serie_original[
-        (serie_original < limite_inferior) | 
-        (serie_original > limite_superior)
-    ].copy()
-    
-    if not outliers_series.empty:
-        # Obtenemos los valores a graficar
-        valores_y = outliers_series.values
-        
-        # Coordenada X fija (1) porque solo hay un boxplot centrado ahí
-        valores_x = [1] * len(valores_y)
-        
-        # Graficamos los puntos rojos
-        ax.scatter(valores_x, valores_y, 
-                   color='red', 
-                   marker='o', 
-                   s=60, 
-                   zorder=5, 
-                   label='Outliers')
-        
-        # Agregar etiquetas de texto al lado del punto
-        # Usamos un set para no superponer textos si hay valores repetidos
-        valores_unicos_outliers = sorted(list(set(valores_y)))
-        for val in valores_unicos_outliers:
-             ax.text(1.02, val, f' {val:.2f}', verticalalignment='center', fontsize=8)
+    if unicos:
+        fig.add_trace(go.Scatter(
+            x=['Distribución'] * len(unicos),
+            y=np.array(unicos),
+            mode='markers+text',
+            marker=dict(color='red', size=9),
+            text=[f'{v:.2f}' for v in unicos],
+            textposition='middle right',
+            textfont=dict(size=10),
+            name='Outliers'
+        ))
 
     # -----------------------------------------------------
     # 3. Estética
     # -----------------------------------------------------
-    ax.set_title('Diagrama de Caja', fontsize=16)
-    ax.set_ylabel('Valores')
-    
-    # Solo mostramos leyenda si hubo outliers
-    if not outliers_series.empty:
-        ax.legend(loc='upper right')
-        
-    ax.grid(True, linestyle='--', alpha=0.6, axis='y')
+    fig.update_layout(
+        title=dict(text='Diagrama de Caja', font=dict(size=16)),
+        yaxis=dict(title='Valores', gridcolor='lightgray', griddash='dash'),
+        showlegend=bool(unicos),
+        legend=dict(x=1, y=1, xanchor='right'),
+        height=500
+    )
+    return fig
 
-    # Convertir la serie de outliers a lista y eliminar duplicados
-    lista_outliers = outliers_series.drop_duplicates().sort_values().to_list()   
-    
-    # Retornamos la serie para que el main pueda mostrarla en tabla
-    return fig, lista_outliers
+def crear_grafico_qq(resumen: dict):
+    '''
+    Gráfico QQ frente a la normal a partir del resumen de core.forma.resumen_qq: un
+    punto por probabilidad de la rejilla (no por dato) y la recta y = x de referencia.
+    '''
+    teoricos, muestrales = resumen['teoricos'], resumen['muestrales']
+    extremos = [min(teoricos.min(), muestrales.min()), max(teoricos.max(), muestrales.max())]
+    fig = go.Figure(go.Scatter(
+        x=teoricos,
+        y=muestrales,
+        mode='markers',
+        marker=dict(color='blue', size=6),
+        customdata=resumen['probabilidades'],
+        hovertemplate="p = %{customdata:.2f}<br>Normal: %{x:.4g}<br>Muestra: %{y:.4g}<extra></extra>",
+        name='Cuantiles'
+    ))
+    fig.add_trace(go.Scatter(
+        x=extremos,
+        y=extremos,
+        mode='lines',
+        line=dict(color='red', dash='dash'),
+        hoverinfo='skip',
+        name='Normal'
+    ))
+    fig.update_layout(
+        title=dict(text='Gráfico QQ (Normal)', font=dict(size=16)),
+        xaxis_title='Cuantiles teóricos',
+        yaxis_title='Cuantiles de la muestra',
+        showlegend=False,
+        height=400
+    )
+    return fig
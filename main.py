@@ -1,9 +1,31 @@
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Optional
+
 import pandas as pd
 import streamlit as st
-from core.utils import procesar_datos
-from core.descriptive import crear_tabla_estadistica, calcular_metricas_principales, calcular_metricas_agrupadas
-from core.visualization import crear_histograma, crear_boxplot
+from core.utils import formatear_errores
+from core.parser import FORMATOS_NUMERICOS, parsear_valores, parsear_tabla
+from core.descriptive import (crear_tabla_estadistica, calcular_metricas_principales, calcular_metricas_agrupadas,
+                              cuantiles_tabla)
+from core.analisis import completar_tabla_intervalos, tabla_con_valores, analizar_tabla, TIPOS_DATOS
+from core.visualization import crear_histograma, crear_boxplot, crear_histogramas_multiples, crear_grafico_qq
 from core.intervals import crear_intervalos
+from core.ingesta import (detectar_formato, listar_columnas, leer_columnas, copiar_a_temporal, FORMATOS_ARCHIVO,
+                          TIPOS_BINARIOS)
+from core.trabajos import GestorTrabajos, etapas_archivo
+from core.almacen import Almacen
+from core.multiserie import analizar_columnas, analizar_grupos
+from core.bootstrap import Remuestreo, bootstrap_progresivo, ResultadoBootstrap, NIVELES_CONFIANZA, N_REMUESTRAS
+from core.forma import resumen_qq, ALFA_NORMALIDAD
+from core.sketch import SketchCuantiles
+from core.atipicos import analizar_atipicos, METODOS_ATIPICOS
+from core.incremental import SesionIncremental
+from core.cache import CachePipeline, huella_array
+from core.instrumentacion import Instrumentacion, RegistroEtapas, trazar_memoria
+from core.presentacion import FILAS_POR_PAGINA, FORMATOS_EXPORTACION, n_paginas, pagina_tabla, exportar_tabla
 
 # --- Ocultar mensaje "Press Ctrl+Enter en st.text_area()" ---
 st.markdown("""
@@ -18,6 +40,391 @@ st.markdown("""
 # Configuración de la página
 st.set_page_config(layout="wide", page_title="Statboard", page_icon="📊")
 
+# Formatos de la entrada de texto: valores sueltos o una tabla ya agregada
+FORMATOS_ENTRADA = ("Valores", "Tabla de Frecuencias")
+TABLA_FRECUENCIAS_DEFAULT = "35 1\n40 4\n45 18\n50 41\n55 24\n60 9\n65 3"
+
+# Criterios de intervalos para el análisis de varias series (número fijo aparte)
+CRITERIOS_INTERVALOS = ("Raíz cuadrada", "Regla de Sturges", "Regla de Scott")
+
+# Tiempo máximo del bootstrap por ejecución: al agotarse se muestran los intervalos parciales
+PRESUPUESTO_BOOTSTRAP_S = 5.0
+
+# Etiquetas de los estadísticos con intervalo de confianza
+ETIQUETAS_BOOTSTRAP = {"media": "Media", "mediana": "Mediana", "Q1": "Q1", "Q3": "Q3",
+                       "desviacion": "Desv. Estándar", "coef_variacion": "Coef. de Variación (%)"}
+
+# Cada cuánto se consulta el avance de un trabajo en segundo plano
+INTERVALO_SONDEO_S = 0.5
+
+# Errores de rango admitidos para los cuartiles aproximados (sketch KLL)
+ERRORES_SKETCH = {"0.5 %": 0.005, "1 %": 0.01, "2 %": 0.02, "5 %": 0.05}
+
+@st.cache_data(max_entries=16, ttl=3600)
+def procesar_datos(cadena_valores: str, separador_decimal: str = '.',
+                   separador_miles: Optional[str] = None) -> tuple:
+    '''
+    Procesa una cadena de valores separados por espacios, saltos de línea, comas o ';'.
+    Los tokens no numéricos se descartan y se informan por su posición,
+    sin invalidar el resto de la entrada.
+
+    Los errores se devuelven en lugar de mostrarse aquí: dentro de una función en
+    caché, st.error no se repetiría al reutilizar el resultado.
+
+    :param cadena_valores: Cadena con valores separados por espacios.
+    :param separador_decimal: '.' o ','.
+    :param separador_miles: Separador de miles a ignorar, o None.
+    :return: Tupla (Serie de Pandas, errores, n_errores) como en parsear_valores.
+    '''
+    valores, errores, n_errores = parsear_valores(cadena_valores, separador_decimal, separador_miles)
+    return pd.Series(valores, copy=False), errores, n_errores
+
+@st.cache_resource
+def obtener_cache_pipeline() -> CachePipeline:
+    '''Caché de resultados intermedios compartida por todas las sesiones.'''
+    return CachePipeline()
+
+@st.cache_resource
+def obtener_registro_etapas() -> RegistroEtapas:
+    '''Tiempos por etapa de todas las ejecuciones del proceso (exportables a Prometheus).'''
+    return RegistroEtapas()
+
+@st.cache_resource
+def obtener_ejecutor() -> ThreadPoolExecutor:
+    '''
+    Ejecutor de los trabajos en segundo plano, compartido por todas las sesiones: limita
+    los cálculos simultáneos al número de núcleos (los trabajos cancelados dejan su hueco).
+    '''
+    return ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="statboard")
+
+def obtener_almacen() -> Almacen:
+    '''
+    Almacén local de conjuntos de datos ya parseados (memoria mapeada), propio de quien
+    usa la app: de su cuenta si inició sesión (st.login) y, si no, de la sesión del navegador.
+    '''
+    if st.user.get("is_logged_in"):
+        propietario = f"usuario:{st.user.get('email') or st.user.get('sub')}"
+    else:
+        propietario = st.session_state.setdefault("propietario_almacen", f"sesion:{uuid.uuid4().hex}")
+    return Almacen(propietario=propietario)
+
+def seleccionar_sketch():
+    '''
+    Control opcional para estimar cuartiles y mediana con un sketch KLL (memoria acotada).
+
+    :return: Parámetro k del sketch, o None si se usan cuantiles exactos.
+    '''
+    usar_sketch = st.checkbox("Cuartiles aproximados (sketch)",
+                              help="Estima Q1, mediana y Q3 con un sketch KLL de memoria acotada, "
+                                   "sin ordenar los datos. Útil para volúmenes muy grandes.")
+    if not usar_sketch:
+        return None
+    error = st.select_slider("Error de rango máximo:", options=list(ERRORES_SKETCH), value="1 %")
+    return SketchCuantiles.k_para_error(ERRORES_SKETCH[error])
+
+def formatear_metrica(metricas: dict, clave: str) -> str:
+    '''
+    Formatea una métrica con dos decimales, añadiendo su error estimado (±)
+    cuando proviene de un sketch de cuantiles.
+    '''
+    error = metricas.get('error_cuantiles', {}).get(clave)
+    if error is None:
+        return f"{metricas[clave]:.2f}"
+    return f"{metricas[clave]:.2f} ± {error:.2f}"
+
+def formatear_forma(valor: float) -> str:
+    '''Medida de forma con tres decimales ('N/D' si no hay datos suficientes para calcularla).'''
+    return "N/D" if pd.isna(valor) else f"{valor:.3f}"
+
+def mostrar_normalidad(metricas: dict, resumen: dict, agrupados: bool = False):
+    '''
+    Test de Jarque–Bera y resumen QQ frente a la normal de igual media y desviación
+    (ver core.forma). Todo sale de los momentos y de la tabla ya calculados.
+    '''
+    col_grafico, col_texto = st.columns([2, 1])
+    col_grafico.plotly_chart(crear_grafico_qq(resumen))
+    with col_texto:
+        st.metric("Jarque–Bera", formatear_forma(metricas['jarque_bera']),
+                  help="n/6 · (g1² + g2²/4): crece con la asimetría y la curtosis en exceso.")
+        st.metric("p-valor", "N/D" if pd.isna(metricas['p_jarque_bera']) else f"{metricas['p_jarque_bera']:.3g}")
+        st.metric("Correlación QQ", formatear_forma(resumen['correlacion']),
+                  help="Correlación entre cuantiles de la muestra y de la normal (1 = recta perfecta).")
+        st.metric("Desviación máxima", formatear_forma(resumen['desviacion_maxima']) + " σ",
+                  help="Mayor distancia entre un cuantil de la muestra y el de la normal, en desviaciones.")
+        if not pd.isna(metricas['p_jarque_bera']):
+            if metricas['p_jarque_bera'] < ALFA_NORMALIDAD:
+                st.warning(f"Se rechaza la normalidad (α = {ALFA_NORMALIDAD:.0%}).")
+            else:
+                st.success(f"No se rechaza la normalidad (α = {ALFA_NORMALIDAD:.0%}).")
+        if agrupados:
+            st.caption("Datos agrupados: momentos y cuantiles calculados sobre las clases.")
+
+@st.fragment
+def mostrar_tabla_frecuencias(tabla_estadistica: pd.DataFrame, tipo_datos: str):
+    '''
+    Tabla de frecuencias paginada: solo la página visible se formatea y se envía al
+    navegador. Como fragmento, cambiar de página no vuelve a ejecutar el análisis.
+    La exportación de la tabla completa se genera por bloques al pulsar la descarga.
+    '''
+    # Configuración de columnas común
+    config_columnas = {
+        'Frecuencia Absoluta (fi)': st.column_config.NumberColumn(format="%d", width='small'),
+        'Frecuencia Relativa (hi)': st.column_config.NumberColumn(format="%.4f", width='small'),
+        'Porcentaje (pi)': st.column_config.NumberColumn(format="%.2f%%", width='small'),
+        'Frecuencia Acumulada (Fi)': st.column_config.NumberColumn(format="%d", width='small'),
+        'Frecuencia Rel Acumulada (Hi)': st.column_config.NumberColumn(format="%.4f", width='small'),
+    }
+    frecuencias = list(config_columnas)
+
+    if tipo_datos == "Por Intervalos":
+        # La columna 'Intervalos' se genera solo para las filas de la página visible
+        config_columnas.update({
+            'Intervalos': st.column_config.TextColumn("Intervalos", width='small'),
+            'Valores': st.column_config.NumberColumn("Marca de Clase", format="%.2f", width='small')
+        })
+        columnas_vista = ['Intervalos', 'Valores'] + frecuencias
+        columnas_exportacion = ['Límite Inferior', 'Límite Superior', 'Marca de Clase'] + frecuencias
+    else:
+        config_columnas['Valores'] = st.column_config.NumberColumn("Valor (xi)", format="%.2f", width='small')
+        columnas_vista = columnas_exportacion = ['Valores'] + frecuencias
+
+    n_filas = len(tabla_estadistica)
+    filas_por_pagina = FILAS_POR_PAGINA[1]
+    pagina = 1
+    if n_filas > FILAS_POR_PAGINA[0]:
+        col_filas, col_pagina, _ = st.columns([1, 1, 3])
+        filas_por_pagina = col_filas.selectbox("Filas por página:", FILAS_POR_PAGINA, index=1)
+        total_paginas = n_paginas(n_filas, filas_por_pagina)
+        pagina = col_pagina.number_input(f"Página (de {total_paginas}):", min_value=1,
+                                         max_value=total_paginas, value=1, step=1)
+
+    st.dataframe(pagina_tabla(tabla_estadistica, pagina, filas_por_pagina, columnas_vista),
+                 hide_index=True,
+                 column_config=config_columnas,
+                 width='stretch')
+    if n_filas > filas_por_pagina:
+        inicio = (pagina - 1) * filas_por_pagina
+        st.caption(f"Filas {inicio + 1}–{min(inicio + filas_por_pagina, n_filas)} de {n_filas}.")
+
+    # Exportación completa, generada solo cuando se pulsa el botón
+    col_formato, col_descarga, _ = st.columns([1, 1, 3], vertical_alignment="bottom")
+    formato = col_formato.selectbox("Exportar como:", tuple(FORMATOS_EXPORTACION))
+    extension, tipo_mime = FORMATOS_EXPORTACION[formato]
+    col_descarga.download_button("Descargar tabla", file_name=f"tabla_frecuencias.{extension}",
+                                 data=lambda: exportar_tabla(tabla_estadistica, extension,
+                                                             columnas_exportacion),
+                                 mime=tipo_mime, on_click="ignore")
+
+def mostrar_intervalos_bootstrap(marcador, resultado: ResultadoBootstrap):
+    '''Muestra (reemplazando el contenido del marcador) los intervalos obtenidos hasta el momento.'''
+    tabla = resultado.intervalos.rename(index=ETIQUETAS_BOOTSTRAP)
+    with marcador.container():
+        st.dataframe(tabla, column_config={
+            'estimacion': st.column_config.NumberColumn("Estimación", format="%.4f"),
+            'inferior': st.column_config.NumberColumn("Límite Inferior", format="%.4f"),
+            'superior': st.column_config.NumberColumn("Límite Superior", format="%.4f"),
+            'error_estandar': st.column_config.NumberColumn("Error Estándar", format="%.4f"),
+        })
+        if resultado.completo:
+            st.caption(f"Intervalos percentil al {resultado.nivel:.0%} con {resultado.remuestras} remuestras.")
+        else:
+            st.caption(f"Parcial: {resultado.remuestras} de {resultado.solicitadas} remuestras "
+                       f"(intervalos al {resultado.nivel:.0%}).")
+
+def analizar_archivo():
+    '''
+    Modo de ingesta por archivo (CSV, Parquet, .npy o binario crudo).
+    El archivo se recorre en bloques acotados en un trabajo en segundo plano: primero
+    se muestran las métricas del primer bloque, que se refinan a medida que avanza la
+    pasada completa, y por último el histograma. Volver a enviar con otro archivo o
+    columna cancela el trabajo anterior.
+    '''
+    with st.sidebar:
+        archivo = st.file_uploader("Archivo de Datos:", type=[ext.lstrip('.') for ext in FORMATOS_ARCHIVO])
+        if archivo is None:
+            st.info("Sube un archivo CSV, Parquet, .npy o binario.")
+            return
+
+        try:
+            formato = detectar_formato(archivo.name)
+            dtype = "float64"
+            if formato == "binario":
+                dtype = st.selectbox("Tipo de Dato Binario:", TIPOS_BINARIOS)
+            columnas = listar_columnas(archivo, formato)
+        except (ValueError, ImportError) as error:
+            st.error(f"Error: {error}")
+            return
+
+        columna = st.selectbox("Columna:", columnas) if columnas else None
+        sketch_k = seleccionar_sketch()
+        enviar = st.button("Analizar Archivo")
+
+    gestor = st.session_state.setdefault("trabajos_archivo", GestorTrabajos())
+    clave = (archivo.file_id, formato, columna, dtype, sketch_k)
+    if enviar:
+        # El trabajo lee una copia en disco (mapeada o por bloques), no el contenido en memoria;
+        # el archivo temporal se borra al terminar o cancelar el trabajo
+        ruta = None
+
+        def _crear_etapas():
+            nonlocal ruta
+            ruta = copiar_a_temporal(archivo)
+            return etapas_archivo(ruta, formato, columna, dtype, sketch_k)
+
+        gestor.enviar(obtener_ejecutor(), clave, _crear_etapas, al_terminar=lambda: os.remove(ruta))
+
+    # Los resultados se conservan entre re-ejecuciones mientras no cambie la selección
+    if gestor.actual is None or gestor.actual.clave != clave:
+        return
+    seguir_trabajo(gestor.actual, lambda trabajo: mostrar_resultados_archivo(trabajo, archivo.name, columna))
+
+def seguir_trabajo(trabajo, mostrar):
+    '''
+    Muestra un trabajo en segundo plano en un fragmento que se vuelve a ejecutar cada
+    INTERVALO_SONDEO_S mientras está en curso (solo se redibuja esa parte de la página).
+    Al terminar se relanza la aplicación para dejar de consultar.
+    '''
+    en_curso = not trabajo.terminado
+
+    @st.fragment(run_every=INTERVALO_SONDEO_S if en_curso else None)
+    def _fragmento():
+        mostrar(trabajo)
+        if en_curso and trabajo.terminado:
+            st.rerun()
+
+    _fragmento()
+
+def mostrar_resultados_archivo(trabajo, nombre_archivo: str, columna):
+    '''Métricas (provisionales o definitivas) e histograma del trabajo de un archivo.'''
+    resultados = trabajo.resultados()
+    if trabajo.error is not None:
+        st.error(f"Error al leer el archivo: {trabajo.error}")
+        return
+    metricas = resultados.get('metricas')
+    if metricas is None:
+        st.info("Leyendo el archivo...")
+        return
+    if metricas['n'] == 0 and not resultados['parcial']:
+        st.warning("El archivo no contiene valores numéricos en la columna seleccionada.")
+        return
+
+    st.write(f"## Resumen de `{nombre_archivo}`" + (f" — columna `{columna}`" if columna is not None else ""))
+    if resultados['parcial']:
+        texto = f"Procesando el archivo: métricas provisionales con {metricas['n']:,} valores."
+        if resultados.get('progreso') is not None:
+            st.progress(resultados['progreso'], text=texto)
+        else:
+            st.caption(texto)
+    st.write(f"* **Número Total de Datos (N):** {metricas['n']}")
+
+    kpi1, kpi2, kpi3, kpi4 = st.columns(4)
+    kpi1.metric("Min", f"{metricas['minimo']:.2f}")
+    kpi2.metric("Max", f"{metricas['maximo']:.2f}")
+    kpi3.metric("Media", f"{metricas['media']:.2f}")
+    kpi4.metric("Rango", f"{metricas['rango']:.2f}")
+
+    kpi5, kpi6, kpi7, kpi8 = st.columns(4)
+    kpi5.metric("Varianza", f"{metricas['varianza']:.2f}")
+    kpi6.metric("Desv. Estándar", f"{metricas['desviacion']:.2f}")
+    kpi7.metric("Coef. de Variación", f"{metricas['coef_variacion']:.2f}%")
+    kpi8 = st.empty()
+
+    if 'error_cuantiles' in metricas:
+        kpi9, kpi10, kpi11, kpi12 = st.columns(4)
+        kpi9.metric("Q1", formatear_metrica(metricas, 'Q1'))
+        kpi10.metric("Mediana", formatear_metrica(metricas, 'mediana'))
+        kpi11.metric("Q3", formatear_metrica(metricas, 'Q3'))
+        kpi12.metric("Rango Intercuartílico", f"{metricas['rango_intercuartilico']:.2f}")
+
+    if 'asimetria' in metricas:
+        kpi13, kpi14, kpi15, kpi16 = st.columns(4)
+        kpi13.metric("Asimetría", formatear_forma(metricas['asimetria']))
+        kpi14.metric("Curtosis (exceso)", formatear_forma(metricas['curtosis']))
+        kpi15.metric("Jarque–Bera", formatear_forma(metricas['jarque_bera']))
+        kpi16.metric("p-valor", "N/D" if pd.isna(metricas['p_jarque_bera']) else f"{metricas['p_jarque_bera']:.3g}")
+
+    st.write("### Histograma")
+    if 'histograma' in resultados:
+        st.plotly_chart(resultados['histograma'])
+    elif not trabajo.terminado:
+        st.caption("El histograma se calcula al terminar la pasada completa...")
+
+def analizar_multiserie():
+    '''
+    Modo de varias series: columnas de un archivo, o una columna dividida por una
+    clave de grupo. Todas las series se calculan a la vez (core.multiserie) y se
+    muestran en una tabla comparativa y en histogramas pequeños.
+    '''
+    with st.sidebar:
+        archivo = st.file_uploader("Archivo de Datos:", type=[ext.lstrip('.') for ext in FORMATOS_ARCHIVO],
+                                   key="archivo_multiserie")
+        if archivo is None:
+            st.info("Sube un archivo CSV, Parquet o .npy con varias columnas.")
+            return
+
+        try:
+            formato = detectar_formato(archivo.name)
+            dtype = "float64"
+            if formato == "binario":
+                dtype = st.selectbox("Tipo de Dato Binario:", TIPOS_BINARIOS)
+            columnas = listar_columnas(archivo, formato)
+        except (ValueError, ImportError) as error:
+            st.error(f"Error: {error}")
+            return
+
+        columna_grupo = None
+        if formato in ("csv", "parquet"):
+            columna_grupo = st.selectbox("Agrupar por:", [None] + columnas,
+                                         format_func=lambda c: "(sin agrupar)" if c is None else str(c))
+        disponibles = [c for c in columnas if c != columna_grupo]
+        if columna_grupo is None:
+            seleccion = st.multiselect("Columnas:", disponibles, default=disponibles)
+        else:
+            seleccion = [st.selectbox("Columna:", disponibles)] if disponibles else []
+
+        criterio_intervalos = st.selectbox("Criterio de Intervalos:", CRITERIOS_INTERVALOS + ("Número Personalizado",))
+        if criterio_intervalos == "Número Personalizado":
+            criterio_intervalos = str(st.number_input("Número de Intervalos:", min_value=1, value=5, step=1))
+        metodo_atipicos = st.selectbox("Método de Atípicos:", METODOS_ATIPICOS)
+        enviar = st.button("Analizar Series")
+
+    if not enviar:
+        return
+    if columnas and not seleccion:
+        st.warning("Selecciona al menos una columna.")
+        return
+
+    try:
+        with st.spinner("Calculando todas las series..."):
+            datos = leer_columnas(archivo, formato, seleccion if columnas else [0], columna_grupo, dtype=dtype)
+            if columna_grupo is None:
+                resultado = analizar_columnas(datos, criterio_intervalos, metodo_atipicos)
+            else:
+                resultado = analizar_grupos(datos[seleccion[0]], datos[columna_grupo],
+                                            criterio_intervalos, metodo_atipicos)
+    except (ValueError, ImportError, KeyError) as error:
+        st.error(f"Error al leer el archivo: {error}")
+        return
+
+    comparacion = resultado.comparacion
+    titulo = f"columna `{seleccion[0]}` por `{columna_grupo}`" if columna_grupo is not None \
+        else f"{len(comparacion)} series"
+    st.write(f"## Comparación de `{archivo.name}` — {titulo}")
+    st.dataframe(comparacion, column_config={
+        'n': st.column_config.NumberColumn("N"),
+        'coef_variacion': st.column_config.NumberColumn("Coef. de Variación (%)", format="%.2f"),
+        'n_atipicos': st.column_config.NumberColumn("Atípicos"),
+    })
+
+    st.write("## Histogramas por Serie")
+    histogramas = crear_histogramas_multiples(resultado.intervalos)
+    st.plotly_chart(histogramas)
+    if len(histogramas.data) < len(comparacion):
+        st.caption(f"Se muestran {len(histogramas.data)} de {len(comparacion)} series.")
+
+    with st.expander("Tablas de intervalos"):
+        st.dataframe(resultado.intervalos, hide_index=True)
+
 def main():
     st.title("📊 StatBoard")
     st.write("Estadística Descriptiva para Variables Cuantitativas")
@@ -25,8 +432,27 @@ def main():
     # --- Sidebar para entrada de datos ---
     with st.sidebar:
         st.header("Configuración de Datos")
+        # Seleccionar la fuente: texto pegado, archivo procesado por bloques o conjunto ya guardado
+        fuente_datos = st.radio("Fuente de Datos:", ("Texto", "Archivo", "Varias Series", "Guardados"),
+                                horizontal=True)
+
+    if fuente_datos == "Archivo":
+        analizar_archivo()
+        return
+    if fuente_datos == "Varias Series":
+        analizar_multiserie()
+        return
+
+    with st.sidebar:
+        # Valores sueltos o una tabla ya agregada (valor, frecuencia) / (Li, Ls, frecuencia);
+        # los conjuntos guardados son siempre valores sueltos
+        if fuente_datos == "Guardados":
+            formato_entrada = FORMATOS_ENTRADA[0]
+        else:
+            formato_entrada = st.radio("Formato de Entrada:", FORMATOS_ENTRADA, horizontal=True)
+
         # Seleccionar datos discretos o por intervalos
-        tipo_datos= st.radio("Tipo de Datos:", ("Discretos", "Por Intervalos"))
+        tipo_datos= st.radio("Tipo de Datos:", TIPOS_DATOS)
 
         # Si es continuo con intervalos, definir criterio de intervalos  
         if tipo_datos == "Por Intervalos":
@@ -36,111 +462,228 @@ def main():
             if criterio_intervalos == "Número Personalizado":
                 num_intervalos = st.number_input("Número de Intervalos:", min_value=1, value=5, step=1)
                 criterio_intervalos = str(num_intervalos)
+            sketch_k = None
+        elif formato_entrada == FORMATOS_ENTRADA[0] and fuente_datos == "Texto":
+            sketch_k = seleccionar_sketch()
+        else:
+            # Con la tabla agregada (o un conjunto guardado) los cuartiles ya son exactos
+            sketch_k = None
+
+        # Formato numérico de la entrada (separador decimal y de miles)
+        if fuente_datos == "Texto":
+            formato_numerico = st.selectbox("Formato Numérico:", tuple(FORMATOS_NUMERICOS))
+            separador_decimal, separador_miles = FORMATOS_NUMERICOS[formato_numerico]
+
+        # Método para los límites de los valores atípicos
+        metodo_atipicos = st.selectbox("Método de Atípicos:", METODOS_ATIPICOS)
+
+        # Intervalos de confianza de las métricas (solo con datos discretos, no agrupados)
+        bootstrap = st.checkbox("Intervalos de Confianza (bootstrap)",
+                                help="Remuestrea los datos para estimar intervalos de la media, la mediana, "
+                                     "los cuartiles, la desviación y el coeficiente de variación.")
+        nivel_confianza = st.selectbox("Nivel de Confianza:", NIVELES_CONFIANZA, index=1,
+                                       format_func=lambda nivel: f"{nivel:.0%}") if bootstrap else None
+
+        # Tiempos, memoria pico y tamaño de cada etapa (tracemalloc ralentiza el análisis)
+        diagnostico = st.checkbox("Diagnóstico de rendimiento", key="diagnostico",
+                                  help="Muestra el tiempo, la CPU, la memoria pico y el tamaño del "
+                                       "resultado de cada etapa del análisis.")
                           
 
-        with st.form("form_datos"):
-            valores_default = "50 42 61 55 48 50 39 52 58 45 53 49 50 44 65 51 47 56 40 54 48 59 43 50 55 52 46 53 49 57 41 62 48 50 54 45 58 51 38 52 49 47 55 60 44 53 50 46 59 52 48 54 42 57 49 51 35 63 47 55 50 43 58 52 46 49 53 66 45 54 50 48 56 42 51 59 47 37 53 55 49 44 60 52 46 50 58 41 54 48 64 53 47 55 50 45 51 57 43 52"
-            entrada_usuario = st.text_area(
-                "Datos:",
-                value=valores_default,
-                height=200,
-                help="Reemplaza con tus datos, ingresando o pegando números separados por espacios o comas."
-            )
-            enviar = st.form_submit_button("Actualizar")
+        almacen = obtener_almacen()
+        conjunto = None
+        guardar = False
+        if fuente_datos == "Guardados":
+            # Conjuntos ya parseados: se abren con memoria mapeada, sin volver a procesar el texto
+            guardados = almacen.listar()
+            if guardados.empty:
+                st.info("No hay conjuntos guardados. Marca 'Guardar en el almacén' al analizar un texto.")
+                return
+            with st.form("form_guardados"):
+                identificador = st.selectbox(
+                    "Conjunto:", guardados['identificador'],
+                    format_func=lambda i: "{nombre} ({n:,} valores)".format(
+                        **guardados.set_index('identificador').loc[i]))
+                col_analizar, col_eliminar = st.columns(2)
+                enviar = col_analizar.form_submit_button("Analizar")
+                eliminar = col_eliminar.form_submit_button("Eliminar")
+            if eliminar:
+                almacen.eliminar(identificador)
+                st.toast("Conjunto eliminado del almacén.")
+                st.rerun()
+
+        else:
+            with st.form("form_datos"):
+                valores_default = "50 42 61 55 48 50 39 52 58 45 53 49 50 44 65 51 47 56 40 54 48 59 43 50 55 52 46 53 49 57 41 62 48 50 54 45 58 51 38 52 49 47 55 60 44 53 50 46 59 52 48 54 42 57 49 51 35 63 47 55 50 43 58 52 46 49 53 66 45 54 50 48 56 42 51 59 47 37 53 55 49 44 60 52 46 50 58 41 54 48 64 53 47 55 50 45 51 57 43 52"
+                if formato_entrada == FORMATOS_ENTRADA[0]:
+                    entrada_usuario = st.text_area(
+                        "Datos:",
+                        value=valores_default,
+                        height=200,
+                        help="Reemplaza con tus datos, ingresando o pegando números separados por espacios, saltos de línea, comas o ';'."
+                    )
+                else:
+                    entrada_usuario = st.text_area(
+                        "Tabla de Frecuencias:",
+                        value=TABLA_FRECUENCIAS_DEFAULT,
+                        height=200,
+                        help="Una fila por línea: 'valor frecuencia' o 'límite_inferior límite_superior frecuencia' "
+                             "(clases ya agrupadas, se analizan por intervalos)."
+                    )
+                if formato_entrada == FORMATOS_ENTRADA[0]:
+                    # Guardar los valores parseados para reabrirlos luego sin volver a procesar el texto
+                    guardar = st.checkbox("Guardar en el almacén")
+                    nombre_conjunto = st.text_input("Nombre del Conjunto:", placeholder="(opcional)")
+                enviar = st.form_submit_button("Actualizar")
 
     # --- Procesar Datos ---
     if enviar:
-        # Procesar la serie original desde la entrada del usuario
-        serie_original = procesar_datos(entrada_usuario)
-        
-        if serie_original.empty:
-            st.warning("👈 Ingresa datos numéricos en el menú lateral...")
-            return
-
         # Inicializamos variables para el flujo
         tabla_estadistica = pd.DataFrame()
+        atipicos = None
+        # Con la sesión incremental, valores_ordenados son los valores únicos y conteos sus frecuencias
+        conteos = None
+
+        # Cada etapa se guarda en caché con la huella de los datos y las opciones que la
+        # afectan: cambiar de modo, criterio o método reutiliza el resto del análisis
+        cache = obtener_cache_pipeline()
+        instrumentacion = Instrumentacion(serializar_cargas=diagnostico)
+        if tipo_datos != "Por Intervalos":
+            criterio_intervalos = None
+
+        if formato_entrada == FORMATOS_ENTRADA[1]:
+            # Tabla ya agregada: se analiza sin expandirla (coste proporcional a sus filas)
+            try:
+                with instrumentacion.etapa("parseo") as medicion:
+                    tabla_agregada = parsear_tabla(entrada_usuario, separador_decimal, separador_miles)
+                    medicion.carga(tabla_agregada)
+                if tabla_agregada.size == 0:
+                    st.warning("👈 Ingresa una tabla de frecuencias en el menú lateral...")
+                    return
+                clave_vista = ((huella_array(tabla_agregada), tabla_agregada.shape, None), tipo_datos, criterio_intervalos)
+                # Con la tabla agregada, tabla, métricas y atípicos se calculan juntos
+                with instrumentacion.etapa("tabla") as medicion:
+                    resultado = cache.obtener(
+                        "tabla_agregada", (clave_vista, metodo_atipicos),
+                        lambda: analizar_tabla(tabla_agregada, tipo_datos, criterio_intervalos, metodo_atipicos))
+                    medicion.carga(resultado.tabla)
+            except ValueError as error:
+                st.error(f"Error: {error}")
+                return
+
+            # Con 3 columnas (límites y frecuencia) los datos siempre son por intervalos
+            tipo_datos = resultado.tipo_datos
+            tabla_estadistica = resultado.tabla
+            metricas, atipicos = resultado.metricas, resultado.atipicos
+        else:
+            if fuente_datos == "Guardados":
+                # Conjunto guardado: copia ordenada mapeada y métricas ya calculadas, sin parseo
+                with instrumentacion.etapa("parseo") as medicion:
+                    conjunto = almacen.abrir(identificador)
+                    valores_ordenados = conjunto.valores_ordenados
+                    medicion.carga(conjunto.meta)
+                serie_original = pd.Series(valores_ordenados, copy=False)
+                clave_datos = (conjunto.identificador, conjunto.n, None)
+            elif sketch_k:
+                # Procesar la serie original desde la entrada del usuario
+                # (los cuartiles se estiman con el sketch, sin ordenar los datos)
+                with instrumentacion.etapa("parseo") as medicion:
+                    serie_original, errores, n_errores = procesar_datos(entrada_usuario, separador_decimal,
+                                                                        separador_miles)
+                    medicion.carga(serie_original)
+                if n_errores:
+                    st.error(formatear_errores(errores, n_errores))
+                valores_ordenados = None
+                clave_datos = (huella_array(serie_original.to_numpy()), len(serie_original), sketch_k)
+            else:
+                # La sesión conserva el estado entre ediciones: si solo se añadieron o quitaron
+                # valores al final, se parsea y se aplica únicamente la diferencia
+                sesion = st.session_state.setdefault("sesion_incremental", SesionIncremental(momentos_superiores=True))
+                with instrumentacion.etapa("parseo") as medicion:
+                    sesion.actualizar(entrada_usuario, separador_decimal, separador_miles)
+                    # La tabla de frecuencias de la sesión alimenta intervalos y atípicos: no se
+                    # expande la copia ordenada, de modo que cada edición cuesta O(valores distintos)
+                    valores_ordenados, conteos = sesion.frecuencias()
+                    medicion.carga(valores_ordenados)
+                if sesion.n_errores:
+                    st.error(formatear_errores(sesion.errores, sesion.n_errores))
+
+                serie_original = None
+                clave_datos = (sesion.huella(), sesion.n_valores, None)
+
+            n_datos = sesion.n_valores if serie_original is None else len(serie_original)
+            if guardar and n_datos:
+                # Con la sesión los NaN ya no están en la copia ordenada: se indica la n total
+                if serie_original is None:
+                    guardado = almacen.guardar(sesion.valores_ordenados(), nombre_conjunto or None,
+                                               n=sesion.n_valores)
+                else:
+                    guardado = almacen.guardar(serie_original.to_numpy(), nombre_conjunto or None)
+                st.toast(f"Guardado en el almacén como '{guardado.nombre}'.")
+
+            if n_datos == 0:
+                st.warning("👈 Ingresa datos numéricos en el menú lateral...")
+                return
+
+            clave_vista = (clave_datos, tipo_datos, criterio_intervalos)
         
-        # Lógica bifurcada: Discretos vs Continuos
-        if tipo_datos == "Por Intervalos":
-            # A. Generamos la tabla de intervalos (Límites, Marca de Clase, fi)
-            tabla_estadistica = crear_intervalos(serie_original, criterio_intervalos)
-            
-            
-            # B. Calculamos las columnas estadísticas DIRECTAMENTE aquí
-            # (Evitamos reconstruir la serie y perder filas vacías)
-            total_n = tabla_estadistica['Frecuencia Absoluta (fi)'].sum()
-            
-            tabla_estadistica['Frecuencia Relativa (hi)'] = tabla_estadistica['Frecuencia Absoluta (fi)'] / total_n
-            tabla_estadistica['Porcentaje (pi)'] = tabla_estadistica['Frecuencia Relativa (hi)']
-            tabla_estadistica['Frecuencia Acumulada (Fi)'] = tabla_estadistica['Frecuencia Absoluta (fi)'].cumsum()
-            tabla_estadistica['Frecuencia Rel Acumulada (Hi)'] = tabla_estadistica['Frecuencia Relativa (hi)'].cumsum()
-            
-            # C. Asignamos la columna 'Valores' para compatibilidad con el gráfico (usamos Marca de Clase)
-            tabla_estadistica['Valores'] = tabla_estadistica['Marca de Clase']
-            # D. Calculamos métricas usando interpolación para datos agrupados
-            metricas= calcular_metricas_agrupadas(tabla_estadistica)
+            # Lógica bifurcada: Discretos vs Continuos
+            if tipo_datos == "Por Intervalos":
+                # A. Generamos la tabla de intervalos (Límites, Marca de Clase, fi) con sus
+                #    frecuencias relativas y acumuladas, y 'Valores' = Marca de Clase para el gráfico
+                with instrumentacion.etapa("intervalos") as medicion:
+                    tabla_estadistica = cache.obtener(
+                        "intervalos", clave_vista,
+                        lambda: completar_tabla_intervalos(
+                            conjunto.intervalos(criterio_intervalos) if conjunto is not None
+                            else crear_intervalos(serie_original, criterio_intervalos, valores_ordenados,
+                                                  conteos=conteos)))
+                    medicion.carga(tabla_estadistica)
+
+                # B. Calculamos métricas usando interpolación para datos agrupados
+                with instrumentacion.etapa("metricas") as medicion:
+                    metricas = cache.obtener("metricas_agrupadas", clave_vista,
+                                             lambda: calcular_metricas_agrupadas(tabla_estadistica))
+                    medicion.carga(metricas)
 
-        else: 
-            # Metricas para valores discretos
-            tabla_estadistica = crear_tabla_estadistica(serie_original)
-            metricas = calcular_metricas_principales(serie_original)
+            else: 
+                # Metricas para valores discretos
+                with instrumentacion.etapa("tabla") as medicion:
+                    if conjunto is not None:
+                        tabla_estadistica = cache.obtener("tabla", clave_vista, conjunto.tabla_estadistica)
+                    elif sketch_k:
+                        tabla_estadistica = cache.obtener("tabla", clave_vista,
+                                                          lambda: crear_tabla_estadistica(serie_original))
+                    else:
+                        tabla_estadistica = cache.obtener("tabla", clave_vista, sesion.tabla_estadistica)
+                    medicion.carga(tabla_estadistica)
+                with instrumentacion.etapa("metricas") as medicion:
+                    if conjunto is not None:
+                        metricas = cache.obtener("metricas", clave_vista, conjunto.metricas)
+                    elif sketch_k:
+                        metricas = cache.obtener("metricas", clave_vista, lambda: calcular_metricas_principales(
+                            serie_original, momentos_superiores=True, sketch_k=sketch_k))
+                    else:
+                        metricas = cache.obtener("metricas", clave_vista, sesion.metricas)
+                    medicion.carga(metricas)
 
-            # Aseguramos que la columna 'Valores' exista para compatibilidad con gráficos
-            tabla_estadistica = tabla_estadistica.reset_index()
-            col_indice = tabla_estadistica.columns[0]
-            tabla_estadistica.rename(columns={col_indice: 'Valores'}, inplace=True)
+                # Aseguramos que la columna 'Valores' exista para compatibilidad con gráficos
+                tabla_estadistica = tabla_con_valores(tabla_estadistica)
 
 
         st.write("## Distribución de Frecuencias")
 
-        # --- Visualización de la tabla estadística ---
-        # Configuración de columnas común
-        config_columnas = {
-            'Frecuencia Absoluta (fi)': st.column_config.NumberColumn(format="%d", width='small'),
-            'Frecuencia Relativa (hi)': st.column_config.NumberColumn(format="%.4f", width='small'),
-            'Porcentaje (pi)': st.column_config.NumberColumn(format="%.2f%%", width='small'),
-            'Frecuencia Acumulada (Fi)': st.column_config.NumberColumn(format="%d", width='small'),
-            'Frecuencia Rel Acumulada (Hi)': st.column_config.NumberColumn(format="%.4f", width='small'),
-        }
+        # --- Visualización de la tabla estadística (paginada) ---
+        with instrumentacion.etapa("renderizado"):
+            mostrar_tabla_frecuencias(tabla_estadistica, tipo_datos)
 
-        if tipo_datos == "Por Intervalos":
-            # Crear columna 'intervalos'
-            tabla_estadistica['Intervalos'] = tabla_estadistica.apply(
-                lambda row: f"[ {row['Límite Inferior']:.2f} , {row['Límite Superior']:.2f} )", axis=1
-            )
-            # Añadimos columnas específicas de intervalos a la config
-            config_columnas.update({
-                'Intervalos': st.column_config.TextColumn("Intervalos", width='small'),
-                'Valores': st.column_config.NumberColumn("Marca de Clase", format="%.2f", width='small')                
-            })
-            
-            # Orden de columnas preferido para visualización
-            columnas_ordenadas = ['Intervalos', 'Valores', 
-                                'Frecuencia Absoluta (fi)', 'Frecuencia Relativa (hi)', 
-                                'Porcentaje (pi)', 'Frecuencia Acumulada (Fi)', 
-                                'Frecuencia Rel Acumulada (Hi)']
-            
-            st.dataframe(tabla_estadistica[columnas_ordenadas], 
-                         hide_index=True, 
-                         column_config=config_columnas,
-                         width='stretch')            
-
-        else:
-            # Configuración para Discretos
-            # Aseguramos que 'Valores' se muestre primero si lo deseamos, o dejamos el índice
-            config_columnas['Valores'] = st.column_config.NumberColumn("Valor (xi)", format="%.2f", width='small')
-            
-            # Reordenamos para que 'Valores' aparezca primero
-            cols = ['Valores'] + [c for c in tabla_estadistica.columns if c != 'Valores']
-            
-            st.dataframe(tabla_estadistica[cols], 
-                         width='stretch', 
-                         hide_index=True, # Ocultamos índice porque ya tenemos la columna 'Valores'
-                         column_config=config_columnas)
-            
         # Mostrar cantidad de clases / intervalos
         st.write(f"* **Número de Clases / Intervalos:** {len(tabla_estadistica)}")
         st.write(f"* **Número Total de Datos (N):** {metricas['n']}")
+        if fuente_datos == "Guardados":
+            st.caption(f"Conjunto guardado: {conjunto.nombre} ({conjunto.meta['guardado']}).")
+        elif formato_entrada == FORMATOS_ENTRADA[0] and not sketch_k and sesion.ultima_actualizacion == "incremental":
+            st.caption(f"Actualización incremental: +{sesion.n_anadidos} / −{sesion.n_quitados} valores.")
         
         st.divider()
         
@@ -151,14 +694,14 @@ def main():
             st.write("### Medidas de Posición")
             kpi1, kpi2, kpi3, kpi4 = st.columns(4)
             kpi1.metric("Min", f"{metricas['minimo']:.2f}")
-            kpi2.metric("Q1", f"{metricas['Q1']:.2f}")
-            kpi3.metric("Q3", f"{metricas['Q3']:.2f}")
+            kpi2.metric("Q1", formatear_metrica(metricas, 'Q1'))
+            kpi3.metric("Q3", formatear_metrica(metricas, 'Q3'))
             kpi4.metric("Max", f"{metricas['maximo']:.2f}")        
             
             st.write("### Medidas de Tendencia Central")
             kpi5, kpi6, kpi7, kpi8 = st.columns(4)
             kpi5.metric("Media", f"{metricas['media']:.2f}")
-            kpi6.metric("Mediana", f"{metricas['mediana']:.2f}")
+            kpi6.metric("Mediana", formatear_metrica(metricas, 'mediana'))
             kpi7.metric("Moda", metricas['moda'])
             kpi8= st.empty()  # Espacio vacío para mantener la cuadrícula
             
@@ -174,17 +717,57 @@ def main():
             kpi14.metric("Rango Intercuartílico", f"{metricas['rango_intercuartilico']:.2f}")
             kpi15= st.empty()  
             kpi16= st.empty()
+
+            if 'asimetria' in metricas:
+                st.write("### Medidas de Forma")
+                kpi17, kpi18, kpi19, kpi20 = st.columns(4)
+                kpi17.metric("Asimetría", formatear_forma(metricas['asimetria']))
+                kpi18.metric("Curtosis (exceso)", formatear_forma(metricas['curtosis']))
+                kpi19.metric("Asimetría de Pearson", formatear_forma(metricas['asimetria_pearson']))
+                kpi20.metric("Asimetría de Bowley", formatear_forma(metricas['asimetria_bowley']))
             
         with col2:
             # Generar Gráfico
             st.write("### Histograma")
-            grafico = crear_histograma(tabla_estadistica)
-            st.plotly_chart(grafico)
+            with instrumentacion.etapa("histograma"):
+                grafico = cache.obtener("histograma", clave_vista, lambda: crear_histograma(tabla_estadistica))
+            with instrumentacion.etapa("renderizado") as medicion:
+                st.plotly_chart(grafico)
+                medicion.carga(grafico)
+
+        # --- Diagnóstico de normalidad ---
+        # (los conjuntos guardados antes de existir las medidas de forma no las tienen)
+        if 'jarque_bera' in metricas:
+            with st.expander("Diagnóstico de Normalidad"):
+                with instrumentacion.etapa("normalidad") as medicion:
+                    resumen = cache.obtener("normalidad", clave_vista, lambda: resumen_qq(
+                        lambda p: cuantiles_tabla(tabla_estadistica, p), metricas['media'], metricas['desviacion']))
+                    medicion.carga(resumen)
+                mostrar_normalidad(metricas, resumen, agrupados=tipo_datos == "Por Intervalos")
 
         # --- Valores atípicos ---
         st.divider()
         st.subheader("Valores Atípicos (Outliers)")
-        diagrama_de_cajas, valores_atipicos = crear_boxplot(metricas, serie_original)
+        # (con la tabla agregada ya se calcularon junto con la tabla y las métricas)
+        with instrumentacion.etapa("atipicos") as medicion:
+            if atipicos is None and conjunto is not None:
+                atipicos = cache.obtener("atipicos", (clave_vista, metodo_atipicos),
+                                         lambda: conjunto.atipicos(metodo_atipicos))
+            elif atipicos is None and valores_ordenados is not None:
+                atipicos = cache.obtener("atipicos", (clave_vista, metodo_atipicos),
+                                         lambda: analizar_atipicos(valores_ordenados, metricas, metodo_atipicos,
+                                                                   conteos=conteos))
+            elif atipicos is None:
+                atipicos = cache.obtener("atipicos", (clave_vista, metodo_atipicos),
+                                         lambda: analizar_atipicos(serie_original.to_numpy(), metricas,
+                                                                   metodo_atipicos, ordenados=False))
+            medicion.carga(atipicos)
+        with instrumentacion.etapa("boxplot"):
+            diagrama_de_cajas = crear_boxplot(metricas, atipicos)
+        if 'error_cuantiles' in metricas and metodo_atipicos == METODOS_ATIPICOS[0]:
+            error_q1, error_q3 = metricas['error_cuantiles']['Q1'], metricas['error_cuantiles']['Q3']
+            st.caption(f"Límites de Tukey calculados con cuartiles aproximados "
+                       f"(Q1 ± {error_q1:.2f}, Q3 ± {error_q3:.2f}).")
 
         def _mostrar_advertencia_atipicos_():
             '''
@@ -198,20 +781,92 @@ def main():
         col1,col2 = st.columns([1,2])
         with col1:
             # Diagrama de caja para valores atípicos           
-            st.pyplot(diagrama_de_cajas)        
+            with instrumentacion.etapa("renderizado") as medicion:
+                st.plotly_chart(diagrama_de_cajas)
+                medicion.carga(diagrama_de_cajas)
         with col2:
-            if len(valores_atipicos) == 0:
+            n_atipicos = atipicos['n_atipicos']
+            if n_atipicos == 0:
                 st.success("✅ **Todo en orden:** No se detectaron valores atípicos en la muestra.")
-            elif len(valores_atipicos) == 1:
-                st.warning("⚠️ **Atención:** Se detectó 1 valor atípico")
-                st.write(f"* Outliers = [ {valores_atipicos[0]} ]")
-                _mostrar_advertencia_atipicos_()
             else:
-                st.warning(f"⚠️ **Atención:** Se dectectaron {len(valores_atipicos)} valores atípicos")
-                st.write("* Outliers = [ "+", ".join([str(v) for v in valores_atipicos])+" ]")                    
+                if n_atipicos == 1:
+                    st.warning("⚠️ **Atención:** Se detectó 1 valor atípico")
+                else:
+                    st.warning(f"⚠️ **Atención:** Se detectaron {n_atipicos} valores atípicos "
+                               f"({atipicos['n_unicos']} distintos)")
+                st.write(f"* Por debajo de {atipicos['limite_inferior']:.2f}: **{atipicos['n_inferiores']}** · "
+                         f"Por encima de {atipicos['limite_superior']:.2f}: **{atipicos['n_superiores']}**")
+
+                # La lista de valores distintos está acotada a los más extremos de cada lado:
+                # los omitidos (los más cercanos a los límites) se indican entre ambos lados
+                elementos = [str(v) for v in atipicos['unicos']]
+                omitidos = atipicos['n_unicos'] - len(elementos)
+                if omitidos:
+                    n_listados_inf = sum(v < atipicos['limite_inferior'] for v in atipicos['unicos'])
+                    elementos.insert(n_listados_inf, f"… (+{omitidos} distintos) …")
+                st.write("* Outliers = [ " + ", ".join(elementos) + " ]")
                 _mostrar_advertencia_atipicos_()
 
 
+        # --- Intervalos de confianza (bootstrap) ---
+        # Al final de la página: el resto del análisis ya está visible mientras se calculan, y los
+        # intervalos se refinan a medida que terminan los lotes. Si el usuario cambia algo, Streamlit
+        # interrumpe la ejecución y closing() cancela los lotes pendientes.
+        if bootstrap and tipo_datos == TIPOS_DATOS[0]:
+            st.divider()
+            st.subheader("Intervalos de Confianza (Bootstrap)")
+            try:
+                if conteos is not None:
+                    # El bootstrap sí usa la copia expandida (su coste ya es O(n · remuestras))
+                    remuestreo = Remuestreo(sesion.valores_ordenados())
+                elif formato_entrada == FORMATOS_ENTRADA[0] and valores_ordenados is not None:
+                    remuestreo = Remuestreo(valores_ordenados)
+                else:
+                    remuestreo = Remuestreo(valores_unicos=tabla_estadistica['Valores'],
+                                            conteos=tabla_estadistica['Frecuencia Absoluta (fi)'])
+            except ValueError as error:
+                st.warning(str(error))
+            else:
+                marcador = st.empty()
+                with instrumentacion.etapa("bootstrap") as medicion, \
+                        closing(bootstrap_progresivo(remuestreo, N_REMUESTRAS, nivel_confianza,
+                                                     presupuesto_s=PRESUPUESTO_BOOTSTRAP_S)) as progreso:
+                    for resultado_bootstrap in progreso:
+                        mostrar_intervalos_bootstrap(marcador, resultado_bootstrap)
+                    medicion.carga(resultado_bootstrap.intervalos)
+        elif bootstrap:
+            st.caption("Los intervalos de confianza se calculan solo con datos discretos (sin agrupar).")
+
+        # --- Tiempos por etapa: registro estructurado, agregado del proceso y diagnóstico ---
+        registro_etapas = obtener_registro_etapas()
+        registro_etapas.registrar(instrumentacion)
+        if diagnostico:
+            with st.expander("Diagnóstico de rendimiento", expanded=True):
+                tabla_tiempos = instrumentacion.tabla()
+                st.dataframe(tabla_tiempos.assign(pico_bytes=tabla_tiempos['pico_bytes'] / 1024 ** 2,
+                                                  carga_bytes=tabla_tiempos['carga_bytes'] / 1024 ** 2),
+                             column_config={
+                                 'tiempo_s': st.column_config.NumberColumn("Tiempo (s)", format="%.4f"),
+                                 'cpu_s': st.column_config.NumberColumn("CPU (s)", format="%.4f"),
+                                 'pico_bytes': st.column_config.NumberColumn("Memoria Pico (MB)", format="%.2f"),
+                                 'carga_bytes': st.column_config.NumberColumn("Resultado (MB)", format="%.3f"),
+                             })
+                st.caption("Las etapas servidas desde la caché del análisis miden solo la consulta.")
+                col_json, col_prometheus, _ = st.columns([1, 1, 2])
+                col_json.download_button("Registro JSON", file_name="etapas.jsonl", mime="application/x-ndjson",
+                                         data=instrumentacion.a_json_lineas(tipo_datos=tipo_datos),
+                                         on_click="ignore")
+                col_prometheus.download_button("Métricas Prometheus", file_name="metrics.txt", mime="text/plain",
+                                               data=registro_etapas.a_prometheus(), on_click="ignore")
+
+        # --- Estadísticas de la caché del análisis ---
+        with st.expander("Caché del análisis"):
+            estadisticas_cache = cache.estadisticas()
+            st.caption(f"{estadisticas_cache.attrs['entradas']} entradas · "
+                       f"{estadisticas_cache.attrs['bytes'] / 1024 ** 2:.1f} MB en uso")
+            st.dataframe(estadisticas_cache,
+                         column_config={'Tasa de Aciertos': st.column_config.NumberColumn(format="%.2f")})
+
         # --- Creditos ---
         st.divider()
         st.markdown(
@@ -221,4 +876,6 @@ def main():
         st.markdown("👤 Desarrollado por Sebastian Kremis")
 
 if __name__ == "__main__":
-    main()
+    # La memoria pico por etapa solo se mide en modo diagnóstico
+    with trazar_memoria(st.session_state.get("diagnostico", False)):
+        main()
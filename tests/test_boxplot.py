@@ -0,0 +1,68 @@
+# tests/test_boxplot.py
+'''
+Resistencia del diagrama de caja memoizado: muchas re-ejecuciones con más
+conjuntos distintos que la caché (aciertos y desalojos). La caché de figuras
+no pasa de MAX_BOXPLOTS_MEMOIZADOS entradas y la memoria se mantiene plana.
+'''
+import gc
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from core.atipicos import analizar_atipicos
+from core.descriptive import calcular_metricas_principales, ordenar_valores
+from core.visualization import MAX_BOXPLOTS_MEMOIZADOS, crear_boxplot, _crear_boxplot_memoizado
+
+REEJECUCIONES = 600
+# Con tracemalloc activo cada re-ejecución es mucho más lenta
+REEJECUCIONES_MEMORIA = 200
+N_CONJUNTOS = MAX_BOXPLOTS_MEMOIZADOS + 16
+
+# Crecimiento máximo tolerado (bytes) entre la primera y la última medición
+TOLERANCIA = 1024 ** 2
+
+
+@pytest.fixture(scope="module")
+def resumenes() -> list:
+    '''Métricas y atípicos de varios conjuntos de datos (con colas pesadas).'''
+    rng = np.random.default_rng(0)
+    resumenes = []
+    for _ in range(N_CONJUNTOS):
+        ordenados = ordenar_valores(rng.standard_t(3, 2_000).round(2))
+        metricas = calcular_metricas_principales(ordenados, ordenados)
+        resumenes.append((metricas, analizar_atipicos(ordenados, metricas)))
+    return resumenes
+
+
+def test_cache_acotada(resumenes):
+    _crear_boxplot_memoizado.cache_clear()
+    for i in np.random.default_rng(1).integers(N_CONJUNTOS, size=REEJECUCIONES):
+        crear_boxplot(*resumenes[i])
+        assert _crear_boxplot_memoizado.cache_info().currsize <= MAX_BOXPLOTS_MEMOIZADOS
+    informacion = _crear_boxplot_memoizado.cache_info()
+    assert informacion.currsize == MAX_BOXPLOTS_MEMOIZADOS
+    assert informacion.hits > 0 and informacion.misses > N_CONJUNTOS
+
+
+def test_mismos_datos_misma_figura(resumenes):
+    assert crear_boxplot(*resumenes[0]) is crear_boxplot(*resumenes[0])
+
+
+def test_memoria_plana(resumenes):
+    # Como en cada re-ejecución de Streamlit: se construye y se serializa la figura
+    secuencia = np.random.default_rng(2).integers(N_CONJUNTOS, size=REEJECUCIONES_MEMORIA)
+    for i in secuencia[:N_CONJUNTOS]:
+        crear_boxplot(*resumenes[i]).to_json()
+
+    tracemalloc.start()
+    try:
+        memoria = []
+        for j, i in enumerate(secuencia):
+            crear_boxplot(*resumenes[i]).to_json()
+            if (j + 1) % (REEJECUCIONES_MEMORIA // 5) == 0:
+                gc.collect()
+                memoria.append(tracemalloc.get_traced_memory()[0])
+    finally:
+        tracemalloc.stop()
+    assert memoria[-1] - memoria[0] <= TOLERANCIA
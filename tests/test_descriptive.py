@@ -0,0 +1,75 @@
+# tests/test_descriptive.py
+'''
+Métricas de referencia de calcular_metricas_principales y crear_tabla_estadistica
+para entradas fijas (enteros, decimales, empates/multimodal y NaN). Los valores
+esperados están calculados a mano (cuartiles por interpolación lineal, varianza
+muestral con n - 1).
+'''
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.descriptive import calcular_metricas_principales, crear_tabla_estadistica, ordenar_valores
+
+CASOS = {
+    "enteros": (
+        [2, 4, 4, 4, 5, 5, 7, 9],
+        {"n": 8, "minimo": 2.0, "maximo": 9.0, "Q1": 4.0, "Q3": 5.5, "media": 5.0, "mediana": 4.5,
+         "moda": "4.0", "varianza": 32 / 7, "desviacion": np.sqrt(32 / 7),
+         "coef_variacion": np.sqrt(32 / 7) / 5 * 100, "rango": 7.0, "rango_intercuartilico": 1.5},
+    ),
+    "decimales": (
+        [1.5, 2.25, 3.75, 0.5, 2.25],
+        {"n": 5, "minimo": 0.5, "maximo": 3.75, "Q1": 1.5, "Q3": 2.25, "media": 2.05, "mediana": 2.25,
+         "moda": "2.25", "varianza": 1.41875, "desviacion": np.sqrt(1.41875),
+         "coef_variacion": np.sqrt(1.41875) / 2.05 * 100, "rango": 3.25, "rango_intercuartilico": 0.75},
+    ),
+    "multimodal": (
+        [1, 1, 2, 2, 3, 3, 4],
+        {"n": 7, "minimo": 1.0, "maximo": 4.0, "Q1": 1.5, "Q3": 3.0, "media": 16 / 7, "mediana": 2.0,
+         "moda": "1.0, 2.0, 3.0", "varianza": 26 / 21, "desviacion": np.sqrt(26 / 21),
+         "coef_variacion": np.sqrt(26 / 21) / (16 / 7) * 100, "rango": 3.0, "rango_intercuartilico": 1.5},
+    ),
+    # Los NaN se descartan en todas las métricas, pero n cuenta los datos recibidos
+    "con_nan": (
+        [3, np.nan, 1, 2, np.nan, 4],
+        {"n": 6, "minimo": 1.0, "maximo": 4.0, "Q1": 1.75, "Q3": 3.25, "media": 2.5, "mediana": 2.5,
+         "moda": "1.0, 2.0, 3.0, 4.0", "varianza": 5 / 3, "desviacion": np.sqrt(5 / 3),
+         "coef_variacion": np.sqrt(5 / 3) / 2.5 * 100, "rango": 3.0, "rango_intercuartilico": 1.5},
+    ),
+}
+
+
+@pytest.mark.parametrize("nombre", CASOS)
+def test_metricas_principales(nombre):
+    datos, esperadas = CASOS[nombre]
+    metricas = calcular_metricas_principales(pd.Series(datos, dtype=np.float64))
+    assert set(esperadas) <= set(metricas)
+    for clave, esperada in esperadas.items():
+        if isinstance(esperada, str):
+            assert metricas[clave] == esperada, clave
+        else:
+            assert metricas[clave] == pytest.approx(esperada, rel=1e-12), clave
+
+
+@pytest.mark.parametrize("nombre", CASOS)
+def test_metricas_con_copia_ordenada(nombre):
+    # Reutilizar la copia ordenada no cambia ninguna métrica
+    datos, _ = CASOS[nombre]
+    serie = pd.Series(datos, dtype=np.float64)
+    assert calcular_metricas_principales(serie, valores_ordenados=ordenar_valores(serie)) == \
+        calcular_metricas_principales(serie)
+
+
+def test_ordenar_valores_descarta_nan():
+    np.testing.assert_array_equal(ordenar_valores([3, np.nan, 1, 2, np.nan, 4]), [1.0, 2.0, 3.0, 4.0])
+
+
+def test_tabla_estadistica_enteros():
+    tabla = crear_tabla_estadistica(pd.Series([2, 4, 4, 4, 5, 5, 7, 9], dtype=np.float64))
+    np.testing.assert_array_equal(tabla.index, [2.0, 4.0, 5.0, 7.0, 9.0])
+    np.testing.assert_array_equal(tabla['Frecuencia Absoluta (fi)'], [1, 3, 2, 1, 1])
+    np.testing.assert_allclose(tabla['Frecuencia Relativa (hi)'], [0.125, 0.375, 0.25, 0.125, 0.125])
+    np.testing.assert_allclose(tabla['Porcentaje (pi)'], [12.5, 37.5, 25.0, 12.5, 12.5])
+    np.testing.assert_array_equal(tabla['Frecuencia Acumulada (Fi)'], [1, 4, 6, 7, 8])
+    np.testing.assert_allclose(tabla['Frecuencia Rel Acumulada (Hi)'], [0.125, 0.5, 0.75, 0.875, 1.0])
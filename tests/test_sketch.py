@@ -0,0 +1,78 @@
+# tests/test_sketch.py
+'''
+Precisión del sketch KLL frente a los cuantiles exactos, para varias distribuciones,
+tamaños y valores de k: el error de rango no supera error_rango() y el cuantil
+exacto queda dentro del error informado por cuantil_con_error (y por tanto del
+'error_cuantiles' de las métricas aproximadas).
+'''
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.descriptive import calcular_metricas_principales
+from core.frecuencias import cuantil_ordenado
+from core.sketch import SketchCuantiles
+
+DISTRIBUCIONES = {
+    "normal": lambda rng, n: rng.normal(50, 10, n),
+    "exponencial": lambda rng, n: rng.exponential(1, n),
+    "lognormal": lambda rng, n: rng.lognormal(0, 2, n),
+    "discreta": lambda rng, n: rng.poisson(3, n).astype(np.float64),
+}
+TAMANOS = (500, 20_000, 300_000)
+PROBABILIDADES = (0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1)
+
+# Tamaño de bloque al alimentar el sketch (primo: los bloques no coinciden con las capacidades)
+TAMANO_BLOQUE = 7_919
+
+
+def _sketch(datos: np.ndarray, k: int) -> SketchCuantiles:
+    sketch = SketchCuantiles(k)
+    for inicio in range(0, len(datos), TAMANO_BLOQUE):
+        sketch.actualizar(datos[inicio:inicio + TAMANO_BLOQUE])
+    return sketch
+
+
+@pytest.mark.parametrize("k", (50, 200))
+@pytest.mark.parametrize("n", TAMANOS)
+@pytest.mark.parametrize("distribucion", DISTRIBUCIONES)
+def test_error_dentro_de_la_cota(distribucion, n, k):
+    datos = DISTRIBUCIONES[distribucion](np.random.default_rng(n + k), n)
+    ordenados = np.sort(datos)
+    sketch = _sketch(datos, k)
+    eps = sketch.error_rango()
+
+    for p, estimado in zip(PROBABILIDADES, sketch.cuantiles(PROBABILIDADES)):
+        # Error de rango: distancia de p al intervalo de rangos (con empates) del valor estimado
+        rango_inferior = np.searchsorted(ordenados, estimado, side="left") / n
+        rango_superior = np.searchsorted(ordenados, estimado, side="right") / n
+        assert max(rango_inferior - p, p - rango_superior, 0) <= eps, p
+
+        valor, error = sketch.cuantil_con_error(p)
+        assert valor == estimado
+        assert abs(valor - cuantil_ordenado(ordenados, p)) <= error, p
+
+
+def test_extremos_exactos():
+    datos = np.random.default_rng(0).lognormal(0, 2, 100_000)
+    sketch = _sketch(datos, 50)
+    assert sketch.cuantil(0) == datos.min()
+    assert sketch.cuantil(1) == datos.max()
+
+
+def test_niveles_ordenados_y_combinar():
+    rng = np.random.default_rng(1)
+    a, b = _sketch(rng.normal(size=50_000), 100), _sketch(rng.exponential(size=30_000), 100)
+    for sketch in (a, b, a.combinar(b)):
+        assert all(np.all(np.diff(nivel) >= 0) for nivel in sketch.niveles)
+    assert a.n == 80_000
+    # Cada compactación convierte 2m elementos de peso 2^h en m de peso 2^(h+1): el peso se conserva
+    assert sum(len(nivel) * 2 ** h for h, nivel in enumerate(a.niveles)) == a.n
+
+
+def test_metricas_aproximadas():
+    datos = np.random.default_rng(2).exponential(1, 200_000)
+    exactas = calcular_metricas_principales(pd.Series(datos))
+    aproximadas = calcular_metricas_principales(pd.Series(datos), sketch_k=SketchCuantiles.k_para_error(0.01))
+    for clave in ("Q1", "mediana", "Q3"):
+        assert abs(aproximadas[clave] - exactas[clave]) <= aproximadas["error_cuantiles"][clave], clave